@@ -1,6 +1,7 @@
 from datetime import datetime
 import csv
 from pathlib import Path
+from core.reference_registry import ReferenceRegistry
 
 class FileOperations:
     def __init__(self):
@@ -13,6 +14,7 @@ class FileOperations:
             'Treasury': self.base_dir / 'data/treasury/TREASURY_CURRENT.csv'
         }
         self._ensure_directories()
+        self.reference_registry = ReferenceRegistry(self.file_paths['Treasury'])
 
     def _ensure_directories(self):
         """Ensure all required directories exist"""
@@ -238,18 +240,25 @@ class FileOperations:
         file_path.parent.mkdir(parents=True, exist_ok=True)
         return file_path
 
+    def read_treasury_file(self):
+        """Read all Treasury rows (cold path, duplicate checks use reference_registry)"""
+        file_path = self.file_paths['Treasury']
+        if not file_path.exists():
+            return []
+        with open(file_path, 'r', newline='', encoding='utf-8') as file:
+            return list(csv.DictReader(file))
+
     def save_payment(self, payment_data):
         """Save payment to Treasury with Under Process status"""
         try:
             file_path = self.file_paths['Treasury']
             fieldnames = ['company', 'beneficiary', 'reference', 'amount', 'date', 'status', 'timestamp']
             
-            # Read existing payments
-            existing_payments = []
-            if file_path.exists():
-                with open(file_path, 'r', newline='') as file:
-                    reader = csv.DictReader(file)
-                    existing_payments = list(reader)
+            # Append using the existing header order instead of rewriting the file
+            file_exists = file_path.exists() and file_path.stat().st_size > 0
+            if file_exists:
+                with open(file_path, 'r', newline='', encoding='utf-8') as file:
+                    fieldnames = next(csv.reader(file), fieldnames)
             
             # Add new payment
             new_payment = {
@@ -261,19 +270,42 @@ class FileOperations:
                 'company': payment_data['company'],
                 'beneficiary': payment_data['beneficiary']
             }
-            existing_payments.append(new_payment)
             
-            # Write all payments back to file
-            with open(file_path, 'w', newline='') as file:
+            # Match the payment's fields to the header regardless of its casing
+            columns = {name.strip().lower(): name for name in fieldnames}
+            if 'reference' not in columns:
+                return False, "Error saving to Treasury: Treasury file has no Reference column"
+            row = {columns[key]: value for key, value in new_payment.items() if key in columns}
+            
+            with open(file_path, 'a' if file_exists else 'w', newline='', encoding='utf-8') as file:
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(existing_payments)
+                if not file_exists:
+                    writer.writeheader()
+                writer.writerow(row)
+            
+            # Keep duplicate detection in step with Treasury
+            self.reference_registry.add(new_payment['reference'])
             
             return True, "Payment added to Treasury successfully"
         except Exception as e:
             error_msg = f"Error saving to Treasury: {str(e)}"
             return False, error_msg
 
+    def treasury_size(self):
+        """Current Treasury size in bytes, for revert_payment"""
+        file_path = self.file_paths['Treasury']
+        return file_path.stat().st_size if file_path.exists() else 0
+
+    def revert_payment(self, reference, size):
+        """Remove a payment appended when Treasury was size bytes long"""
+        file_path = self.file_paths['Treasury']
+        if size == 0:
+            file_path.unlink(missing_ok=True)
+        else:
+            with open(file_path, 'r+b') as file:
+                file.truncate(size)
+        self.reference_registry.discard(reference)
+
     def log_error(self, error_message: str):
         """Log an error message to the error log file"""
         try:
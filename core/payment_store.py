@@ -0,0 +1,164 @@
+from pathlib import Path
+import json
+import os
+import threading
+
+class PaymentStore:
+    """Indexed access to JSON payment documents ({'payments': [...]}).
+
+    Each document is parsed once and cached along with a
+    reference -> (file, position) index. Status changes are appended to a
+    small sidecar log (<file>.log) instead of rewriting the document, and
+    the log is folded back into the JSON file once it reaches
+    compact_every entries. The log size is part of the cache fingerprint, so
+    other instances pick up patches they did not write themselves.
+    """
+
+    def __init__(self, compact_every=100):
+        self.compact_every = compact_every
+        self.documents = {}  # path -> {'data', 'fingerprint', 'log_entries'}
+        self.index = {}  # reference -> [(path, position)]
+        self.lock = threading.RLock()
+
+    def load(self, path_str):
+        """Return the parsed document, reusing the cached copy if unchanged"""
+        path = Path(path_str)
+        key = str(path)
+
+        with self.lock:
+            fingerprint = self._fingerprint(path)
+            cached = self.documents.get(key)
+            if cached and cached['fingerprint'] == fingerprint:
+                return cached['data']
+
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            self._drop_from_index(key)
+            document = {'data': data, 'fingerprint': fingerprint, 'log_entries': 0}
+            self.documents[key] = document
+
+            if isinstance(data, dict) and isinstance(data.get('payments'), list):
+                self._index_document(key, data['payments'])
+                document['log_entries'] = self._replay_log(path, data['payments'])
+
+            return data
+
+    def find(self, reference):
+        """Get (file, position) pairs for a reference"""
+        with self.lock:
+            return list(self.index.get(reference, []))
+
+    def update_status(self, path_str, reference, status):
+        """Patch the status of every payment with this reference in a file"""
+        key = str(Path(path_str))
+
+        with self.lock:
+            data = self.load(key)
+            if not isinstance(data, dict) or not isinstance(data.get('payments'), list):
+                raise ValueError(f"Invalid data structure in file: {path_str}")
+
+            positions = [pos for doc_path, pos in self.index.get(reference, []) if doc_path == key]
+            if not positions:
+                return 0
+
+            # Log first; the cached document only changes once the patch is on disk
+            entries = [{'reference': reference, 'position': pos, 'status': status} for pos in positions]
+            self._append_log(Path(key), entries)
+            for pos in positions:
+                data['payments'][pos]['status'] = status
+
+            document = self.documents[key]
+            document['fingerprint'] = self._fingerprint(Path(key))
+            document['log_entries'] += len(entries)
+            if document['log_entries'] >= self.compact_every:
+                self.compact(key)
+
+            return len(positions)
+
+    def compact(self, path_str):
+        """Fold the sidecar log into the JSON document"""
+        path = Path(path_str)
+        key = str(path)
+
+        with self.lock:
+            document = self.documents.get(key)
+            if not document or document['log_entries'] == 0:
+                return
+
+            temp_file = path.with_suffix(path.suffix + '.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(document['data'], f, indent=4)
+            os.replace(temp_file, path)
+
+            log_file = self._log_path(path)
+            if log_file.exists():
+                log_file.unlink()
+
+            document['fingerprint'] = self._fingerprint(path)
+            document['log_entries'] = 0
+
+    def compact_all(self):
+        """Compact every document with pending log entries"""
+        with self.lock:
+            for key in list(self.documents):
+                self.compact(key)
+
+    def _fingerprint(self, path):
+        """Identify a document version by mtime, size and pending log size"""
+        stat = path.stat()
+        log_file = self._log_path(path)
+        log_size = log_file.stat().st_size if log_file.exists() else 0
+        return (stat.st_mtime_ns, stat.st_size, log_size)
+
+    def _log_path(self, path):
+        """Sidecar status log for a document"""
+        return path.with_name(path.name + '.log')
+
+    def _index_document(self, key, payments):
+        """Add a document's payments to the reference index"""
+        for pos, payment in enumerate(payments):
+            if isinstance(payment, dict) and payment.get('reference') is not None:
+                self.index.setdefault(payment['reference'], []).append((key, pos))
+
+    def _drop_from_index(self, key):
+        """Remove a document's entries before re-indexing it"""
+        cached = self.documents.get(key)
+        if not cached or not isinstance(cached['data'], dict):
+            return
+        for payment in cached['data'].get('payments') or []:
+            if not isinstance(payment, dict):
+                continue
+            locations = self.index.get(payment.get('reference'))
+            if locations:
+                locations[:] = [loc for loc in locations if loc[0] != key]
+                if not locations:
+                    del self.index[payment.get('reference')]
+
+    def _append_log(self, path, entries):
+        """Append status patches to the sidecar log"""
+        lines = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        with open(self._log_path(path), 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def _replay_log(self, path, payments):
+        """Apply pending status patches from the sidecar log"""
+        log_file = self._log_path(path)
+        if not log_file.exists():
+            return 0
+
+        pending = 0
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                pending += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write at the end of the log
+                pos = entry.get('position')
+                # Skip patches that no longer line up with the document
+                if (isinstance(pos, int) and 0 <= pos < len(payments) and
+                        isinstance(payments[pos], dict) and
+                        payments[pos].get('reference') == entry.get('reference')):
+                    payments[pos]['status'] = entry.get('status')
+        return pending
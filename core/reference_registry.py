@@ -0,0 +1,251 @@
+from pathlib import Path
+import csv
+import hashlib
+import io
+import math
+import os
+import struct
+import threading
+
+class BloomFilter:
+    """Fixed-size Bloom filter over payment references"""
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        """Bit positions for a key using double hashing"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        """Add a key to the filter"""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class ReferenceRegistry:
+    """Registry of payment references already written to Treasury.
+
+    Keeps an exact in-memory set plus a Bloom filter, both snapshotted to
+    disk, so a restart only has to read the Treasury rows appended since the
+    last snapshot and contains() never reads Treasury. A Bloom miss proves a
+    reference is new without touching the exact set, which settles a hit.
+    """
+
+    # Snapshot layout: magic, capacity, num_bits, num_hashes, count,
+    # treasury offset covered, treasury header hash; then the filter bits
+    # and the exact references, newline separated
+    SNAPSHOT_MAGIC = b'PRB2'
+    SNAPSHOT_HEADER = struct.Struct('<4sQQIQQ16s')
+
+    def __init__(self, treasury_file, snapshot_file=None, capacity=1000000,
+                 error_rate=0.001, snapshot_every=100):
+        self.treasury_file = Path(treasury_file)
+        self.snapshot_file = Path(snapshot_file) if snapshot_file else \
+            self.treasury_file.with_name('reference_filter.bin')
+        self.error_rate = error_rate
+        self.snapshot_every = snapshot_every
+        self.lock = threading.Lock()
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.references = set()
+        self._treasury_offset = 0
+        self._header_hash = b'\x00' * 16
+        self._pending_adds = 0
+
+        self._load()
+
+    def contains(self, reference):
+        """Check whether a reference is already registered"""
+        reference = self._normalize(reference)
+        if not reference:
+            return False
+
+        with self.lock:
+            if reference not in self.bloom:
+                return False
+            return reference in self.references
+
+    def add(self, reference):
+        """Register a reference that has just been appended to Treasury"""
+        reference = self._normalize(reference)
+        if not reference:
+            return
+
+        with self.lock:
+            if reference in self.references:
+                return
+            self.references.add(reference)
+            self.bloom.add(reference)
+            self._pending_adds += 1
+
+            if self.bloom.count > self.bloom.capacity:
+                self._rebuild(self.bloom.capacity * 2)
+            elif self._pending_adds >= self.snapshot_every:
+                self._save_snapshot()
+
+    def discard(self, reference):
+        """Forget a reference whose Treasury row was removed again"""
+        reference = self._normalize(reference)
+        with self.lock:
+            # The Bloom bit stays set; the exact set settles the false hit
+            self.references.discard(reference)
+
+    def save_snapshot(self):
+        """Persist the Bloom filter so the next start can skip a full scan"""
+        with self.lock:
+            self._save_snapshot()
+
+    def rebuild(self):
+        """Rebuild the registry from a full Treasury scan"""
+        with self.lock:
+            self._rebuild(self.bloom.capacity)
+
+    def _normalize(self, reference):
+        """Normalize reference for comparison"""
+        if reference is None:
+            return ''
+        return str(reference).strip()
+
+    def _load(self):
+        """Load snapshot and catch up on rows appended since it was taken"""
+        try:
+            if self._load_snapshot():
+                self._catch_up()
+                return
+        except Exception as e:
+            print(f"Error loading reference snapshot: {str(e)}")
+
+        self._rebuild(self.bloom.capacity)
+
+    def _catch_up(self):
+        """Register Treasury rows written since the last scan"""
+        if not self.treasury_file.exists():
+            return
+
+        # Treasury was rewritten or truncated, offsets no longer line up
+        if (self._read_header_hash() != self._header_hash or
+                self.treasury_file.stat().st_size < self._treasury_offset):
+            self._rebuild(self.bloom.capacity)
+            return
+
+        self._scan_treasury(self._treasury_offset)
+
+    def _load_snapshot(self):
+        """Load Bloom filter snapshot if it still matches the Treasury file"""
+        if not self.snapshot_file.exists() or not self.treasury_file.exists():
+            return False
+
+        with open(self.snapshot_file, 'rb') as f:
+            header = f.read(self.SNAPSHOT_HEADER.size)
+            if len(header) != self.SNAPSHOT_HEADER.size:
+                return False
+            magic, capacity, num_bits, num_hashes, count, offset, header_hash = \
+                self.SNAPSHOT_HEADER.unpack(header)
+            if magic != self.SNAPSHOT_MAGIC:
+                return False
+
+            bits = f.read((num_bits + 7) // 8)
+            if len(bits) != (num_bits + 7) // 8:
+                return False
+            references = f.read().decode('utf-8').split('\n')
+
+        bloom = BloomFilter(capacity, self.error_rate)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+
+        self.bloom = bloom
+        self.references = set(filter(None, references))
+        self._treasury_offset = offset
+        self._header_hash = header_hash
+        return True
+
+    def _save_snapshot(self):
+        """Write the snapshot atomically"""
+        try:
+            self._catch_up()
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.snapshot_file.with_suffix('.tmp')
+            with open(temp_file, 'wb') as f:
+                f.write(self.SNAPSHOT_HEADER.pack(
+                    self.SNAPSHOT_MAGIC, self.bloom.capacity, self.bloom.num_bits,
+                    self.bloom.num_hashes, self.bloom.count,
+                    self._treasury_offset, self._header_hash
+                ))
+                f.write(self.bloom.bits)
+                f.write('\n'.join(self.references).encode('utf-8'))
+            os.replace(temp_file, self.snapshot_file)
+            self._pending_adds = 0
+        except Exception as e:
+            print(f"Error saving reference snapshot: {str(e)}")
+
+    def _rebuild(self, capacity):
+        """Reset filter and set, then scan Treasury from the start"""
+        self.bloom = BloomFilter(capacity, self.error_rate)
+        self.references = set()
+        self._treasury_offset = 0
+        self._header_hash = self._read_header_hash()
+        self._scan_treasury(0)
+        self._save_snapshot()
+
+    def _scan_treasury(self, offset):
+        """Add Treasury rows from byte offset onwards to the set and filter"""
+        references, end_offset = self._read_references(offset)
+        for reference in references:
+            self.references.add(reference)
+            if reference not in self.bloom:
+                self.bloom.add(reference)
+        self._treasury_offset = end_offset
+
+    def _read_references(self, offset):
+        """Read references from complete Treasury rows after offset"""
+        if not self.treasury_file.exists():
+            return [], 0
+
+        with open(self.treasury_file, 'rb') as f:
+            header_line = f.readline()
+            f.seek(max(offset, len(header_line)))
+            data = f.read()
+
+        # Only consume complete lines; a partial row is picked up next time
+        end = data.rfind(b'\n') + 1
+        start = max(offset, len(header_line))
+        header = next(csv.reader([header_line.decode('utf-8-sig')]), [])
+        column = self._reference_column(header)
+        if column is None:
+            return [], start + end
+
+        references = []
+        for row in csv.reader(io.StringIO(data[:end].decode('utf-8', errors='replace'))):
+            if len(row) > column:
+                reference = self._normalize(row[column])
+                if reference:
+                    references.append(reference)
+        return references, start + end
+
+    def _reference_column(self, header):
+        """Find the reference column regardless of header casing"""
+        for i, name in enumerate(header):
+            if name.strip().lower() == 'reference':
+                return i
+        return None
+
+    def _read_header_hash(self):
+        """Hash of the Treasury header line, used to detect rewrites"""
+        if not self.treasury_file.exists():
+            return b'\x00' * 16
+        with open(self.treasury_file, 'rb') as f:
+            return hashlib.blake2b(f.readline(), digest_size=16).digest()
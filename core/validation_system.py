@@ -4,6 +4,7 @@ import re
 from pathlib import Path
 import json
 import os
+from core.payment_store import PaymentStore
 
 class ValidationSystem:
     def __init__(self):
@@ -11,6 +12,7 @@ class ValidationSystem:
         self.tolerance = Decimal('0.01')  # 1% tolerance
         self.base_dir = Path(__file__).parent.parent
         self.allowed_companies = ['SALAM', 'MVNO']
+        self.payment_store = PaymentStore()
 
     def validate_company(self, company):
         """Validate company name"""
@@ -212,12 +214,15 @@ class ValidationSystem:
         result = {'valid': True, 'error': None}
         
         try:
-            existing_payments = file_handler.read_treasury_file()
-            for existing in existing_payments:
-                if existing['reference'] == payment['reference']:
-                    result['valid'] = False
-                    result['error'] = f"Reference {payment['reference']} already exists in the system"
-                    break
+            registry = getattr(file_handler, 'reference_registry', None)
+            if registry is not None:
+                exists = registry.contains(payment['reference'])
+            else:
+                exists = any(existing['reference'] == payment['reference']
+                             for existing in file_handler.read_treasury_file())
+            if exists:
+                result['valid'] = False
+                result['error'] = f"Reference {payment['reference']} already exists in the system"
         except Exception as e:
             result['valid'] = False
             result['error'] = f"Error checking reference: {str(e)}"
@@ -311,8 +316,7 @@ class ValidationSystem:
             if not path.exists() or path.suffix != '.json':
                 return False
                 
-            with open(path, 'r', encoding='utf-8') as f:
-                json.load(f)  # Try to parse JSON
+            self.payment_store.load(path)  # Parsed once, cached for the update
             return True
         except Exception:
             return False
@@ -328,34 +332,16 @@ class ValidationSystem:
         
         try:
             for path in file_paths:
-                if not self._validate_file_path(path) or not self._validate_json_file(path):
-                    continue
-                    
                 try:
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    updated_count += self.payment_store.update_status(
+                        path, payment_data['reference'], payment_data['status']
+                    )
                 except (json.JSONDecodeError, UnicodeDecodeError):
                     errors.append(f"Invalid JSON format in file: {path}")
-                    continue
-                    
-                if 'payments' not in data:
-                    errors.append(f"Invalid data structure in file: {path}")
-                    continue
-                    
-                modified = False
-                for payment in data['payments']:
-                    if payment.get('reference') == payment_data['reference']:
-                        payment['status'] = payment_data['status']
-                        modified = True
-                        updated_count += 1
-                        
-                if modified:
-                    try:
-                        with open(path, 'w') as f:
-                            json.dump(data, f, indent=4)
-                    except Exception as e:
-                        errors.append(f"Error writing to file {path}: {str(e)}")
-                        updated_count -= 1
+                except ValueError as e:
+                    errors.append(str(e))
+                except OSError as e:
+                    errors.append(f"Error writing to file {path}: {str(e)}")
                         
         except Exception as e:
             errors.append(f"Error updating status: {str(e)}")
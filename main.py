@@ -10,6 +10,7 @@ from ui.folder_tab import FolderTab
 from ui.bank_accounts_tab import BankAccountsTab
 from ui.clearing_tab import ClearingTab
 from ui.lg_operations import LGTab
+from ui.log_viewer import LogViewer
 from core.validation_system import ValidationSystem
 from core.status_tracker import StatusTracker
 from core.file_operations import FileOperations
@@ -148,7 +149,9 @@ class PaymentSystem:
         self.lg_tab.results_tree.tag_configure('expired', foreground='gray', font=("TkDefaultFont", 9))
     
     def check_lg_updates(self):
-        """Periodic check for LG updates"""
+        """Periodic check for edits to the LGs file"""
+        # Only re-parses when the file changed; expiry tags and the urgent
+        # count are kept current by the LG tab's own expiry timer
         self.lg_tab.check_for_updates()
         self.root.after(3600000, self.check_lg_updates)  # Check every hour
 
@@ -720,6 +723,9 @@ Do you want to proceed with this payment?"""
                 if mode == 'w':
                     writer.writeheader()
                 writer.writerow(payment_data)
+            
+            # Keep duplicate detection in step with Treasury
+            self.file_operations.reference_registry.add(payment_data.get('reference'))
                 
             return True
         except Exception as e:
@@ -787,10 +793,26 @@ Do you want to proceed with this payment?"""
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
+        # View menu
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="View", menu=view_menu)
+        view_menu.add_command(label="Audit Log", command=self.show_audit_log)
+        view_menu.add_command(label="Exception Log", command=self.show_exception_log)
+        
         # Show user info
         menubar.add_command(label=f"Logged in as: {self.current_user.username} ({self.current_user.role.value})",
                           state="disabled")
 
+    def show_audit_log(self):
+        """Open the audit log viewer"""
+        LogViewer(self.root, "Audit Log", self.data_dir / "exceptions" / "AUDIT_LOG.csv",
+                  ['timestamp', 'action', 'reference', 'details', 'user', 'status'])
+
+    def show_exception_log(self):
+        """Open the exception log viewer"""
+        LogViewer(self.root, "Exception Log", self.data_dir / "exceptions" / "EXCEPTION_LOG.csv",
+                  ['timestamp', 'reference', 'type', 'description', 'status', 'resolution'])
+
     def show_admin_panel(self):
         """Show the admin panel"""
         from auth.admin_panel import AdminPanel
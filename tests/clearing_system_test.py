@@ -0,0 +1,354 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+import importlib.util
+import numpy as np
+import pandas as pd
+from utils.clearing_system import (ClearingSearchIndex, ClearingStore, ReconciliationView, VendorIndex, AgingReport,
+                                   prepare_clearing_frame, read_bank_statement, match_statement,
+                                   MATCHED, MATCHED_WITHIN_TOLERANCE, UNMATCHED,
+                                   format_halalas, to_halalas, CLEARING_COLUMNS, ALL_COLUMNS)
+from utils.clearing_import import ClearingImport, file_companies
+
+def make_clearing_sheet(count):
+    """Raw clearing sheet as pd.read_excel would return it"""
+    return pd.DataFrame({
+        'Month': [f"2024-{i % 12 + 1:02d}" for i in range(count)],
+        'Transaction Number': [f"TX{i:05d}" for i in range(count)],
+        'Vendor Name': [f"Vendor {i % 7}" for i in range(count)],
+        'Amount': [f"{(i + 1) * 10.5:,.2f}" for i in range(count)],
+        'Notes': [None] * count
+    })
+
+class ClearingSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.df = prepare_clearing_frame(make_clearing_sheet(50))
+
+    def reference(self, text, columns):
+        """Row-by-row substring search the index must agree with"""
+        return np.array([any(text.lower() in str(row[col]).lower() for col in columns)
+                         for _, row in self.df.iterrows()])
+
+    def test_prepare_and_search(self):
+        """Search Matches A Row-By-Row Scan Per Column"""
+        print("\nTest Case 1: Indexed Search")
+
+        self.assertEqual(list(self.df.columns), CLEARING_COLUMNS)
+        self.assertEqual(set(self.df['Comments']), {''})
+
+        index = ClearingSearchIndex(self.df)
+        self.assertIsNone(index.search('  '))
+        for text, column in [('vendor 3', ALL_COLUMNS), ('tx0001', 'Transaction Number'),
+                             ('2024-03', 'Month'), ('2024-03', 'Vendor Name'), ('VENDOR', 'Vendor Name')]:
+            columns = CLEARING_COLUMNS if column == ALL_COLUMNS else [column]
+            self.assertEqual(index.search(text, column).tolist(), self.reference(text, columns).tolist())
+
+        # Separator keeps matches from spanning two cells
+        self.assertFalse(index.search('vendor 0tx', ALL_COLUMNS).any())
+
+    def test_extended_query_narrows_previous_mask(self):
+        """Extending A Query Re-Tests Only Previous Matches"""
+        print("\nTest Case 2: Narrowed Search")
+
+        index = ClearingSearchIndex(self.df)
+        mask = index.search('tx', 'Transaction Number')
+        self.assertTrue(mask.all())
+
+        # Rows outside the previous mask are never re-tested
+        index._last[2][40] = False
+        narrowed = index.search('tx0004', 'Transaction Number')
+        self.assertFalse(narrowed[40])
+        self.assertEqual(int(narrowed.sum()), 9)
+
+        # A different column or a shorter query starts from every row
+        self.assertTrue(index.search('tx000', 'Transaction Number')[40])
+        self.assertEqual(index.search('vendor 1', 'Vendor Name').tolist(),
+                         self.reference('vendor 1', ['Vendor Name']).tolist())
+
+    def test_amounts_held_as_halalas(self):
+        """Amounts Are Int64 Halalas Formatted Only For Display"""
+        print("\nTest Case 3: Halala Amounts")
+
+        self.assertEqual(self.df['Amount'].dtype, np.int64)
+        self.assertEqual(self.df['Amount'].tolist()[:2], [1050, 2100])
+        self.assertEqual(to_halalas(['1,234.56', 0.1, None, 'n/a', -2.5]).tolist(),
+                         [123456, 10, 0, 0, -250])
+        self.assertEqual([format_halalas(v) for v in [123456789, 5, -1050, 0]],
+                         ['1,234,567.89', '0.05', '-10.50', '0.00'])
+
+        # Totals are exact integer sums, and saved halalas are not scaled again
+        self.assertEqual(self.df['Amount'].sum(), sum(round((i + 1) * 1050) for i in range(50)))
+        saved = pd.DataFrame(self.df.to_dict('records'))
+        self.assertTrue(prepare_clearing_frame(saved, 'halala').equals(self.df))
+
+        # Amount searches match the displayed text
+        index = ClearingSearchIndex(self.df)
+        self.assertEqual(np.flatnonzero(index.search('105.00', 'Amount')).tolist(), [9])
+
+class ReconciliationViewTest(unittest.TestCase):
+    def test_grouped_balances_and_drill_down(self):
+        """Group Balances Match Pandas And Drill Down By Position"""
+        print("\nTest Case 4: Reconciliation View")
+
+        df = prepare_clearing_frame(pd.DataFrame({
+            'Month': ['Jan', 'Feb', 'Jan', 'Mar', 'Feb', 'Jan'],
+            'Transaction Number': ['T1', 'T2', 'T1', 'T3', 'T2', 'T4'],
+            'Vendor Name': ['A', 'B', 'A', 'C', 'B', 'A'],
+            'Amount': ['100.00', '-50.25', '-100.00', '10.00', '50.25', '7.5']
+        }))
+        view = ReconciliationView(df)
+
+        summary = view.summary('Transaction Number')
+        self.assertEqual(summary['Group'].tolist(), ['T1', 'T2', 'T3', 'T4'])
+        self.assertEqual(summary['Count'].tolist(), [2, 2, 1, 1])
+        self.assertEqual(summary['Net Balance'].tolist(), [0, 0, 1000, 750])
+        self.assertEqual(summary['Status'].tolist(), ['Cleared', 'Cleared', 'Open', 'Open'])
+
+        expected = df.groupby('Vendor Name')['Amount'].agg(['count', 'sum'])
+        vendors = view.summary('Vendor Name').set_index('Group')
+        self.assertEqual(vendors['Count'].tolist(), expected['count'].tolist())
+        self.assertEqual(vendors['Net Balance'].tolist(), expected['sum'].tolist())
+
+        self.assertEqual(view.positions('Month', 'Jan').tolist(), [0, 2, 5])
+        self.assertEqual(view.positions('Month', 'Dec').tolist(), [])
+
+        # Cached per column until invalidated
+        self.assertIs(view.summary('Month'), view.summary('Month'))
+        cached = view.summary('Month')
+        view.invalidate()
+        self.assertIsNot(view.summary('Month'), cached)
+
+class VendorIndexTest(unittest.TestCase):
+    def test_prefix_substring_and_positions(self):
+        """Vendor Lookups Agree With A Scan Of Unique Names"""
+        print("\nTest Case 5: Vendor Index")
+
+        names = ['Acme Trading', 'acme  trading ', 'Beta Supplies', 'Acme Steel',
+                 'Gamma', 'Beta Supplies', 'Al Rajhi', '']
+        df = prepare_clearing_frame(pd.DataFrame({'Vendor Name': names, 'Amount': [1] * len(names)}))
+        index = VendorIndex(df)
+
+        # Spellings are merged and shown as first seen
+        code = index.code('ACME TRADING')
+        self.assertEqual(index.display[code], 'Acme Trading')
+        self.assertEqual(index.positions(code).tolist(), [0, 1])
+        self.assertIsNone(index.code('Delta'))
+
+        self.assertEqual(index.display[index.prefix('acme')].tolist(), ['Acme Steel', 'Acme Trading'])
+        self.assertEqual(len(index.prefix('z')), 0)
+
+        unique = index.names.tolist()
+        for text in ['ta', 'supp', 'eel', 'acme t', 'nothing', 'a']:
+            found = sorted(index.names[index.substring(text)].tolist())
+            self.assertEqual(found, sorted(n for n in unique if text in n))
+
+        results = index.search('a')
+        self.assertEqual([name for name, _, _ in results][:3], ['Acme Steel', 'Acme Trading', 'Al Rajhi'])
+        self.assertEqual(len(results), len({n for n in unique if 'a' in n}))
+        self.assertEqual(dict((name, count) for name, count, _ in results)['Beta Supplies'], 2)
+        self.assertEqual(index.search('  '), [])
+
+class StatementMatchTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_one_to_one_matching_with_tolerance(self):
+        """Rows Match Statement Lines One-To-One Within Tolerance"""
+        print("\nTest Case 6: Statement Matching")
+
+        clearing = prepare_clearing_frame(pd.DataFrame({
+            'Transaction Number': ['TX1', 'tx1 ', 'TX2', 'TX3', 'TX3', 'TX4', 'TX5', ''],
+            'Amount': ['-100.00', '-100.00', '250.00', '10.00', '10.50', '99.00', '5.00', '1.00']
+        }))
+        path = self.test_dir / "BS_SALAM_CURRENT.csv"
+        pd.DataFrame({
+            'company': ['SALAM'] * 6,
+            'reference': ['TX1', 'TX2', 'TX3', 'TX3', 'TX4', 'TX1'],
+            'amount': ['100.00', '250.00', '10.20', '10.40', '97.00', '1,000.00'],
+            'date': ['2024-01-01'] * 6
+        }).to_csv(path, index=False)
+        statement = read_bank_statement(path)
+        self.assertEqual(statement['amount'].tolist(), [10000, 25000, 1020, 1040, 9700, 100000])
+
+        status, lines = match_statement(clearing, statement)
+        self.assertEqual(status.tolist(), [MATCHED, UNMATCHED, MATCHED] + [UNMATCHED] * 5)
+
+        # Both TX3 rows find a distinct line; TX4 is outside the window
+        status, lines = match_statement(clearing, statement, tolerance=50)
+        self.assertEqual(status.tolist(), [MATCHED, UNMATCHED, MATCHED, MATCHED_WITHIN_TOLERANCE,
+                                           MATCHED_WITHIN_TOLERANCE, UNMATCHED, UNMATCHED, UNMATCHED])
+        self.assertEqual(sorted(lines[3:5].tolist()), [2, 3])
+        self.assertEqual(lines[[0, 2]].tolist(), [0, 1])
+        self.assertEqual(lines[5], -1)
+
+class AgingReportTest(unittest.TestCase):
+    def test_open_items_bucketed_by_month_age(self):
+        """Open Items Are Bucketed By Month Age And Cached"""
+        print("\nTest Case 7: Aging Report")
+
+        df = prepare_clearing_frame(pd.DataFrame({
+            'Month': ['2024-06', '2024-05', 'Apr 2024', '2024-03-15', '2023-01', 'January', '2024-08'],
+            'Vendor Name': ['A', 'A', 'B', 'B', 'A', 'B', 'B'],
+            'Amount': ['10.00', '20.00', '30.00', '40.00', '50.00', '60.00', '70.00']
+        }))
+        aging = AgingReport(df, 'Salam')
+        self.assertEqual(aging.bucket_codes(pd.Period('2024-06', freq='M')).tolist(), [0, 1, 2, 3, 3, 4, 0])
+
+        report = aging.report('2024-06-20').set_index('Vendor Name')
+        self.assertEqual(list(report.columns), AgingReport.REPORT_COLUMNS[:1] + AgingReport.REPORT_COLUMNS[2:])
+        self.assertEqual(report.loc['A', AgingReport.BUCKETS].tolist(), [1000, 2000, 0, 5000, 0])
+        self.assertEqual(report.loc['B', AgingReport.BUCKETS].tolist(), [7000, 0, 3000, 4000, 6000])
+        self.assertEqual(report['Total'].tolist(), [8000, 20000])
+        self.assertIs(aging.report('2024-06'), aging.report('2024-06'))
+
+        # Matched items drop out once the cache is invalidated
+        df.loc[[0, 4], 'Match Status'] = [MATCHED, MATCHED_WITHIN_TOLERANCE]
+        aging.invalidate()
+        report = aging.report('2024-06')
+        self.assertEqual(report.set_index('Vendor Name').loc['A', 'Total'], 2000)
+        self.assertEqual(set(report['Company']), {'Salam'})
+
+class ClearingStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.store = ClearingStore(self.test_dir)
+        self.df = prepare_clearing_frame(make_clearing_sheet(20))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_columnar_round_trip_and_journaled_edits(self):
+        """Note Edits Append To A Journal Replayed On Load"""
+        print("\nTest Case 8: Columnar Store")
+
+        self.df['Match Status'] = MATCHED
+        self.store.save('Salam', self.df)
+        self.assertTrue(self.store.load('Salam').equals(self.df))
+        self.assertTrue(self.store.load('MVNO').empty)
+
+        # One long note does not widen the stored text columns
+        size = self.store.data_path('Salam').stat().st_size
+        wide = self.df.copy()
+        wide.iat[0, wide.columns.get_loc('Notes')] = 'Long note. ' * 200 + 'End'
+        self.store.save('Salam', wide)
+        self.assertLess(self.store.data_path('Salam').stat().st_size, size + 1000)
+        self.assertTrue(self.store.load('Salam').equals(wide))
+        self.store.save('Salam', self.df)
+
+        before = self.store.data_path('Salam').stat().st_mtime_ns
+        self.df.iat[3, self.df.columns.get_loc('Notes')] = 'Cleared with bank'
+        self.store.record_edits('Salam', [(3, 'Notes', 'Cleared with bank'), (5, 'Comments', 'Follow up')])
+        self.assertEqual(self.store.data_path('Salam').stat().st_mtime_ns, before)
+
+        loaded = self.store.load('Salam')
+        self.assertEqual(loaded.at[3, 'Notes'], 'Cleared with bank')
+        self.assertEqual(loaded.at[5, 'Comments'], 'Follow up')
+        self.assertEqual(loaded['Amount'].dtype, np.int64)
+
+        with self.assertRaises(ValueError):
+            self.store.record_edits('Salam', [(1, 'Amount', '5')])
+
+        # A long journal is compacted into the columnar file
+        self.store.COMPACT_AFTER = 4
+        self.store.record_edits('Salam', [(7, 'Notes', 'x')], loaded)
+        self.assertTrue(self.store.edits_path('Salam').exists())
+        loaded.iat[8, loaded.columns.get_loc('Notes')] = 'y'
+        self.store.record_edits('Salam', [(8, 'Notes', 'y')], loaded)
+        self.assertFalse(self.store.edits_path('Salam').exists())
+        self.assertEqual(self.store.load('Salam').at[8, 'Notes'], 'y')
+
+    def test_legacy_migration_and_schema_version(self):
+        """Legacy JSON Migrates And Newer Schemas Are Refused"""
+        print("\nTest Case 9: Store Migration")
+
+        records = make_clearing_sheet(3).to_dict('records')
+        with open(self.store.legacy_path('MVNO'), 'w', encoding='utf-8') as f:
+            json.dump({'last_updated': '2024-01-01', 'records': records}, f)
+
+        migrated = self.store.load('MVNO')
+        self.assertEqual(migrated['Amount'].tolist(), [1050, 2100, 3150])
+        self.assertTrue(self.store.data_path('MVNO').exists())
+
+        with np.load(self.store.data_path('MVNO')) as data:
+            arrays = {name: data[name] for name in data.files}
+        arrays['__schema__'] = np.array([99])
+        np.savez(self.store.data_path('MVNO'), **arrays)
+        with self.assertRaises(ValueError):
+            self.store.load('MVNO')
+
+        # Files from before text columns were encoded still load
+        arrays = {'__schema__': np.array([2]), 'Amount': np.array([5, 7], dtype=np.int64),
+                  'Vendor Name': np.array(['Acme', 'Zain']), 'Notes': np.array(['', 'paid'])}
+        np.savez(self.store.data_path('MVNO'), **arrays)
+        old = self.store.load('MVNO')
+        self.assertEqual(old['Vendor Name'].tolist(), ['Acme', 'Zain'])
+        self.assertEqual(old['Notes'].tolist(), ['', 'paid'])
+        self.assertEqual(old['Match Status'].tolist(), ['', ''])
+
+class ClearingImportTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_import_combines_files_in_order(self):
+        """Files Are Normalized, Concatenated In Order, Failures Reported"""
+        print("\nTest Case 10: Multi-File Import")
+
+        sheets = {'a.xls': make_clearing_sheet(3), 'b.xls': make_clearing_sheet(2)}
+        paths = [str(self.test_dir / name) for name in ['a.xls', 'bad.xls', 'b.xls']]
+
+        def read_excel(path):
+            name = Path(path).name
+            if name not in sheets:
+                raise ValueError("File is not a workbook")
+            return sheets[name]
+
+        progress = []
+        with mock.patch('pandas.read_excel', side_effect=read_excel):
+            df, errors = ClearingImport(workers=1).run(paths, lambda *args: progress.append(args))
+
+        self.assertEqual(df['Transaction Number'].tolist(), ['TX00000', 'TX00001', 'TX00002', 'TX00000', 'TX00001'])
+        self.assertEqual(df['Amount'].dtype, np.int64)
+        self.assertEqual(list(errors), [paths[1]])
+        self.assertEqual([done for done, _, _ in progress], [1, 2, 3])
+
+    @unittest.skipUnless(importlib.util.find_spec('openpyxl'), "openpyxl not installed")
+    def test_streamed_xlsx_in_worker_processes(self):
+        """Workbooks Are Streamed In Worker Processes"""
+        print("\nTest Case 11: Parallel Import")
+
+        paths = []
+        for i in range(3):
+            path = self.test_dir / f"clearing_{i}.xlsx"
+            make_clearing_sheet(10 + i).to_excel(path, index=False)
+            paths.append(path)
+
+        df, errors = ClearingImport(workers=2).run(paths)
+        self.assertEqual(errors, {})
+        self.assertEqual(len(df), 33)
+        self.assertEqual(df['Amount'].iloc[:3].tolist(), [1050, 2100, 3150])
+
+    def test_files_routed_by_gl_account(self):
+        """Exports Belong To The Company Whose GL Account They Name"""
+        print("\nTest Case 12: Import Routing")
+
+        gl_accounts = {'Salam': '10258', 'MVNO': '10226'}
+        companies = file_companies(["GL_10258_Jan.xlsx", "/exports/10226 clearing.xls",
+                                    "clearing.xlsx", "GL_102580.xlsx"], gl_accounts, 'Salam')
+        self.assertEqual(list(companies.values()), ['Salam', 'MVNO', 'Salam', 'Salam'])
+        self.assertEqual(file_companies(["clearing.xlsx"], gl_accounts, 'MVNO'), {"clearing.xlsx": 'MVNO'})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
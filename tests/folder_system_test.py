@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+from utils.folder_system import FolderManager, Company, account_document_template
+from utils.document_catalog import DocumentCatalog
+
+class FolderManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.manager = FolderManager(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_missing_folders_from_one_scan(self):
+        """Missing Folders Come From One Cached Scan Per Company"""
+        print("\nTest Case 1: Cached Folder Scan")
+
+        (self.test_dir / "Salam" / "2024" / "January").mkdir(parents=True)
+        (self.test_dir / "Salam" / "2024" / "february").mkdir(parents=True)
+        (self.test_dir / "Salam" / "2024" / "notes.txt").write_text("not a folder")
+
+        with mock.patch('utils.folder_system.os.scandir', wraps=os.scandir) as scandir:
+            missing = self.manager.get_missing_folders()
+            self.assertTrue(self.manager.check_folder_exists(Company.SALAM, 2024, "February"))
+            self.assertFalse(self.manager.check_folder_exists(Company.SALAM, 2024, "March"))
+            # Salam root and its one year, plus the absent MVNO root
+            self.assertEqual(scandir.call_count, 3)
+
+        months_2024 = [m for m in missing['Salam'] if m.endswith('2024')]
+        self.assertNotIn("January 2024", months_2024)
+        self.assertNotIn("February 2024", months_2024)
+        self.assertIn("March 2024", months_2024)
+        self.assertIn("January 2024", missing['MVNO'])
+
+        # Folders created here are visible without a rescan
+        with mock.patch('utils.folder_system.os.scandir', wraps=os.scandir) as scandir:
+            self.assertTrue(self.manager.create_folder(Company.SALAM, 2024, "March"))
+            self.assertNotIn("March 2024", self.manager.get_missing_folders(Company.SALAM)['Salam'])
+            self.assertEqual(scandir.call_count, 0)
+
+        # Folders created elsewhere appear once the TTL lapses
+        (self.test_dir / "MVNO" / "2024" / "January").mkdir(parents=True)
+        self.assertFalse(self.manager.check_folder_exists(Company.MVNO, 2024, "January"))
+        self.manager.scan_ttl = 0
+        self.assertTrue(self.manager.check_folder_exists(Company.MVNO, 2024, "January"))
+
+    def test_provision_is_idempotent(self):
+        """Provisioning Creates Only Missing Folders And Reports Them"""
+        print("\nTest Case 2: Folder Provisioning")
+
+        (self.test_dir / "Salam" / "2024" / "January").mkdir(parents=True)
+        report = self.manager.provision([Company.SALAM, Company.MVNO], [2024], months=["January", "February"])
+        self.assertEqual(sorted(report['created']), sorted(
+            str(self.test_dir / company / "2024" / month)
+            for company, month in [("Salam", "February"), ("MVNO", "January"), ("MVNO", "February")]))
+        self.assertEqual((report['existing'], report['failed']), (1, {}))
+        self.assertTrue(self.manager.check_folder_exists(Company.MVNO, 2024, "February"))
+
+        template = {Company.SALAM: account_document_template(["Alinma", ""])}
+        report = self.manager.provision([Company.SALAM], [2024], template, months=["January"])
+        self.assertEqual(len(report['created']), 3)
+        self.assertTrue((self.test_dir / "Salam" / "2024" / "January" / "Alinma" / "auth_letter").is_dir())
+
+        # A rerun finds the template folders in one scan per level and creates nothing
+        (self.test_dir / "Salam" / "2024" / "January" / "Alinma" / "other_docs").rmdir()
+        with mock.patch.object(FolderManager, '_make_folder', wraps=FolderManager._make_folder) as make_folder, \
+                mock.patch('utils.folder_system.os.scandir', wraps=os.scandir) as scandir:
+            report = self.manager.provision([Company.SALAM], [2024], template, months=["January", "February"])
+        salam = self.test_dir / "Salam" / "2024"
+        self.assertEqual(sorted(report['created']), sorted(
+            [str(salam / "January" / "Alinma" / "other_docs")] +
+            [str(salam / "February" / "Alinma" / doc_type) for doc_type in ["iban_letter", "auth_letter", "other_docs"]]))
+        self.assertEqual(report['existing'], 2)
+        self.assertEqual(make_folder.call_count, 4)
+        # January and its Alinma folder, plus February
+        self.assertEqual(scandir.call_count, 3)
+
+        with mock.patch.object(FolderManager, '_make_folder') as make_folder:
+            report = self.manager.provision([Company.SALAM], [2024], template, months=["January"])
+        self.assertEqual((report['created'], report['existing']), ([], 3))
+        make_folder.assert_not_called()
+
+        (self.test_dir / "MVNO" / "2025").write_text("a file where a year folder belongs")
+        report = self.manager.provision([Company.MVNO], [2025], months=["March"])
+        self.assertEqual(list(report['failed']), [str(self.test_dir / "MVNO" / "2025" / "March")])
+
+class DocumentCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.root = self.test_dir / "Companies"
+        self.catalog = DocumentCatalog(self.root, self.test_dir / "catalog.db")
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.test_dir)
+
+    def add_file(self, relative, content="x"):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def test_incremental_scan_and_search(self):
+        """Catalog Rescans Incrementally And Searches By Name And Metadata"""
+        print("\nTest Case 3: Document Catalog")
+
+        self.add_file("Salam/2024/January/Bank_Statement_Jan.pdf")
+        self.add_file("Salam/2024/march/Vendor Invoice 17.pdf")
+        self.add_file("Salam/2024/March/Alinma/iban_letter/letter.pdf")
+        self.add_file("MVNO/2025/February/summary.xlsx")
+        self.assertEqual(self.catalog.scan(), {'files': 4, 'added': 4, 'updated': 0, 'removed': 0})
+
+        found = self.catalog.search("statement")
+        self.assertEqual([(d['company'], d['year'], d['month'], d['doc_type']) for d in found],
+                         [('Salam', 2024, 'January', 'Statement')])
+        self.assertEqual(self.catalog.search(doc_type='iban_letter')[0]['month'], 'March')
+        self.assertEqual(self.catalog.search("invoice", month='March')[0]['doc_type'], 'Invoice')
+        self.assertEqual([d['name'] for d in self.catalog.search(company='MVNO')], ['summary.xlsx'])
+        self.assertEqual(len(self.catalog.search("pd")), 3)
+        self.assertEqual(self.catalog.search("100%"), [])
+
+        # Only changed and removed files are rewritten
+        self.add_file("MVNO/2025/February/summary.xlsx", "changed contents")
+        (self.root / "Salam/2024/January/Bank_Statement_Jan.pdf").unlink()
+        self.assertEqual(self.catalog.scan(), {'files': 3, 'added': 0, 'updated': 1, 'removed': 1})
+        self.assertEqual(self.catalog.search("statement"), [])
+        self.assertEqual(self.catalog.scan(), {'files': 3, 'added': 0, 'updated': 0, 'removed': 0})
+
+        # The catalog survives a restart
+        self.catalog.close()
+        self.catalog = DocumentCatalog(self.root, self.test_dir / "catalog.db")
+        self.assertEqual(self.catalog.search("invoice 17")[0]['year'], 2024)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from ui.keyed_tree import KeyedTreeAdapter, unique_keys
+
+class FakeTree:
+    """Flat Treeview stand-in that records every call the adapter makes"""
+    def __init__(self):
+        self.children = []
+        self.items = {}
+        self.selected = ()
+        self.calls = []
+        self.jobs = {}
+        self.top = 0.0
+
+    def insert(self, parent, index, iid=None, text='', values=(), tags=()):
+        self.calls.append(('insert', iid))
+        index = len(self.children) if index == 'end' else index
+        self.children.insert(index, iid)
+        self.items[iid] = {'text': text, 'values': tuple(values), 'tags': tuple(tags)}
+        return iid
+
+    def delete(self, *iids):
+        self.calls.append(('delete',) + iids)
+        for iid in iids:
+            self.children.remove(iid)
+            del self.items[iid]
+        self.selected = tuple(iid for iid in self.selected if iid not in iids)
+
+    def move(self, iid, parent, index):
+        self.calls.append(('move', iid))
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def item(self, iid, **options):
+        self.calls.append(('item', iid))
+        self.items[iid].update({k: tuple(v) if k != 'text' else v for k, v in options.items()})
+
+    def get_children(self, item=''):
+        return tuple(self.children)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selected = tuple(items)
+
+    def yview(self):
+        return (self.top, 1.0)
+
+    def yview_moveto(self, fraction):
+        self.top = fraction
+
+    def after(self, ms, func, *args):
+        job = f"after#{len(self.jobs)}"
+        self.jobs[job] = (func, args)
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_jobs(self):
+        while self.jobs:
+            job = next(iter(self.jobs))
+            func, args = self.jobs.pop(job)
+            func(*args)
+
+    def rows(self):
+        return [(iid, self.items[iid]['values']) for iid in self.children]
+
+class KeyedTreeAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.tree = FakeTree()
+        self.adapter = KeyedTreeAdapter(self.tree)
+
+    def test_only_changes_are_applied(self):
+        """Unchanged Rows Are Left Alone"""
+        print("\nTest Case 1: Keyed Diff")
+
+        self.adapter.sync([('a', (1,)), ('b', (2,)), ('c', (3,))])
+        self.tree.selected = ('b',)
+        self.tree.calls = []
+
+        self.adapter.sync([('a', (1,)), ('b', (20,)), ('d', (4,))])
+        self.assertEqual(self.tree.calls, [('delete', 'c'), ('item', 'b'), ('insert', 'd')])
+        self.assertEqual(self.tree.rows(), [('a', (1,)), ('b', (20,)), ('d', (4,))])
+        self.assertEqual(self.tree.selection(), ('b',))
+
+        # Identical data touches nothing
+        self.tree.calls = []
+        self.adapter.sync([('a', (1,)), ('b', (20,)), ('d', (4,))])
+        self.assertEqual(self.tree.calls, [])
+
+    def test_reorder_and_scroll(self):
+        """Reordered Rows Are Moved And Scroll Is Kept"""
+        print("\nTest Case 2: Keyed Moves")
+
+        self.adapter.sync([(k, (k,)) for k in 'abcd'])
+        self.tree.top = 0.5
+        self.adapter.sync([(k, (k,)) for k in 'dbxa'])
+        self.assertEqual(self.tree.children, list('dbxa'))
+        self.assertEqual(self.tree.top, 0.5)
+
+        with self.assertRaises(ValueError):
+            self.adapter.sync([('a', (1,)), ('a', (2,))])
+
+    def test_chunked_sync(self):
+        """Chunked Sync Spreads Work Across Ticks"""
+        print("\nTest Case 3: Chunked Sync")
+
+        self.adapter.sync([(str(i), (i,)) for i in range(25)], chunk_size=10)
+        self.assertEqual(len(self.tree.children), 10)
+        self.assertTrue(self.adapter.pending())
+        self.tree.run_jobs()
+        self.assertFalse(self.adapter.pending())
+        self.assertEqual(self.tree.children, [str(i) for i in range(25)])
+
+        # A new sync abandons the unfinished one
+        self.adapter.sync([(str(i), (i, 'x')) for i in range(25)], chunk_size=10)
+        self.adapter.sync([(str(i), (i, 'y')) for i in range(5)], chunk_size=10)
+        self.tree.run_jobs()
+        self.assertEqual(self.tree.rows(), [(str(i), (i, 'y')) for i in range(5)])
+
+    def test_unique_keys(self):
+        """Repeated Keys Get Suffixes"""
+        print("\nTest Case 4: Unique Keys")
+
+        self.assertEqual(unique_keys(['a', 'b', 'a', 1, 'a']), ['a', 'b', 'a#1', '1', 'a#2'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,174 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+import pandas as pd
+from utils.lg_system import (LGSnapshotLoader, LGExpiryScheduler, build_snapshot,
+                             classify_expiry, expiry_tags)
+
+def make_lg_sheet(end_dates):
+    """Raw LGs sheet as pd.read_excel would return it"""
+    return pd.DataFrame({
+        'Sequence No.': list(range(1, len(end_dates) + 1)),
+        'Vendor Name': [f"Vendor {i}" for i in range(len(end_dates))],
+        'LG Number': [f"LG-{i:04d}" for i in range(len(end_dates))],
+        'Start Date': ['2024-01-01'] * len(end_dates),
+        'End Date': end_dates,
+        'Type of LG': ['Performance'] * len(end_dates),
+        'Related To': ['Contract'] * len(end_dates),
+        'Amount': [1000] * len(end_dates)
+    })
+
+class LGSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.lg_file = self.test_dir / "LGs.xlsx"
+        self.lg_file.write_bytes(b'placeholder')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_build_snapshot_types_columns(self):
+        """Snapshot Parses Dates And Drops Invalid Rows"""
+        print("\nTest Case 1: Typed Snapshot")
+
+        snapshot = build_snapshot(make_lg_sheet(['2030-01-01', 'not a date']), (1, 1))
+        self.assertEqual(len(snapshot.df), 1)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(snapshot.df['End Date']))
+
+        today = datetime(2029, 12, 25)
+        self.assertEqual(snapshot.with_days_remaining(today)['Days Remaining'].tolist(), [7])
+
+        with self.assertRaises(ValueError):
+            build_snapshot(make_lg_sheet(['2030-01-01']).drop(columns=['LG Number']), (1, 1))
+
+    def test_vectorized_tags_and_cached_summary(self):
+        """Vectorized Tags Match Per-Row Classification"""
+        print("\nTest Case 2: Vectorized Tags")
+
+        days = [-5, -1, 0, 3, 4, 7, 8, 30]
+        self.assertEqual(expiry_tags(days).tolist(),
+                         ['expired', 'expired', 'urgent', 'urgent', 'warning', 'warning', 'normal', 'normal'])
+
+        snapshot = build_snapshot(make_lg_sheet(['2030-01-01', '2030-02-01', '2030-03-01']), (1, 1))
+        self.assertEqual(snapshot.with_days_remaining(datetime(2029, 12, 30))['Tag'].tolist(),
+                         ['urgent', 'normal', 'normal'])
+
+        rows = snapshot.summary_rows()
+        self.assertEqual(rows, [('Performance', 3, '3,000.00')])
+        with mock.patch.object(snapshot.df, 'groupby') as groupby:
+            self.assertIs(snapshot.summary_rows(), rows)
+            groupby.assert_not_called()
+
+    def test_unchanged_file_is_not_reparsed(self):
+        """Unchanged File Reuses Cached Snapshot"""
+        print("\nTest Case 3: Snapshot Cache")
+
+        loader = LGSnapshotLoader(self.lg_file)
+        with mock.patch('pandas.read_excel', return_value=make_lg_sheet(['2030-01-01'])) as read_excel:
+            first, changed = loader.load()
+            self.assertTrue(changed)
+            second, changed = loader.load()
+            self.assertFalse(changed)
+            self.assertIs(first, second)
+            self.assertEqual(read_excel.call_count, 1)
+
+            # Any change to size or mtime triggers a re-parse
+            self.lg_file.write_bytes(b'placeholder, edited')
+            _, changed = loader.load()
+            self.assertTrue(changed)
+            self.assertEqual(read_excel.call_count, 2)
+
+    def test_load_async_runs_off_thread(self):
+        """Background Load Reports Through Callbacks"""
+        print("\nTest Case 4: Background Load")
+
+        loader = LGSnapshotLoader(self.lg_file)
+        done = threading.Event()
+        calls = []
+
+        def on_loaded(snapshot, changed):
+            calls.append((threading.current_thread(), snapshot, changed))
+            done.set()
+
+        with mock.patch('pandas.read_excel', return_value=make_lg_sheet(['2030-01-01'])):
+            self.assertTrue(loader.load_async(on_loaded, lambda error: done.set()))
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNot(calls[0][0], threading.current_thread())
+        self.assertTrue(calls[0][2])
+
+        errors = []
+        done.clear()
+        self.lg_file.unlink()
+        loader.load_async(lambda *args: done.set(), lambda error: (errors.append(error), done.set()))
+        self.assertTrue(done.wait(5))
+        self.assertIsInstance(errors[0], FileNotFoundError)
+
+class LGExpirySchedulerTest(unittest.TestCase):
+    def test_classification_matches_days_remaining(self):
+        """Tags Follow Whole Days Remaining"""
+        print("\nTest Case 5: Expiry Classification")
+
+        now = datetime(2024, 6, 1, 12, 0)
+        end_dates = pd.to_datetime(['2024-06-01', '2024-06-04', '2024-06-05',
+                                    '2024-06-08', '2024-06-09', '2024-06-20'])
+        days = [(end - now).days for end in end_dates]
+        self.assertEqual(days, [-1, 2, 3, 6, 7, 18])
+        self.assertEqual([classify_expiry(end, now) for end in end_dates],
+                         ['expired', 'urgent', 'urgent', 'warning', 'warning', 'normal'])
+
+    def test_advance_updates_only_crossed(self):
+        """Only Crossed LGs Are Reclassified"""
+        print("\nTest Case 6: Expiry Heap")
+
+        now = datetime(2024, 6, 1, 12, 0)
+        scheduler = LGExpiryScheduler()
+        scheduler.load({
+            'a': pd.Timestamp('2024-06-09'),   # warning now, urgent after 2024-06-05
+            'b': pd.Timestamp('2024-06-10'),   # normal now, warning after 2024-06-02
+            'c': pd.Timestamp('2024-07-01'),   # normal for weeks
+            'd': pd.Timestamp('2024-05-01')    # already expired, never due again
+        }, now)
+        self.assertEqual(scheduler.urgent_count, 2)
+        self.assertEqual(scheduler.next_due(), datetime(2024, 6, 2))
+        self.assertEqual(len(scheduler.heap), 3)
+
+        # Nothing is due exactly at the crossing instant
+        self.assertEqual(scheduler.advance(datetime(2024, 6, 2)), {})
+        self.assertEqual(scheduler.advance(datetime(2024, 6, 2, 0, 1)), {'b': 'warning'})
+        self.assertEqual(scheduler.urgent_count, 3)
+        self.assertEqual(scheduler.next_due(), datetime(2024, 6, 5))
+
+        changed = scheduler.advance(datetime(2024, 6, 10, 1, 0))
+        self.assertEqual(changed, {'a': 'expired', 'b': 'expired'})
+        self.assertEqual(scheduler.tags['c'], 'normal')
+        self.assertEqual(scheduler.urgent_count, 3)
+
+    def test_scheduler_matches_full_reclassification(self):
+        """Incremental Tags Match A Full Recompute"""
+        print("\nTest Case 7: Expiry Consistency")
+
+        start = datetime(2024, 1, 1, 9, 30)
+        end_dates = {str(i): pd.Timestamp('2024-01-01') + timedelta(hours=7 * i) for i in range(200)}
+        scheduler = LGExpiryScheduler()
+        scheduler.load(end_dates, start)
+
+        for step in range(1, 80):
+            now = start + timedelta(hours=5 * step)
+            scheduler.advance(now)
+            expected = {key: classify_expiry(end, now) for key, end in end_dates.items()}
+            self.assertEqual(scheduler.tags, expected)
+            self.assertEqual(scheduler.urgent_count,
+                             sum(1 for tag in expected.values() if tag != 'normal'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from utils.payment_batch import PaymentBatch
+from utils.payment_processor import PaymentProcessor
+from tests.payment_processor_benchmark import make_payment
+
+def write_batch_file(path, count, invalid_every=0):
+    """Write count payments as NDJSON, corrupting every Nth reference"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            payment = make_payment(i)
+            if invalid_every and i % invalid_every == invalid_every - 1:
+                payment['reference'] = 'invalid'
+            f.write(json.dumps(payment, default=str) + '\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="PaymentBatch validation benchmark")
+    parser.add_argument('--payments', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="payment_batch_"))
+    try:
+        batch_file = work_dir / "batch.ndjson"
+        write_batch_file(batch_file, args.payments)
+
+        print(f"{'workers':>8} {'payments':>9} {'ok':>7} {'validate':>9} {'commit':>8} {'per sec':>10}")
+        for workers in args.workers:
+            files_dir = work_dir / f"files_{workers}"
+            processor = PaymentProcessor(files_dir)
+            try:
+                results, stats = PaymentBatch(processor, workers=workers).process_file(batch_file)
+            finally:
+                processor.close()
+                shutil.rmtree(files_dir, ignore_errors=True)
+            print(f"{stats['workers']:>8} {stats['payments']:>9} {stats['succeeded']:>7} "
+                  f"{stats['validate_seconds']:>9.2f} {stats['commit_seconds']:>8.2f} "
+                  f"{stats['payments'] / stats['seconds']:>10.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
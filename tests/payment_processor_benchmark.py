@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import shutil
+import string
+import tempfile
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from utils.payment_processor import PaymentProcessor
+from utils.async_payment_processor import AsyncPaymentProcessor
+
+def make_payment(index):
+    """Build a valid payment with a unique XXX-YYYY-NNNN reference"""
+    prefix_index, number = divmod(index, 10000)
+    letters = string.ascii_uppercase
+    prefix = (letters[prefix_index // 676 % 26] + letters[prefix_index // 26 % 26] +
+              letters[prefix_index % 26])
+    return {
+        'company': 'SALAM',
+        'beneficiary': {
+            'name': 'Benchmark Vendor',
+            'account': 'SA4420152043595120123456',
+            'bank': 'Saudi National Bank'
+        },
+        'reference': f"{prefix}-{datetime.now().year}-{number:04d}",
+        'amount': Decimal('1000.00'),
+        'date': datetime.now(),
+        'cnp_approval': True
+    }
+
+def run_benchmark(processor, num_threads, payments_per_thread, duplicate_every=0):
+    """Submit payments from N threads and measure throughput"""
+    total = num_threads * payments_per_thread
+    payments = [make_payment(i) for i in range(total)]
+    results = [None] * total
+    start_barrier = threading.Barrier(num_threads + 1)
+
+    def worker(thread_index):
+        start_barrier.wait()
+        for i in range(thread_index, total, num_threads):
+            payment = payments[i]
+            if duplicate_every and i % duplicate_every == 0 and i > 0:
+                payment = dict(payment, reference=payments[i - 1]['reference'])
+            results[i] = processor.process_payment(payment)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(num_threads)]
+    for t in threads:
+        t.start()
+
+    start_barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    succeeded = sum(1 for r in results if r and r['success'])
+    return {
+        'threads': num_threads,
+        'payments': total,
+        'succeeded': succeeded,
+        'failed': total - succeeded,
+        'seconds': elapsed,
+        'payments_per_second': total / elapsed if elapsed else 0.0
+    }
+
+def run_async_benchmark(processor, total, persist_workers=4, duplicate_every=0):
+    """Submit payments through AsyncPaymentProcessor on one event loop"""
+    payments = [make_payment(i) for i in range(total)]
+    if duplicate_every:
+        for i in range(duplicate_every, total, duplicate_every):
+            payments[i] = dict(payments[i], reference=payments[i - 1]['reference'])
+
+    async def submit_all():
+        async with AsyncPaymentProcessor(processor, persist_workers=persist_workers) as async_processor:
+            start = time.perf_counter()
+            results = await async_processor.submit_many(payments)
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(submit_all())
+    succeeded = sum(1 for r in results if r['success'])
+    return {
+        'threads': f"async/{persist_workers}",
+        'payments': total,
+        'succeeded': succeeded,
+        'failed': total - succeeded,
+        'seconds': elapsed,
+        'payments_per_second': total / elapsed if elapsed else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="PaymentProcessor throughput benchmark")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--payments', type=int, default=500, help="payments per thread")
+    parser.add_argument('--async-payments', type=int, default=0,
+                        help="also run the asyncio front end with this many payments")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'payments':>9} {'ok':>7} {'failed':>7} {'seconds':>9} {'per sec':>10}")
+    for num_threads in args.threads:
+        files_dir = tempfile.mkdtemp(prefix="payment_bench_")
+        processor = PaymentProcessor(files_dir)
+        try:
+            stats = run_benchmark(processor, num_threads, args.payments)
+        finally:
+            processor.close()
+            shutil.rmtree(files_dir, ignore_errors=True)
+        print(f"{stats['threads']:>8} {stats['payments']:>9} {stats['succeeded']:>7} "
+              f"{stats['failed']:>7} {stats['seconds']:>9.2f} {stats['payments_per_second']:>10.0f}")
+
+    if args.async_payments:
+        files_dir = tempfile.mkdtemp(prefix="payment_bench_")
+        processor = PaymentProcessor(files_dir)
+        try:
+            stats = run_async_benchmark(processor, args.async_payments)
+        finally:
+            processor.close()
+            shutil.rmtree(files_dir, ignore_errors=True)
+        print(f"{stats['threads']:>8} {stats['payments']:>9} {stats['succeeded']:>7} "
+              f"{stats['failed']:>7} {stats['seconds']:>9.2f} {stats['payments_per_second']:>10.0f}")
+
+if __name__ == '__main__':
+    main()
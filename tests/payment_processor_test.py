@@ -0,0 +1,384 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import asyncio
+import csv
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+from utils.payment_processor import PaymentProcessor
+from utils.payment_journal import PaymentJournal
+from utils.async_payment_processor import AsyncPaymentProcessor
+from utils.payment_batch import PaymentBatch
+from core.file_operations import FileOperations
+from core.reference_registry import ReferenceRegistry
+from tests.payment_processor_benchmark import make_payment, run_benchmark, run_async_benchmark
+from tests.payment_batch_benchmark import write_batch_file
+
+class PaymentProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.processor = PaymentProcessor(self.test_dir)
+
+    def tearDown(self):
+        self.processor.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_process_payment(self):
+        """Single Payment Processing"""
+        print("\nTest Case 1: Process Payment")
+
+        payment = make_payment(0)
+        result = self.processor.process_payment(payment)
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(self.processor.get_payment_status(result['payment_id']), 'completed')
+        self.assertEqual(self.processor.get_payment_by_reference(payment['reference'])['payment_id'],
+                         result['payment_id'])
+        self.assertEqual(self.processor.journal.read(result['payment_id'])['reference'],
+                         payment['reference'])
+
+        # Duplicate reference is rejected through the index
+        result = self.processor.process_payment(make_payment(0))
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_type'], 'validation')
+
+    def test_concurrent_duplicates(self):
+        """Concurrent Submissions Of One Reference"""
+        print("\nTest Case 2: Concurrent Duplicates")
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def submit():
+            barrier.wait()
+            results.append(self.processor.process_payment(make_payment(42)))
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sum(1 for r in results if r['success']), 1)
+
+    def test_failed_write_releases_reference(self):
+        """Failed Write Releases Reference"""
+        print("\nTest Case 3: Failed Write")
+
+        payment = make_payment(7)
+        with mock.patch.object(self.processor.journal, 'append',
+                               side_effect=OSError("disk full")):
+            result = self.processor.process_payment(payment)
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_type'], 'filesystem')
+        self.assertNotIn(payment['reference'], self.processor.reference_index)
+
+        result = self.processor.process_payment(payment)
+        self.assertTrue(result['success'], result['error'])
+
+    def test_threaded_throughput(self):
+        """Threaded Throughput Run"""
+        print("\nTest Case 4: Threaded Throughput")
+
+        stats = run_benchmark(self.processor, num_threads=4, payments_per_thread=25,
+                              duplicate_every=10)
+        self.assertEqual(stats['payments'], 100)
+        self.assertEqual(stats['failed'], 9)
+        self.assertEqual(len(self.processor.reference_index), stats['succeeded'])
+
+class AsyncPaymentProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.processor = PaymentProcessor(self.test_dir)
+
+    def tearDown(self):
+        self.processor.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_async_results_match_sync(self):
+        """Async Submissions Return The Same Result Dicts"""
+        print("\nTest Case 5: Async Results")
+
+        async def submit():
+            async with AsyncPaymentProcessor(self.processor) as payments:
+                first = await payments.submit(make_payment(0))
+                duplicate = await payments.submit(make_payment(0))
+                invalid = await payments.submit(dict(make_payment(1), reference='bad'))
+                return first, duplicate, invalid
+
+        first, duplicate, invalid = asyncio.run(submit())
+        self.assertIsNone(self.processor.journal._file)
+        self.assertTrue(first['success'], first['error'])
+        self.assertEqual(self.processor.get_payment_status(first['payment_id']), 'completed')
+        self.assertEqual(duplicate['error_type'], 'validation')
+        self.assertEqual(invalid['error_type'], 'validation')
+
+    def test_backpressure(self):
+        """Slow Journal Bounds Queued And In-Flight Payments"""
+        print("\nTest Case 6: Async Backpressure")
+
+        append = self.processor.journal.append
+        release = threading.Event()
+
+        def slow_append(record):
+            release.wait()
+            return append(record)
+
+        async def submit():
+            async with AsyncPaymentProcessor(self.processor, queue_size=4, max_inflight=2) as payments:
+                tasks = [asyncio.ensure_future(payments.submit(make_payment(i))) for i in range(20)]
+                await asyncio.sleep(0.1)
+                pending = payments.pending()
+                blocked = sum(1 for task in tasks if not task.done())
+                release.set()
+                return pending, blocked, await asyncio.gather(*tasks)
+
+        with mock.patch.object(self.processor.journal, 'append', side_effect=slow_append):
+            pending, blocked, results = asyncio.run(submit())
+
+        self.assertLessEqual(pending, 4 + 2)
+        self.assertEqual(blocked, 20)
+        self.assertTrue(all(r['success'] for r in results))
+
+    def test_async_throughput(self):
+        """Async Throughput Run"""
+        print("\nTest Case 7: Async Throughput")
+
+        stats = run_async_benchmark(self.processor, total=200, duplicate_every=10)
+        self.assertEqual(stats['failed'], 19)
+        self.assertEqual(len(self.processor.reference_index), stats['succeeded'])
+
+class PaymentRecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _process(self, processor, indexes):
+        for i in indexes:
+            result = processor.process_payment(make_payment(i))
+            self.assertTrue(result['success'], result['error'])
+
+    def test_restart_recovers_state(self):
+        """Restart Rebuilds Payments And References"""
+        print("\nTest Case 8: Restart Recovery")
+
+        processor = PaymentProcessor(self.test_dir)
+        self._process(processor, range(20))
+        processor.close()
+
+        restarted = PaymentProcessor(self.test_dir)
+        self.assertEqual(len(restarted.payments), 20)
+        self.assertEqual(restarted.recovery_stats['journal_records'], 20)
+        self.assertIn('seconds', restarted.recovery_stats)
+
+        result = restarted.process_payment(make_payment(5))
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_type'], 'validation')
+        restarted.close()
+
+    def test_snapshot_plus_journal_tail(self):
+        """Snapshot Plus Journal Tail Replay"""
+        print("\nTest Case 9: Snapshot Plus Tail")
+
+        processor = PaymentProcessor(self.test_dir)
+        self._process(processor, range(10))
+        processor.save_snapshot()
+        self._process(processor, range(10, 15))
+        processor.close()
+
+        restarted = PaymentProcessor(self.test_dir)
+        self.assertEqual(restarted.recovery_stats['snapshot_records'], 10)
+        self.assertEqual(restarted.recovery_stats['journal_records'], 5)
+        self.assertEqual(len(restarted.reference_index), 15)
+
+        # Journal index is restored for direct reads
+        payment_id = restarted.reference_index[make_payment(12)['reference']]
+        self.assertEqual(restarted.journal.read(payment_id)['status'], 'completed')
+        restarted.close()
+
+    def test_parallel_parsing(self):
+        """Parallel Parsing Matches Sequential"""
+        print("\nTest Case 10: Parallel Parsing")
+
+        processor = PaymentProcessor(self.test_dir)
+        self._process(processor, range(200))
+        processor.close()
+
+        sequential = PaymentProcessor(self.test_dir, recovery_workers=1)
+        sequential.close()
+
+        parallel = PaymentProcessor(self.test_dir, recovery_workers=2)
+        parallel.close()
+        parallel.recovery.chunk_size = 4096
+        parallel.recovery.parallel_threshold = 0
+        stats = parallel.recover()
+
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(parallel.reference_index, sequential.reference_index)
+
+class PaymentJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_segment_roll_and_index(self):
+        """Segment Roll And Offset Index"""
+        print("\nTest Case 11: Segment Roll")
+
+        journal = PaymentJournal(self.test_dir / "journal", segment_size=512)
+        for i in range(20):
+            journal.append({'payment_id': f"P{i}", 'reference': f"REF-{i}", 'amount': '100.00'})
+        journal.close()
+
+        self.assertGreater(len(journal.segments()), 1)
+        self.assertEqual(journal.read('P13')['reference'], 'REF-13')
+
+        # Reopening rebuilds the index from the segments
+        reopened = PaymentJournal(self.test_dir / "journal", segment_size=512)
+        self.assertEqual(len(reopened.index), 20)
+        self.assertEqual(reopened.read('P0')['reference'], 'REF-0')
+        reopened.close()
+
+    def test_torn_tail(self):
+        """Torn Tail Is Dropped"""
+        print("\nTest Case 12: Torn Tail")
+
+        journal = PaymentJournal(self.test_dir / "journal")
+        journal.append({'payment_id': 'P1', 'reference': 'REF-1'})
+        journal.close()
+        with open(journal.segment_path(1), 'ab') as f:
+            f.write(b'{"payment_id":"P2","ref')
+
+        reopened = PaymentJournal(self.test_dir / "journal")
+        self.assertEqual(list(reopened.index), ['P1'])
+        location = reopened.append({'payment_id': 'P3', 'reference': 'REF-3'})
+        self.assertEqual(reopened.read_at(*location)['reference'], 'REF-3')
+        reopened.close()
+
+    def test_legacy_migration(self):
+        """Legacy Payment Files Are Migrated"""
+        print("\nTest Case 13: Legacy Migration")
+
+        # Older versions saved each file while the payment was still pending
+        for i in range(3):
+            with open(self.test_dir / f"payment_id{i}.json", 'w', encoding='utf-8') as f:
+                json.dump({'payment_id': f"id{i}", 'reference': f"REF-{i}", 'status': 'pending'}, f, indent=4)
+        with open(self.test_dir / "payment_renamed.json", 'w', encoding='utf-8') as f:
+            json.dump({'payment_id': "id9", 'reference': "REF-9", 'status': 'pending'}, f, indent=4)
+
+        processor = PaymentProcessor(self.test_dir)
+        self.assertEqual(list(self.test_dir.glob("payment_*.json")), [])
+        self.assertEqual(processor.journal.read('id2')['reference'], 'REF-2')
+        self.assertEqual(processor.get_payment_status('id2'), 'completed')
+        self.assertEqual(processor.get_payment_status('id9'), 'completed')
+        processor.close()
+
+    def test_idle_sync(self):
+        """The Last Records Are Synced Once Appends Stop"""
+        print("\nTest Case 14: Idle Sync")
+
+        journal = PaymentJournal(self.test_dir / "journal", fsync_every=100, fsync_interval=0.05)
+        with mock.patch('utils.payment_journal.os.fsync') as fsync:
+            journal.append({'payment_id': 'P1', 'reference': 'REF-1'})
+            journal.append({'payment_id': 'P2', 'reference': 'REF-2'})
+            self.assertEqual(fsync.call_count, 0)
+            time.sleep(0.3)
+            self.assertEqual(fsync.call_count, 1)
+        self.assertEqual(journal._pending_sync, 0)
+        journal.close()
+
+class PaymentBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.processor = PaymentProcessor(self.test_dir / "files")
+        self.batch_file = self.test_dir / "batch.ndjson"
+
+    def tearDown(self):
+        self.processor.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_batch_results_in_input_order(self):
+        """Batch Results Follow Input Order"""
+        print("\nTest Case 15: Batch Order")
+
+        write_batch_file(self.batch_file, 50, invalid_every=7)
+        with open(self.batch_file, 'a', encoding='utf-8') as f:
+            f.write('{"reference": \n')
+            f.write(json.dumps(make_payment(3), default=str) + '\n')
+
+        results, stats = PaymentBatch(self.processor, workers=1).process_file(self.batch_file)
+        self.assertEqual(stats['payments'], 52)
+        for i, result in enumerate(results[:50]):
+            self.assertEqual(result['success'], i % 7 != 6, (i, result))
+        self.assertEqual(results[50]['error_type'], 'validation')
+
+        # Duplicate of line 3 is rejected by the serialized commit step
+        self.assertEqual(results[51]['error'], "Duplicate payment reference")
+        self.assertEqual(self.processor.get_payment_by_reference(make_payment(3)['reference'])['payment_id'],
+                         results[3]['payment_id'])
+
+    def test_parallel_matches_sequential(self):
+        """Process Pool Validation Matches Sequential"""
+        print("\nTest Case 16: Batch Process Pool")
+
+        write_batch_file(self.batch_file, 300, invalid_every=11)
+        batch = PaymentBatch(self.processor, workers=2, chunk_size=4096, parallel_threshold=0)
+        results, stats = batch.process_file(self.batch_file)
+
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual([r['success'] for r in results], [i % 11 != 10 for i in range(300)])
+        self.assertEqual(len(self.processor.reference_index), stats['succeeded'])
+
+    def test_treasury_rows(self):
+        """Batch Payments Reach Treasury As Treasury Rows"""
+        print("\nTest Case 17: Batch Treasury Rows")
+
+        treasury_file = self.test_dir / "TREASURY_CURRENT.csv"
+        with open(treasury_file, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(['Company', 'Beneficiary', 'Reference', 'Amount', 'Date', 'Status'])
+        file_operations = object.__new__(FileOperations)
+        file_operations.file_paths = {'Treasury': treasury_file}
+        file_operations.reference_registry = ReferenceRegistry(treasury_file)
+
+        write_batch_file(self.batch_file, 2)
+        results, _ = PaymentBatch(self.processor, file_operations, workers=1).process_file(self.batch_file)
+        self.assertTrue(all(result['success'] for result in results))
+        with open(treasury_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        payment = make_payment(1)
+        self.assertEqual((rows[1]['Reference'], rows[1]['Beneficiary'], rows[1]['Date']),
+                         (payment['reference'], 'Benchmark Vendor', payment['date'].strftime('%Y-%m-%d')))
+
+        # A failed Treasury append fails the payment and keeps it out of the journal
+        write_batch_file(self.batch_file, 3)
+        with mock.patch.object(file_operations, 'save_payment', return_value=(False, "Treasury locked")):
+            results, _ = PaymentBatch(self.processor, file_operations, workers=1).process_file(self.batch_file)
+        self.assertEqual((results[2]['success'], results[2]['error'], results[2]['error_type']),
+                         (False, "Treasury locked", 'filesystem'))
+        self.assertIsNone(self.processor.get_payment_by_reference(make_payment(2)['reference']))
+        self.assertEqual(len(self.processor.journal.index), 2)
+
+        # A failed journal write removes the Treasury row and frees the reference
+        treasury_before = treasury_file.read_bytes()
+        with mock.patch.object(self.processor.journal, 'append', side_effect=OSError("disk full")):
+            results, _ = PaymentBatch(self.processor, file_operations, workers=1).process_file(self.batch_file)
+        self.assertEqual((results[2]['success'], results[2]['error_type']), (False, 'filesystem'))
+        self.assertEqual(treasury_file.read_bytes(), treasury_before)
+        self.assertFalse(file_operations.reference_registry.contains(make_payment(2)['reference']))
+
+        results, _ = PaymentBatch(self.processor, file_operations, workers=1).process_file(self.batch_file)
+        self.assertTrue(results[2]['success'], results[2]['error'])
+        self.assertEqual(len(self.processor.journal.index), 3)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from utils.payment_journal import PaymentJournal
+from utils.payment_processor import PaymentProcessor
+
+def write_history(files_dir, count):
+    """Write count completed payments straight into the journal"""
+    journal = PaymentJournal(Path(files_dir) / "journal", fsync_every=100000)
+    for i in range(count):
+        journal.append({
+            'payment_id': f"{i:012d}",
+            'timestamp': '2024-01-01T10:00:00',
+            'status': 'completed',
+            'company': 'SALAM',
+            'beneficiary': {
+                'name': 'Benchmark Vendor',
+                'account': 'SA4420152043595120123456',
+                'bank': 'Saudi National Bank'
+            },
+            'reference': f"BEN-2024-{i:08d}",
+            'amount': '1000.00',
+            'date': '2024-01-01 10:00:00',
+            'cnp_approval': True
+        })
+    journal.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="PaymentProcessor recovery benchmark")
+    parser.add_argument('--payments', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    files_dir = tempfile.mkdtemp(prefix="payment_recovery_")
+    try:
+        write_history(files_dir, args.payments)
+
+        start = time.perf_counter()
+        processor = PaymentProcessor(files_dir, recovery_workers=args.workers)
+        print(f"Journal replay: {time.perf_counter() - start:.2f}s {processor.recovery_stats}")
+
+        start = time.perf_counter()
+        processor.save_snapshot()
+        processor.close()
+        print(f"Snapshot: {time.perf_counter() - start:.2f}s")
+        del processor
+
+        start = time.perf_counter()
+        processor = PaymentProcessor(files_dir, recovery_workers=args.workers)
+        print(f"Snapshot restore: {time.perf_counter() - start:.2f}s {processor.recovery_stats}")
+        processor.close()
+    finally:
+        shutil.rmtree(files_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+from core.payment_store import PaymentStore
+from core.validation_system import ValidationSystem
+
+class PaymentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.payments_file = self.test_dir / "payments.json"
+        with open(self.payments_file, 'w', encoding='utf-8') as f:
+            json.dump({'payments': [
+                {'reference': 'REF-2024-0001', 'status': 'Pending'},
+                {'reference': 'REF-2024-0002', 'status': 'Pending'},
+                {'reference': 'REF-2024-0001', 'status': 'Pending'}
+            ]}, f, indent=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _read_file(self):
+        with open(self.payments_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_reference_index(self):
+        """Reference Index"""
+        print("\nTest Case 1: Reference Index")
+
+        store = PaymentStore()
+        store.load(self.payments_file)
+        key = str(self.payments_file)
+        self.assertEqual(store.find('REF-2024-0001'), [(key, 0), (key, 2)])
+        self.assertEqual(store.find('REF-2024-0002'), [(key, 1)])
+        self.assertEqual(store.find('REF-2024-9999'), [])
+
+    def test_status_patch_log(self):
+        """Status Patches Go To The Log"""
+        print("\nTest Case 2: Status Patch Log")
+
+        store = PaymentStore(compact_every=100)
+        updated = store.update_status(self.payments_file, 'REF-2024-0001', 'Completed')
+        self.assertEqual(updated, 2)
+
+        # Document untouched until compaction, patch is in the log
+        self.assertEqual(self._read_file()['payments'][0]['status'], 'Pending')
+        self.assertTrue(Path(str(self.payments_file) + '.log').exists())
+
+        # A fresh store replays the log
+        other = PaymentStore()
+        data = other.load(self.payments_file)
+        self.assertEqual(data['payments'][0]['status'], 'Completed')
+        self.assertEqual(data['payments'][1]['status'], 'Pending')
+
+    def test_failed_log_write(self):
+        """A Failed Log Write Leaves The Cache Unchanged"""
+        print("\nTest Case 3: Failed Log Write")
+
+        store = PaymentStore(compact_every=1)
+        with mock.patch.object(store, '_append_log', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.update_status(self.payments_file, 'REF-2024-0001', 'Completed')
+        self.assertEqual(store.load(self.payments_file)['payments'][0]['status'], 'Pending')
+
+        # Nothing unlogged reaches the document on the next compaction
+        store.update_status(self.payments_file, 'REF-2024-0002', 'Rejected')
+        self.assertEqual([p['status'] for p in self._read_file()['payments']],
+                         ['Pending', 'Rejected', 'Pending'])
+
+    def test_compaction(self):
+        """Periodic Compaction"""
+        print("\nTest Case 4: Compaction")
+
+        store = PaymentStore(compact_every=3)
+        store.update_status(self.payments_file, 'REF-2024-0001', 'Under Process')
+        store.update_status(self.payments_file, 'REF-2024-0002', 'Rejected')
+
+        data = self._read_file()
+        self.assertEqual([p['status'] for p in data['payments']],
+                         ['Under Process', 'Rejected', 'Under Process'])
+        self.assertFalse(Path(str(self.payments_file) + '.log').exists())
+
+    def test_single_parse(self):
+        """Validation Parses Each File Once"""
+        print("\nTest Case 5: Single Parse")
+
+        validation = ValidationSystem()
+        payment_data = {
+            'reference': 'REF-2024-0002',
+            'amount': '100',
+            'date': '2024-01-01',
+            'status': 'Completed',
+            'company': 'SALAM'
+        }
+
+        with mock.patch('core.payment_store.json.load', wraps=json.load) as json_load:
+            result = validation.update_payment_status(payment_data, [str(self.payments_file)])
+
+        self.assertEqual(result, {'updated': 1, 'errors': []})
+        self.assertEqual(json_load.call_count, 1)
+
+    def test_invalid_structure(self):
+        """Invalid Document Structure"""
+        print("\nTest Case 6: Invalid Structure")
+
+        bad_file = self.test_dir / "bad.json"
+        with open(bad_file, 'w', encoding='utf-8') as f:
+            json.dump({'records': []}, f)
+
+        validation = ValidationSystem()
+        result = validation.update_payment_status({
+            'reference': 'REF-2024-0002',
+            'amount': '100',
+            'date': '2024-01-01',
+            'status': 'Completed',
+            'company': 'SALAM'
+        }, [str(bad_file)])
+
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual(len(result['errors']), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
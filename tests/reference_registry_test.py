@@ -0,0 +1,151 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import csv
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+from core.reference_registry import ReferenceRegistry, BloomFilter
+from core.validation_system import ValidationSystem
+from core.file_operations import FileOperations
+
+class ReferenceRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.treasury_file = self.test_dir / "TREASURY_CURRENT.csv"
+        self._write_rows(['REF-2024-0001', 'REF-2024-0002'], header=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_rows(self, references, header=False):
+        with open(self.treasury_file, 'w' if header else 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(['reference', 'amount', 'date', 'status'])
+            for reference in references:
+                writer.writerow([reference, '100', '2024-01-01', 'Under Process'])
+
+    def test_bloom_filter(self):
+        """Bloom Filter Membership"""
+        print("\nTest Case 1: Bloom Filter Membership")
+
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"REF-{i}")
+
+        # No false negatives
+        self.assertTrue(all(f"REF-{i}" in bloom for i in range(1000)))
+
+        # False positive rate stays near the configured bound
+        false_positives = sum(f"OTHER-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_duplicate_detection(self):
+        """Duplicate Detection"""
+        print("\nTest Case 2: Duplicate Detection")
+
+        registry = ReferenceRegistry(self.treasury_file)
+        self.assertTrue(registry.contains('REF-2024-0001'))
+        self.assertTrue(registry.contains(' REF-2024-0002 '))
+        self.assertFalse(registry.contains('REF-2024-0003'))
+
+        registry.add('REF-2024-0003')
+        self.assertTrue(registry.contains('REF-2024-0003'))
+
+    def test_snapshot_catch_up(self):
+        """Snapshot Restart With Appended Rows"""
+        print("\nTest Case 3: Snapshot Restart")
+
+        registry = ReferenceRegistry(self.treasury_file)
+        registry.save_snapshot()
+        self.assertTrue(registry.snapshot_file.exists())
+
+        # Rows appended by another writer after the snapshot
+        self._write_rows(['REF-2024-0009'])
+
+        # The restart reads only the appended rows; lookups never read Treasury
+        offsets = []
+        read_references = ReferenceRegistry._read_references
+
+        def read(registry, offset):
+            offsets.append(offset)
+            return read_references(registry, offset)
+
+        with mock.patch.object(ReferenceRegistry, '_read_references', read):
+            restarted = ReferenceRegistry(self.treasury_file)
+            self.assertTrue(restarted.contains('REF-2024-0009'))
+            self.assertTrue(restarted.contains('REF-2024-0001'))
+            self.assertFalse(restarted.contains('REF-2024-0010'))
+        self.assertEqual(len(offsets), 1)
+        self.assertGreater(offsets[0], 0)
+
+    def test_rewritten_treasury(self):
+        """Treasury Rewrite Invalidates Snapshot"""
+        print("\nTest Case 4: Treasury Rewrite")
+
+        registry = ReferenceRegistry(self.treasury_file)
+        registry.save_snapshot()
+
+        with open(self.treasury_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['company', 'reference', 'amount'])
+            writer.writerow(['SALAM', 'NEW-2024-0001', '100'])
+
+        restarted = ReferenceRegistry(self.treasury_file)
+        self.assertTrue(restarted.contains('NEW-2024-0001'))
+        self.assertFalse(restarted.contains('REF-2024-0001'))
+
+    def test_cross_reference_check(self):
+        """Cross Reference Check Uses Registry"""
+        print("\nTest Case 5: Cross Reference Check")
+
+        class Handler:
+            def __init__(self, registry):
+                self.reference_registry = registry
+
+            def read_treasury_file(self):
+                raise AssertionError("Treasury must not be read on the hot path")
+
+        handler = Handler(ReferenceRegistry(self.treasury_file))
+        validation = ValidationSystem()
+
+        result = validation.cross_reference_check({'reference': 'REF-2024-0001'}, handler)
+        self.assertFalse(result['valid'])
+
+        result = validation.cross_reference_check({'reference': 'REF-2024-0100'}, handler)
+        self.assertTrue(result['valid'])
+
+    def test_save_payment_header_casing(self):
+        """Saved Payments Follow The Treasury Header Casing"""
+        print("\nTest Case 6: Save Payment Header")
+
+        operations = object.__new__(FileOperations)
+        operations.file_paths = {'Treasury': self.treasury_file}
+        operations.reference_registry = ReferenceRegistry(self.treasury_file)
+        payment = {'company': 'Salam', 'beneficiary': 'Vendor', 'reference': 'REF-2024-0003',
+                   'amount': '250', 'date': '2024-02-01'}
+
+        with open(self.treasury_file, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(['Company', 'Beneficiary', 'Reference', 'Amount', 'Date', 'Status'])
+        success, _ = operations.save_payment(payment)
+        self.assertTrue(success)
+        with open(self.treasury_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(r['Reference'], r['Amount'], r['Status']) for r in rows],
+                         [('REF-2024-0003', '250', 'Under Process')])
+        self.assertTrue(ReferenceRegistry(self.treasury_file).contains('REF-2024-0003'))
+
+        # Without a reference column nothing is written or registered
+        with open(self.treasury_file, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(['Company', 'Amount'])
+        success, _ = operations.save_payment({**payment, 'reference': 'REF-2024-0004'})
+        self.assertFalse(success)
+        self.assertEqual(self.treasury_file.read_text(encoding='utf-8').splitlines(), ['Company,Amount'])
+        self.assertFalse(operations.reference_registry.contains('REF-2024-0004'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
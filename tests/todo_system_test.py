@@ -0,0 +1,112 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from utils.todo_system import TodoManager, Task, TaskStatus, UserRole
+
+class TodoManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.data_file = self.test_dir / "todo_data.json"
+        self.manager = TodoManager(self.data_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def journal_lines(self):
+        return self.manager.journal_file.read_text().splitlines()
+
+    def test_edits_append_to_journal(self):
+        """Edits Append One Journal Line And Survive A Reload"""
+        print("\nTest Case 1: Task Journal")
+
+        task = Task("Reconcile Alinma", "alice", "2024-03-31", created_by="bob")
+        self.manager.add_task(task)
+        self.manager.assign_reviewer(task, "bob")
+        self.manager.update_task_status(task, TaskStatus.IN_PROGRESS, "alice")
+        self.manager.add_feedback(task, "bob", "Check the February items")
+        self.assertFalse(self.data_file.exists())
+        self.assertEqual(len(self.journal_lines()), 4)
+
+        # A torn last line is ignored on replay
+        with open(self.manager.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"seq": 5, "op": "se')
+
+        reloaded = TodoManager(self.data_file)
+        self.assertEqual(len(reloaded.tasks), 1)
+        restored = reloaded.tasks[0]
+        self.assertEqual(restored.to_dict(), task.to_dict())
+        self.assertEqual(restored.status, TaskStatus.IN_PROGRESS)
+
+        # The reloaded manager keeps journaling against the same task
+        admin = SimpleNamespace(username="carol", role=UserRole.ADMIN)
+        reloaded.archive_task(restored, admin)
+        self.assertTrue(TodoManager(self.data_file).tasks[0].archived)
+
+    def test_compaction(self):
+        """Journal Is Folded Into The Snapshot Every compact_every Events"""
+        print("\nTest Case 2: Journal Compaction")
+
+        self.manager.compact_every = 3
+        tasks = [Task(f"Task {i}", "alice", "2024-03-31") for i in range(3)]
+        for task in tasks:
+            self.manager.add_task(task)
+        self.assertFalse(self.manager.journal_file.exists())
+        with open(self.data_file, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        self.assertEqual((len(snapshot['tasks']), snapshot['journal_seq']), (3, 3))
+
+        self.manager.update_task_status(tasks[1], TaskStatus.IN_PROGRESS, "alice")
+        self.assertEqual(len(self.journal_lines()), 1)
+
+        # Events already in the snapshot are not replayed twice
+        with open(self.manager.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'seq': 2, 'op': 'add', 'task': tasks[0].id, 'data': tasks[0].to_dict()}) + "\n")
+        reloaded = TodoManager(self.data_file)
+        self.assertEqual([t.description for t in reloaded.tasks], ["Task 0", "Task 1", "Task 2"])
+        self.assertEqual(reloaded.tasks[1].status, TaskStatus.IN_PROGRESS)
+
+    def test_ids_and_indexes(self):
+        """Tasks Keep Their Ids And Are Indexed By Owner And Reviewer"""
+        print("\nTest Case 3: Task Ids And Indexes")
+
+        # A snapshot written before tasks had ids
+        legacy = Task("Legacy task", "alice", "2024-03-31")
+        legacy_data = legacy.to_dict()
+        del legacy_data['id']
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump({'tasks': [legacy_data], 'last_updated': ''}, f)
+
+        manager = TodoManager(self.data_file)
+        task_id = manager.tasks[0].id
+        self.assertEqual(TodoManager(self.data_file).tasks[0].id, task_id)
+
+        first = Task("Review accruals", "bob", "2024-04-30")
+        second = Task("Close March", "alice", "2024-04-30")
+        manager.add_task(first)
+        manager.add_task(second)
+        manager.assign_reviewer(second, "bob")
+        self.assertIs(manager.get_task(first.id), first)
+        self.assertIsNone(manager.get_task("missing"))
+        self.assertEqual([t.id for t in manager.get_tasks_for_owner("alice")], [task_id, second.id])
+        self.assertEqual(manager.get_tasks_for_reviewer("bob"), [second])
+
+        manager.assign_reviewer(second, "carol")
+        self.assertEqual(manager.get_tasks_for_reviewer("bob"), [])
+
+        # A copy with the same contents is not a managed task
+        with self.assertRaises(ValueError):
+            manager.assign_reviewer(Task.from_dict({**second.to_dict(), 'id': 'other'}), "bob")
+
+        reloaded = TodoManager(self.data_file)
+        self.assertEqual(reloaded.get_task(second.id).reviewer, "carol")
+        self.assertEqual([t.id for t in reloaded.get_tasks_for_reviewer("carol")], [second.id])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
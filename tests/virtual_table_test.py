@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from ui.virtual_table import VirtualTable
+from tests.keyed_tree_test import FakeTree
+
+def make_table(columns, **options):
+    """VirtualTable wired to a FakeTree instead of Tk widgets"""
+    with mock.patch('ui.virtual_table.ttk'), \
+            mock.patch('tkinter.ttk.Frame.__init__', return_value=None):
+        table = VirtualTable(None, columns, **options)
+    table.tree = FakeTree()
+    table.scrollbar = mock.Mock()
+    table._visible = 10
+    return table
+
+class VirtualTableTest(unittest.TestCase):
+    def setUp(self):
+        n = 100000
+        self.df = pd.DataFrame({
+            'Vendor': np.where(np.arange(n) % 3 == 0, 'Alpha Trading', 'Beta Supplies'),
+            'Amount': (np.arange(n) * 7919 % 100000) / 100.0,
+            'Tag': np.where(np.arange(n) % 2 == 0, 'even', 'odd')
+        })
+        self.table = make_table(['Vendor', 'Amount'], tag_column='Tag',
+                                formatters={'Amount': lambda x: f"{x:,.2f}"})
+
+    def test_only_visible_rows_materialized(self):
+        """Only The Visible Window Becomes Tree Items"""
+        print("\nTest Case 1: Visible Window")
+
+        self.table.set_data(self.df)
+        self.assertEqual(len(self.table.tree.children), 10)
+        self.assertEqual(self.table.tree.items['0']['values'], ('Alpha Trading', '0.00'))
+        self.assertEqual(self.table.tree.items['1']['tags'], ('odd',))
+
+        self.table.yview('moveto', 0.5)
+        self.assertEqual(self.table._first, 50000)
+        self.assertEqual(len(self.table.tree.children), 10)
+        self.table.yview('scroll', 1, 'pages')
+        self.assertEqual(self.table._first, 50010)
+
+        # Scrolling past the end clamps to the last full window
+        self.table.yview('moveto', 1.0)
+        self.assertEqual(self.table._first, 100000 - 10)
+
+    def test_sort_and_filter_on_source(self):
+        """Sort And Search Work On Source Positions"""
+        print("\nTest Case 2: Sort And Search")
+
+        self.table.set_data(self.df)
+        self.table.sort_by('Amount')
+        amounts = self.df['Amount'].to_numpy()[self.table.view_positions()]
+        self.assertTrue(np.all(np.diff(amounts) >= 0))
+
+        self.table.sort_by('Amount')  # Toggles to descending
+        amounts = self.df['Amount'].to_numpy()[self.table.view_positions()]
+        self.assertTrue(np.all(np.diff(amounts) <= 0))
+
+        self.table.search('alpha')
+        self.assertEqual(self.table.row_count(), len(range(0, 100000, 3)))
+        amounts = self.table.view_frame()['Amount'].to_numpy()
+        self.assertTrue(np.all(np.diff(amounts) <= 0))
+
+        self.table.filter(None)
+        self.assertEqual(self.table.row_count(), 100000)
+
+    def test_selection_survives_scrolling(self):
+        """Selection Follows Source Rows"""
+        print("\nTest Case 3: Virtual Selection")
+
+        self.table.set_data(self.df)
+        self.table.select_position(500)
+        self.assertEqual(self.table.tree.selection(), ('9',))
+
+        self.table.yview('moveto', 0.0)
+        self.assertEqual(self.table.tree.selection(), ())
+        self.table._on_select()
+        self.assertEqual(self.table.selected_positions(), [500])
+
+        self.table._move_cursor(1)
+        self.assertEqual(self.table.selected_positions(), [501])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
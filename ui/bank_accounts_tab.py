@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 import subprocess
 from auth.user_management import UserRole
+from ui.keyed_tree import KeyedTreeAdapter, unique_keys
 
 class BankAccountsTab:
     def __init__(self, parent, main_app):
@@ -86,6 +87,9 @@ class BankAccountsTab:
         # Pack tree
         self.tree.pack(fill=tk.BOTH, expand=True)
         
+        # Reloads only touch accounts that changed
+        self.accounts = KeyedTreeAdapter(self.tree)
+        
         # Bind events
         self.tree.bind('<Double-1>', self.on_account_click)
         self.tree.bind('<Button-3>', self.show_context_menu)  # Right-click
@@ -215,7 +219,7 @@ class BankAccountsTab:
         item = selection[0]
         
         # Update treeview
-        self.tree.item(item, values=[var.get() for var in entries.values()])
+        self.accounts.update(item, values=[var.get() for var in entries.values()])
         
         # Update data file
         try:
@@ -252,17 +256,14 @@ class BankAccountsTab:
         company = self.company_var.get().lower()
         data_file = self.data_dir / f"{company}_accounts.json"
         
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
         # Load data if file exists
         try:
+            rows = []
             if data_file.exists():
                 with data_file.open('r', encoding='utf-8') as f:
                     accounts = json.load(f)
                     for account in accounts['accounts']:
-                        self.tree.insert('', tk.END, values=(
+                        rows.append((
                             account.get('account_name', ''),
                             account.get('bank_name', ''),
                             account.get('account_number', ''),
@@ -270,7 +271,12 @@ class BankAccountsTab:
                             account.get('currency', ''),
                             account.get('status', '')
                         ))
+                        
+            # Apply only the differences; the selection survives a refresh
+            keys = unique_keys(f"{values[0]}|{values[2]}" for values in rows)
+            self.accounts.sync(zip(keys, rows))
         except Exception as e:
+            self.accounts.clear()
             self.notification_var.set(f"Error loading bank data: {str(e)}")
             
     def on_company_change(self, event=None):
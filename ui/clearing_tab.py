@@ -1,10 +1,15 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import numpy as np
 import pandas as pd
-import json
 from pathlib import Path
-from datetime import datetime
 import re
+from ui.virtual_table import VirtualTable
+from utils.clearing_import import ClearingImport, file_companies
+from core.file_operations import FileOperations
+from utils.clearing_system import (ClearingSearchIndex, ClearingStore, ReconciliationView, VendorIndex, AgingReport,
+                                   prepare_clearing_frame, read_bank_statement, match_statement,
+                                   to_halalas, format_halalas, CLEARING_COLUMNS, NOTE_COLUMNS, UNMATCHED)
 
 class ClearingTab:
     def __init__(self, parent, main_app):
@@ -17,6 +22,8 @@ class ClearingTab:
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data" / "clearing"
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = ClearingStore(self.data_dir)
+        self.importer = ClearingImport()
         
         # GL Account mapping
         self.gl_accounts = {
@@ -24,11 +31,19 @@ class ClearingTab:
             'MVNO': '10226'
         }
         
-        # Initialize data
-        self.df = pd.DataFrame(columns=[
-            'Month', 'Transaction Number', 'Vendor Name', 
-            'Amount', 'Notes', 'Comments'
-        ])
+        # Initialize data; Amount is held as int64 halalas
+        self.df = prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS))
+        
+        # Search keys are built once per frame, keystrokes are debounced
+        self.search_index = None
+        self._search_job = None
+        self.vendor_index = None
+        self._vendor_df = None  # Frame the vendor index was built from
+        
+        # Group balances are cached per frame; a selected group drills down
+        self.reconciliation = None
+        self._drill_down = None  # (column, group) filtering the table
+        self.aging = None  # AgingReport of the current frame
         
         # Setup UI
         self.setup_ui()
@@ -47,9 +62,20 @@ class ClearingTab:
         company_combo.pack(side=tk.LEFT, padx=5)
         company_combo.bind('<<ComboboxSelected>>', self.on_company_change)
         
-        # Import Excel button
+        # Match against the company's bank statement within a tolerance
+        ttk.Button(control_frame, text="Auto Match",
+                  command=self.auto_match).pack(side=tk.RIGHT, padx=5)
+        self.tolerance_var = tk.StringVar(value="0.00")
+        ttk.Entry(control_frame, textvariable=self.tolerance_var, width=8).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(control_frame, text="Tolerance (SAR):").pack(side=tk.RIGHT, padx=5)
+        
+        # Import Excel button; files are read in worker processes
         ttk.Button(control_frame, text="Import Excel",
                   command=self.import_excel).pack(side=tk.RIGHT, padx=5)
+        self.import_progress = ttk.Progressbar(control_frame, mode='determinate', length=150)
+        self.import_progress.pack(side=tk.RIGHT, padx=5)
+        self.import_status_var = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.import_status_var).pack(side=tk.RIGHT, padx=5)
         
         # Search frame
         search_frame = ttk.Frame(self.clearing_frame)
@@ -71,6 +97,7 @@ class ClearingTab:
                                                 "Transaction Number", "Vendor Name"],
                                          state="readonly")
         search_column_combo.pack(side=tk.LEFT, padx=5)
+        search_column_combo.bind('<<ComboboxSelected>>', self.on_search)
         
         # Reconcile dropdown
         ttk.Label(search_frame, text="Reconcile By:").pack(side=tk.LEFT, padx=5)
@@ -86,6 +113,9 @@ class ClearingTab:
         # Create table
         self.setup_table()
         
+        # Grouped reconciliation
+        self.setup_reconciliation()
+        
         # Summary frame
         summary_frame = ttk.LabelFrame(self.clearing_frame, text="Summary")
         summary_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -104,178 +134,298 @@ class ClearingTab:
         ttk.Button(summary_frame, text="Vendor Search",
                   command=self.show_vendor_search).pack(side=tk.RIGHT, padx=5)
         
+        # Aging report button
+        ttk.Button(summary_frame, text="Aging Report",
+                  command=self.show_aging_report).pack(side=tk.RIGHT, padx=5)
+        
     def setup_table(self):
         """Setup the clearing transactions table"""
         # Create table frame with scrollbar
         table_frame = ttk.Frame(self.clearing_frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Scrollbars
-        y_scrollbar = ttk.Scrollbar(table_frame)
-        y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        x_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
-        x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # Treeview
-        columns = ("Month", "Transaction Number", "Vendor Name", 
-                  "Amount", "Notes", "Comments")
-        self.tree = ttk.Treeview(table_frame, columns=columns,
-                                show="headings", selectmode="browse")
-        
-        # Configure columns
-        for col in columns:
-            self.tree.heading(col, text=col,
-                            command=lambda c=col: self.sort_table(c))
-            self.tree.column(col, width=100)
-        
-        # Configure scrollbars
-        self.tree.configure(yscrollcommand=y_scrollbar.set,
-                          xscrollcommand=x_scrollbar.set)
-        y_scrollbar.config(command=self.tree.yview)
-        x_scrollbar.config(command=self.tree.xview)
-        
-        # Pack tree
-        self.tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Configure column formats
+        # Configure column formats; amounts are only formatted for display
         self.column_formats = {
             'Month': str,
             'Transaction Number': str,
             'Vendor Name': str,
-            'Amount': lambda x: f"{float(str(x).replace(',', '')):,.2f}",
+            'Amount': format_halalas,
             'Notes': str,
-            'Comments': str
+            'Comments': str,
+            'Match Status': str
         }
         
+        # Only the visible rows are materialized; sort and search run on self.df
+        columns = ("Month", "Transaction Number", "Vendor Name", 
+                  "Amount", "Notes", "Comments", "Match Status")
+        self.table = VirtualTable(table_frame, columns, formatters=self.column_formats)
+        self.tree = self.table.tree
+        
+        # Horizontal scrollbar
+        x_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+        
+        # Pack table; Notes and Comments are edited in place
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind('<Double-1>', self.on_cell_double_click)
+        self._table_df = None  # Frame the table is currently showing
+        
+    def setup_reconciliation(self):
+        """Setup the grouped reconciliation table"""
+        self.reconcile_frame = ttk.LabelFrame(self.clearing_frame, text="Reconcile By: Month")
+        self.reconcile_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(self.reconcile_frame, text="Show All",
+                  command=self.clear_drill_down).pack(side=tk.RIGHT, anchor=tk.N, padx=5, pady=5)
+        
+        # Selecting a group filters the transactions table to it
+        self.reconcile_table = VirtualTable(self.reconcile_frame, ReconciliationView.SUMMARY_COLUMNS,
+                                            widths={'Group': 250, 'Count': 80,
+                                                    'Net Balance': 150, 'Status': 100},
+                                            formatters={'Net Balance': format_halalas},
+                                            tag_column='Status')
+        self.reconcile_table.tree.configure(height=6)
+        self.reconcile_table.tree.tag_configure('Open', foreground='red')
+        self.reconcile_table.tree.tag_configure('Cleared', foreground='green')
+        self.reconcile_table.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.reconcile_table.bind_select(self.on_group_select)
+        
+    def update_reconciliation(self):
+        """Show the cached group balances for the Reconcile By column"""
+        by = self.reconcile_var.get()
+        self.reconcile_frame.configure(text=f"Reconcile By: {by}")
+        if self.reconciliation is None:
+            self.reconcile_table.set_data(pd.DataFrame(columns=ReconciliationView.SUMMARY_COLUMNS))
+        else:
+            self.reconcile_table.set_data(self.reconciliation.summary(by), keep_view=True)
+            
+    def on_group_select(self):
+        """Drill down into the selected group"""
+        positions = self.reconcile_table.selected_positions()
+        if not positions or self.reconciliation is None:
+            return
+        by = self.reconcile_var.get()
+        group = self.reconciliation.summary(by)['Group'].iat[positions[0]]
+        self._drill_down = (by, group)
+        self.update_table()
+        
+    def clear_drill_down(self):
+        """Show every group's transactions again"""
+        self._drill_down = None
+        self.update_table()
+        
     def import_excel(self):
-        """Import data from Excel file"""
+        """Import one or more Excel files without blocking the UI"""
         try:
-            filename = filedialog.askopenfilename(
-                title="Select Excel File",
+            filenames = filedialog.askopenfilenames(
+                title="Select Excel Files",
                 filetypes=[("Excel files", "*.xlsx;*.xls")]
             )
             
-            if filename:
-                # Read Excel file
-                df = pd.read_excel(filename)
-                
-                # Process data
-                self.df = self.process_excel_data(df)
-                
-                # Save processed data
-                self.save_data()
+            if not filenames:
+                return
                 
-                # Update table
-                self.update_table()
-                self.update_summary()
+            # One import fills one company's store; the company is fixed now
+            # so switching company while it runs cannot misfile the data
+            companies = file_companies(filenames, self.gl_accounts, self.company_var.get())
+            targets = sorted(set(companies.values()))
+            if len(targets) > 1:
+                listing = "\n".join(f"{Path(path).name}: {company} (GL {self.gl_accounts[company]})"
+                                     for path, company in companies.items())
+                messagebox.showerror("Error", "Selected files belong to different GL accounts; "
+                                     f"import one company at a time:\n{listing}")
+                return
+            company = targets[0]
                 
-                messagebox.showinfo("Success", "Data imported successfully!")
+            # Callbacks arrive on a worker thread; hand them to the Tk thread
+            after = self.clearing_frame.after
+            started = self.importer.run_async(
+                filenames,
+                lambda df, errors: after(0, self._on_import_done, company, df, errors),
+                lambda error: after(0, self._on_import_error, error),
+                lambda done, total, path: after(0, self._on_import_progress, done, total, path)
+            )
+            if not started:
+                messagebox.showinfo("Import", "An import is already running")
+                return
                 
+            self.import_progress.configure(maximum=len(filenames), value=0)
+            self.import_status_var.set(f"Importing {len(filenames)} file(s) for {company}...")
+            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to import Excel file: {str(e)}")
             
-    def save_data(self):
-        """Save data to JSON file"""
-        try:
-            company = self.company_var.get().lower()
-            file_path = self.data_dir / f"{company}_clearing.json"
+    def _on_import_progress(self, done, total, path):
+        self.import_progress.configure(value=done)
+        self.import_status_var.set(f"Imported {done} of {total}: {Path(path).name}")
+        
+    def _on_import_done(self, company, df, errors):
+        """Save the combined import under its company and show it if selected"""
+        self.import_status_var.set("")
+        self.import_progress.configure(value=0)
+        failed = "\n".join(f"{Path(path).name}: {error}" for path, error in errors.items())
+        if df.empty and errors:
+            messagebox.showerror("Error", f"Failed to import Excel files:\n{failed}")
+            return
             
-            # Convert DataFrame to dict
-            data = {
-                'last_updated': datetime.now().isoformat(),
-                'records': self.df.to_dict('records')
-            }
+        # Save processed data
+        try:
+            self.store.save(company, df)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save data: {str(e)}")
+            return
+        
+        # Update table, unless another company was selected meanwhile
+        if company == self.company_var.get():
+            self.df = df
+            self.update_table()
+            self.update_summary()
+        
+        if errors:
+            messagebox.showwarning("Import", f"Imported {len(df)} rows for {company}; some files failed:\n{failed}")
+        else:
+            messagebox.showinfo("Success", f"Data imported successfully for {company}!")
             
-            # Save to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+    def _on_import_error(self, error):
+        self.import_status_var.set("")
+        self.import_progress.configure(value=0)
+        messagebox.showerror("Error", f"Failed to import Excel file: {str(error)}")
+        
+    def save_data(self):
+        """Save data to the company's columnar file"""
+        try:
+            self.store.save(self.company_var.get(), self.df)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save data: {str(e)}")
             
     def load_data(self):
-        """Load data from JSON file"""
+        """Load data from the company's columnar file"""
         try:
-            company = self.company_var.get().lower()
-            file_path = self.data_dir / f"{company}_clearing.json"
-            
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.df = pd.DataFrame(data.get('records', []))
-            else:
-                self.df = pd.DataFrame(columns=[
-                    'Month', 'Transaction Number', 'Vendor Name', 
-                    'Amount', 'Notes', 'Comments'
-                ])
+            self.df = self.store.load(self.company_var.get())
                 
             self.update_table()
             self.update_summary()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data: {str(e)}")
-            self.df = pd.DataFrame(columns=[
-                'Month', 'Transaction Number', 'Vendor Name', 
-                'Amount', 'Notes', 'Comments'
-            ])
+            self.df = prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS))
             
-    def update_table(self):
-        """Update the treeview with current data"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def auto_match(self):
+        """Match transactions with the company's bank statement and record the status"""
+        try:
+            if self.df is None or self.df.empty:
+                messagebox.showinfo("Auto Match", "No clearing data to match")
+                return
+                
+            company = self.company_var.get()
+            file_operations = getattr(self.main_app, 'file_operations', None) or FileOperations()
+            bs_file = file_operations.file_paths.get(f"BS-{company.upper()}")
+            if bs_file is None or not Path(bs_file).exists():
+                messagebox.showerror("Error", f"Bank statement file not found for company: {company}")
+                return
+                
+            try:
+                tolerance = int(to_halalas([self.tolerance_var.get()])[0])
+            except Exception:
+                tolerance = -1
+            if tolerance < 0:
+                messagebox.showerror("Error", "Tolerance must be a non-negative amount")
+                return
+                
+            status, _ = match_statement(self.df, read_bank_statement(bs_file), tolerance)
+            self.df['Match Status'] = status
+            self.save_data()
+            if self.aging is not None and self.aging.df is self.df:
+                self.aging.invalidate()
+            
+            # Status changed in place: re-key it for search and redraw the view
+            self.search_index = ClearingSearchIndex(self.df, self.table.columns)
+            self.update_table()
+            self.table.refresh()
+            
+            matched = int((status != UNMATCHED).sum())
+            messagebox.showinfo("Auto Match", f"Matched {matched} of {len(status)} transactions")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to match bank statement: {str(e)}")
+            
+    def on_cell_double_click(self, event):
+        """Edit the Notes or Comments cell under the cursor"""
+        column_id = self.tree.identify_column(event.x)
+        try:
+            column = self.table.columns[int(column_id.lstrip('#')) - 1]
+        except (ValueError, IndexError):
+            return
+        positions = self.table.selected_positions()
+        if column not in NOTE_COLUMNS or not positions:
+            return
             
+        position = positions[0]
+        value = simpledialog.askstring(column, f"{column}:", parent=self.clearing_frame,
+                                       initialvalue=self.df.iat[position, self.df.columns.get_loc(column)])
+        if value is not None:
+            self.edit_cell(position, column, value.strip())
+            
+    def edit_cell(self, position, column, value):
+        """Change one Notes/Comments cell, journaling it instead of rewriting the file"""
+        try:
+            self.df.iat[position, self.df.columns.get_loc(column)] = value
+            if self.search_index is not None:
+                self.search_index.update(position, column, value)
+            self.store.record_edits(self.company_var.get(), [(position, column, value)], self.df)
+            self.table.refresh()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save {column}: {str(e)}")
+            
+    def update_table(self):
+        """Update the table with current data"""
         if self.df is None or len(self.df) == 0:
+            self.table.set_data(pd.DataFrame(columns=self.table.columns))
+            self._table_df = None
+            self.reconciliation = None
+            self._drill_down = None
+            self.update_reconciliation()
             self.total_amount_var.set("Total Amount: SAR 0.00")
             self.transaction_count_var.set("Transactions: 0")
             return
             
-        # Simple and fast search implementation
-        filtered_df = self.df.copy()
-        search_text = self.search_var.get().strip()
-        if search_text:
-            filtered_df = filtered_df[
-                filtered_df.astype(str).apply(
-                    lambda x: x.str.contains(search_text, case=False, na=False)
-                ).any(axis=1)
-            ]
+        # Hand a new frame to the table once and index it for search;
+        # searches only change the view
+        if self._table_df is not self.df:
+            self.table.set_data(self.df, keep_view=True)
+            self._table_df = self.df
+            self.search_index = ClearingSearchIndex(self.df, self.table.columns)
+            self._get_vendor_index()
+            self.reconciliation = ReconciliationView(self.df)
+            self._drill_down = None
+            self.update_reconciliation()
+            
+        mask = self.search_index.search(self.search_var.get(), self.search_column_var.get())
+        if self._drill_down is not None:
+            group_mask = np.zeros(len(self.df), dtype=bool)
+            group_mask[self.reconciliation.positions(*self._drill_down)] = True
+            mask = group_mask if mask is None else mask & group_mask
+        self.table.filter(mask)
             
-        # Calculate total amount
+        # Calculate total amount over the view's positions in halalas
         try:
-            # Convert amount strings to numeric, handling commas
-            amounts = filtered_df['Amount'].apply(lambda x: float(str(x).replace(',', '')))
-            total_amount = amounts.sum()
-            self.total_amount_var.set(f"Total Amount: SAR {total_amount:,.2f}")
+            total_amount = self.df['Amount'].to_numpy()[self.table.view_positions()].sum()
+            self.total_amount_var.set(f"Total Amount: SAR {format_halalas(total_amount)}")
         except Exception as e:
             print(f"Error calculating total: {e}")
             self.total_amount_var.set("Total Amount: SAR 0.00")
-            
-        # Bulk insert for better performance
-        for _, row in filtered_df.iterrows():
-            try:
-                values = []
-                for col in self.tree['columns']:
-                    formatter = self.column_formats.get(col, str)
-                    try:
-                        value = formatter(row[col])
-                    except:
-                        value = str(row[col])
-                    values.append(value)
-                self.tree.insert('', 'end', values=values)
-            except Exception as e:
-                print(f"Error inserting row: {e}")
-                continue
                 
         # Update transaction count
-        self.transaction_count_var.set(f"Transactions: {len(filtered_df)}")
+        self.transaction_count_var.set(f"Transactions: {self.table.row_count()}")
         
     def update_summary(self):
         """Update the summary information"""
         try:
             # Calculate total amount
             total = self.df['Amount'].sum() if not self.df.empty else 0
-            self.total_amount_var.set(f"Total Amount: SAR {total:,.2f}")
+            self.total_amount_var.set(f"Total Amount: SAR {format_halalas(total)}")
             
             # Update transaction count
             count = len(self.df) if not self.df.empty else 0
@@ -284,51 +434,34 @@ class ClearingTab:
             print(f"Error updating summary: {str(e)}")
             
     def sort_table(self, col):
-        """Sort treeview by column"""
+        """Sort table by column"""
         if self.df is None or len(self.df) == 0:
             return
             
-        ascending = True
-        if hasattr(self, '_last_sort') and self._last_sort == (col, True):
-            ascending = False
-            
         try:
-            if col == 'Amount':
-                # Convert amount strings to numeric for sorting
-                self.df['Amount'] = self.df['Amount'].apply(
-                    lambda x: float(str(x).replace(',', '')) if pd.notnull(x) else 0.0
-                )
-                self.df = self.df.sort_values(by=col, ascending=ascending)
-                # Convert back to string format
-                self.df['Amount'] = self.df['Amount'].apply(
-                    lambda x: f"{float(x):,.2f}" if pd.notnull(x) else "0.00"
-                )
-            else:
-                self.df = self.df.sort_values(by=col, ascending=ascending, na_position='last')
-                
-            self._last_sort = (col, ascending)
-            self.update_table()
+            # The table sorts its view of self.df; Amount sorts as integers
+            self.table.sort_by(col)
         except Exception as e:
             print(f"Sort error: {e}")
             
     def on_search(self, *args):
-        """Handle search input - simple implementation without validation"""
+        """Refilter once typing pauses instead of on every keystroke"""
+        if self._search_job is not None:
+            self.clearing_frame.after_cancel(self._search_job)
+        self._search_job = self.clearing_frame.after(250, self._run_search)
+        
+    def _run_search(self):
+        self._search_job = None
         self.update_table()
         
     def load_company_data(self, company):
         """Load data for selected company"""
         try:
-            file_path = self.data_dir / f"{company.lower()}_clearing.json"
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.df = pd.DataFrame(data.get('data', []))
-            else:
-                self.df = pd.DataFrame()
+            self.df = self.store.load(company)
             self.update_table()
         except Exception as e:
             print(f"Error loading company data: {e}")
-            self.df = pd.DataFrame()
+            self.df = prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS))
             self.update_table()
             
     def on_company_change(self, event=None):
@@ -338,11 +471,61 @@ class ClearingTab:
     def on_reconcile_change(self, event=None):
         """Handle reconciliation option change"""
         try:
+            self._drill_down = None
+            self.update_reconciliation()  # Grouping is cached per column
             self.update_table()  # Update the table display
             self.update_summary()  # Update the summary information
         except Exception as e:
             print(f"Error in reconciliation change: {str(e)}")
             
+    def _get_vendor_index(self):
+        """Vendor index of the current frame, built once per frame"""
+        if self._vendor_df is not self.df:
+            self.vendor_index = VendorIndex(self.df)
+            self._vendor_df = self.df
+        return self.vendor_index
+        
+    def _get_aging_report(self):
+        """Aging report of the current frame, built once per frame"""
+        if self.aging is None or self.aging.df is not self.df:
+            self.aging = AgingReport(self.df, self.company_var.get())
+        return self.aging
+        
+    def show_aging_report(self):
+        """Show open items by vendor and age for every company"""
+        try:
+            reports = []
+            for company in self.gl_accounts:
+                if company == self.company_var.get():
+                    reports.append(self._get_aging_report().report())
+                else:
+                    reports.append(AgingReport(self.store.load(company), company).report())
+            report = pd.concat(reports, ignore_index=True)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to build aging report: {str(e)}")
+            return
+            
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Clearing Aging Report")
+        dialog.geometry("900x500")
+        dialog.transient(self.parent)
+        
+        amount_columns = AgingReport.BUCKETS + ['Total']
+        table = VirtualTable(dialog, AgingReport.REPORT_COLUMNS,
+                             widths={'Vendor Name': 200},
+                             formatters={col: format_halalas for col in amount_columns})
+        table.set_data(report)
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Company totals per bucket
+        summary_frame = ttk.Frame(dialog, padding="10")
+        summary_frame.pack(fill=tk.X)
+        totals = report.groupby('Company')[amount_columns].sum()
+        for company, row in totals.iterrows():
+            text = ", ".join(f"{col}: {format_halalas(row[col])}" for col in amount_columns)
+            ttk.Label(summary_frame,
+                     text=f"{company} (GL {self.gl_accounts[company]}) - {text}").pack(anchor=tk.W)
+            
     def show_vendor_search(self):
         """Show vendor search dialog"""
         dialog = tk.Toplevel(self.parent)
@@ -373,21 +556,11 @@ class ClearingTab:
         
         def update_suggestions(*args):
             # Clear existing items
-            for item in results_tree.get_children():
-                results_tree.delete(item)
-                
-            search_text = vendor_var.get().strip().lower()
-            if not search_text:
-                return
+            results_tree.delete(*results_tree.get_children())
                 
-            # Get matching vendors and their transaction counts
-            vendors = self.df[self.df['Vendor Name'].str.lower().str.contains(
-                search_text, na=False)]
-            vendor_counts = vendors['Vendor Name'].value_counts()
-            
-            # Update results
-            for vendor, count in vendor_counts.items():
-                results_tree.insert('', 'end', values=(vendor, f"{count} transactions"))
+            # Matching vendors and their counts come from the vendor index
+            for vendor, count, code in self._get_vendor_index().search(vendor_var.get()):
+                results_tree.insert('', 'end', iid=str(code), values=(vendor, f"{count} transactions"))
                 
         vendor_var.trace('w', update_suggestions)
         
@@ -396,40 +569,27 @@ class ClearingTab:
             if not selection:
                 return
                 
-            vendor = results_tree.item(selection[0])['values'][0]
-            show_vendor_details(vendor, dialog)
+            # Item iids are vendor codes; Tk may convert the displayed name
+            self.show_vendor_details(int(selection[0]), dialog)
             
         results_tree.bind('<Double-1>', on_vendor_select)
         
-    def show_vendor_details(self, vendor_name, parent_dialog):
-        """Show detailed transactions for selected vendor"""
+    def show_vendor_details(self, code, parent_dialog):
+        """Show detailed transactions for the vendor with this vendor index code"""
+        index = self._get_vendor_index()
         dialog = tk.Toplevel(parent_dialog)
-        dialog.title(f"Transactions - {vendor_name}")
+        dialog.title(f"Transactions - {index.display[code]}")
         dialog.geometry("800x600")
         dialog.transient(parent_dialog)
         
-        # Get vendor transactions
-        vendor_df = self.df[self.df['Vendor Name'] == vendor_name]
+        # Get vendor transactions from the positions stored at import
+        vendor_df = self.df.iloc[index.positions(code)]
         
         # Create table
         columns = ("Month", "Transaction Number", "Amount", "Notes")
-        tree = ttk.Treeview(dialog, columns=columns, show="headings")
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-            
-        # Add data
-        for _, row in vendor_df.iterrows():
-            values = [
-                row['Month'],
-                row['Transaction Number'],
-                f"{row['Amount']:,.2f}",
-                row['Notes']
-            ]
-            tree.insert('', 'end', values=values)
-            
-        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        table = VirtualTable(dialog, columns, formatters={'Amount': format_halalas})
+        table.set_data(vendor_df)
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Summary
         total = vendor_df['Amount'].sum()
@@ -439,6 +599,6 @@ class ClearingTab:
         summary_frame.pack(fill=tk.X)
         
         ttk.Label(summary_frame,
-                 text=f"Total Amount: SAR {total:,.2f}").pack(side=tk.LEFT, padx=20)
+                 text=f"Total Amount: SAR {format_halalas(total)}").pack(side=tk.LEFT, padx=20)
         ttk.Label(summary_frame,
                  text=f"Total Transactions: {count}").pack(side=tk.LEFT, padx=20)
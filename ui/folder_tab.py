@@ -1,7 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from utils.folder_system import FolderManager, Company
+from utils.folder_system import FolderManager, Company, account_document_template
+from utils.document_catalog import DocumentCatalog
+from ui.virtual_table import VirtualTable
+from pathlib import Path
 import calendar
+import json
+import subprocess
+import threading
+import pandas as pd
 from datetime import datetime
 
 class FolderTab:
@@ -10,6 +17,11 @@ class FolderTab:
         self.current_user = current_user
         self.folder_manager = FolderManager()
         
+        # Files under the company folders, indexed in the background
+        catalog_db = Path(__file__).parent.parent / "data" / "document_catalog.db"
+        self.catalog = DocumentCatalog(self.folder_manager.root_dir, catalog_db)
+        self._search_job = None
+        
         # Create main frame
         self.main_frame = ttk.Frame(parent, padding="10")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -58,6 +70,10 @@ class FolderTab:
         
         ttk.Button(button_frame, text="Open Folder", command=self.open_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Create Missing Folder", command=self.create_folder).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Provision Year", command=self.provision_year).pack(side=tk.LEFT, padx=5)
+        
+        # Document search
+        self.setup_document_search()
         
         # Notification area
         notification_frame = ttk.LabelFrame(self.main_frame, text="Notifications", padding=5)
@@ -69,9 +85,93 @@ class FolderTab:
         # Initial check for missing folders
         self.check_missing_folders()
         
+        # Bring the catalog up to date without blocking the tab
+        self.rescan_documents()
+        
+    def setup_document_search(self):
+        """Setup the document search panel"""
+        search_frame = ttk.LabelFrame(self.main_frame, text="Document Search", padding=5)
+        search_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        controls = ttk.Frame(search_frame)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(controls, text="Name:").pack(side=tk.LEFT)
+        self.doc_search_var = tk.StringVar()
+        self.doc_search_var.trace('w', self.on_document_search)
+        ttk.Entry(controls, textvariable=self.doc_search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        ttk.Label(controls, text="Type:").pack(side=tk.LEFT)
+        self.doc_type_var = tk.StringVar(value="All")
+        self.doc_type_combo = ttk.Combobox(controls, textvariable=self.doc_type_var,
+                                         values=["All"], state="readonly", width=20)
+        self.doc_type_combo.pack(side=tk.LEFT, padx=5)
+        self.doc_type_combo.bind('<<ComboboxSelected>>', self.on_document_search)
+        
+        ttk.Button(controls, text="Rescan", command=self.rescan_documents).pack(side=tk.LEFT, padx=5)
+        self.catalog_status_var = tk.StringVar(value="")
+        ttk.Label(controls, textvariable=self.catalog_status_var).pack(side=tk.LEFT, padx=5)
+        
+        # Double-click shows the file in the explorer
+        columns = ("Name", "Year", "Month", "Type", "Size (KB)", "Modified")
+        self.document_table = VirtualTable(search_frame, columns, widths={'Name': 300})
+        self.document_table.pack(fill=tk.BOTH, expand=True)
+        self.document_table.tree.bind('<Double-1>', self.on_document_open)
+        self.document_paths = []
+        
+    def rescan_documents(self):
+        """Update the catalog on a worker thread"""
+        after = self.main_frame.after
+        if self.catalog.scan_async(lambda stats: after(0, self._on_catalog_scanned, stats),
+                                   lambda error: after(0, self._on_catalog_error, error)):
+            self.catalog_status_var.set("Indexing documents...")
+            
+    def _on_catalog_scanned(self, stats):
+        self.catalog_status_var.set(f"{stats['files']} documents indexed")
+        self.doc_type_combo.configure(values=["All"] + self.catalog.doc_types())
+        self.search_documents()
+        
+    def _on_catalog_error(self, error):
+        self.catalog_status_var.set(f"Indexing failed: {str(error)}")
+        
+    def on_document_search(self, *args):
+        """Search once typing pauses"""
+        if self._search_job is not None:
+            self.main_frame.after_cancel(self._search_job)
+        self._search_job = self.main_frame.after(250, self.search_documents)
+        
+    def search_documents(self):
+        """Show catalog matches for the selected company"""
+        self._search_job = None
+        doc_type = self.doc_type_var.get()
+        documents = self.catalog.search(self.doc_search_var.get(),
+                                        company=self.company_var.get() or None,
+                                        doc_type=None if doc_type == "All" else doc_type)
+        self.document_paths = [doc['path'] for doc in documents]
+        self.document_table.set_data(pd.DataFrame({
+            'Name': [doc['name'] for doc in documents],
+            'Year': [doc['year'] or '' for doc in documents],
+            'Month': [doc['month'] or '' for doc in documents],
+            'Type': [doc['doc_type'] for doc in documents],
+            'Size (KB)': [f"{doc['size'] / 1024:,.1f}" for doc in documents],
+            'Modified': [datetime.fromtimestamp(doc['mtime_ns'] / 1e9).strftime('%Y-%m-%d %H:%M')
+                         for doc in documents]
+        }, columns=self.document_table.columns))
+        
+    def on_document_open(self, event=None):
+        """Show the selected document in the file explorer"""
+        positions = self.document_table.selected_positions()
+        if not positions:
+            return
+        try:
+            subprocess.Popen(['explorer', '/select,', self.document_paths[positions[0]]])
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not open document: {str(e)}")
+        
     def on_company_select(self, event=None):
         """Handle company selection"""
         self.check_missing_folders()
+        self.search_documents()
         
     def open_folder(self):
         """Open selected folder"""
@@ -103,6 +203,50 @@ class FolderTab:
         else:
             messagebox.showerror("Error", f"Could not create folder for {company.value}/{month} {year}")
             
+    def provision_year(self):
+        """Create the selected company's month folders and account document folders for the year"""
+        if not all([self.company_var.get(), self.year_var.get()]):
+            messagebox.showwarning("Warning", "Please select company and year")
+            return
+            
+        company = Company(self.company_var.get())
+        year = int(self.year_var.get())
+        template = account_document_template(self._account_names(company))
+        
+        # Folder creation runs off the Tk thread; the result comes back through after()
+        def worker():
+            try:
+                report = self.folder_manager.provision([company], [year], template)
+            except Exception as e:
+                self.main_frame.after(0, self._on_provision_error, e)
+                return
+            self.main_frame.after(0, self._on_provisioned, company, year, report)
+            
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def _account_names(self, company):
+        """Bank account names saved for a company in the Bank Accounts tab"""
+        accounts_file = (Path(__file__).parent.parent / "data" / "bank_accounts" /
+                         f"{company.value.lower()}_accounts.json")
+        try:
+            with accounts_file.open('r', encoding='utf-8') as f:
+                return [account.get('account_name', '') for account in json.load(f).get('accounts', [])]
+        except (OSError, ValueError):
+            return []
+            
+    def _on_provision_error(self, error):
+        messagebox.showerror("Error", f"Could not provision folders: {str(error)}")
+            
+    def _on_provisioned(self, company, year, report):
+        message = (f"Provisioned {company.value} {year}: {len(report['created'])} folders created, "
+                   f"{report['existing']} already present")
+        if report['failed']:
+            messagebox.showwarning("Provision", f"{message}, {len(report['failed'])} failed:\n" +
+                                   "\n".join(f"{path}: {error}" for path, error in report['failed'].items()))
+        else:
+            messagebox.showinfo("Provision", message)
+        self.check_missing_folders()
+        
     def check_missing_folders(self):
         """Check and display missing folders"""
         self.notification_text.delete(1.0, tk.END)
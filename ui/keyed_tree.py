@@ -0,0 +1,124 @@
+def unique_keys(keys):
+    """Make row keys unique by suffixing repeats, keeping the first as-is"""
+    seen = {}
+    unique = []
+    for key in keys:
+        key = str(key)
+        if key in seen:
+            seen[key] += 1
+            key = f"{key}#{seen[key]}"
+        else:
+            seen[key] = 0
+        unique.append(key)
+    return unique
+
+class KeyedTreeAdapter:
+    """Keeps a flat ttk.Treeview in step with a keyed dataset.
+
+    sync() compares the new rows with what is on screen and applies only
+    deletes, inserts, updates and moves; rows that did not change are left
+    alone, so the selection and focus survive a refresh. Each row is
+    (key, values) with optional tags and text: (key, values, tags, text).
+    Keys become the item iids.
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}  # iid -> (values, tags, text) as last applied
+        self._job = None
+        self._pending = None
+
+    def sync(self, rows, chunk_size=None):
+        """Apply the difference to rows; with chunk_size, spread it over after() ticks"""
+        self.cancel()
+        rows = [self._normalize(row) for row in rows]
+        keys = [row[0] for row in rows]
+        wanted = set(keys)
+        if len(wanted) != len(keys):
+            raise ValueError("Row keys must be unique")
+
+        top = self.tree.yview()[0]
+
+        stale = [key for key in self.rows if key not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for key in stale:
+                del self.rows[key]
+
+        # Moves are only needed when surviving rows changed relative order
+        shown = [key for key in self.tree.get_children() if key in self.rows]
+        kept = [key for key in keys if key in self.rows]
+        reorder = shown != kept
+
+        operations = self._operations(rows, reorder)
+        if chunk_size is None:
+            for operation in operations:
+                operation()
+            self.tree.yview_moveto(top)
+        else:
+            self._pending = operations
+            self._run_chunk(chunk_size, top)
+
+    def update(self, key, values=None, tags=None):
+        """Change one managed row in place, keeping the cache in step"""
+        current_values, current_tags, text = self.rows[key]
+        self._update(key, tuple(values) if values is not None else current_values,
+                     tuple(tags) if tags is not None else current_tags, text)
+
+    def clear(self):
+        """Remove every managed row"""
+        self.cancel()
+        if self.rows:
+            self.tree.delete(*self.rows)
+        self.rows = {}
+
+    def cancel(self):
+        """Abandon the rest of a chunked sync"""
+        if self._job is not None:
+            self.tree.after_cancel(self._job)
+            self._job = None
+        self._pending = None
+
+    def pending(self):
+        """True while a chunked sync still has work queued"""
+        return self._pending is not None
+
+    def _normalize(self, row):
+        key, values = str(row[0]), tuple(row[1])
+        tags = tuple(row[2]) if len(row) > 2 and row[2] else ()
+        text = row[3] if len(row) > 3 else ''
+        return key, values, tags, text
+
+    def _operations(self, rows, reorder):
+        """Yield one callable per tree change, in row order"""
+        for index, (key, values, tags, text) in enumerate(rows):
+            current = self.rows.get(key)
+            if current is None:
+                yield lambda k=key, i=index, v=values, t=tags, x=text: self._insert(k, i, v, t, x)
+                continue
+            if reorder:
+                yield lambda k=key, i=index: self.tree.move(k, '', i)
+            if current != (values, tags, text):
+                yield lambda k=key, v=values, t=tags, x=text: self._update(k, v, t, x)
+
+    def _insert(self, key, index, values, tags, text):
+        self.tree.insert('', index, iid=key, text=text, values=values, tags=tags)
+        self.rows[key] = (values, tags, text)
+
+    def _update(self, key, values, tags, text):
+        self.tree.item(key, text=text, values=values, tags=tags)
+        self.rows[key] = (values, tags, text)
+
+    def _run_chunk(self, chunk_size, top=None):
+        """Apply up to chunk_size changes and schedule the rest"""
+        self._job = None
+        operations = self._pending
+        for _ in range(chunk_size):
+            operation = next(operations, None)
+            if operation is None:
+                self._pending = None
+                break
+            operation()
+        if top is not None:
+            self.tree.yview_moveto(top)
+        if self._pending is not None:
+            self._job = self.tree.after(1, self._run_chunk, chunk_size)
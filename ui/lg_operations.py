@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
+from utils.lg_system import LGSnapshotLoader, LGExpiryScheduler, DISPLAY_COLUMNS, expiry_tags
+from ui.keyed_tree import unique_keys
+from ui.virtual_table import VirtualTable
 
 class LGTab:
     def __init__(self, parent, main_app):
@@ -20,6 +22,17 @@ class LGTab:
         # Ensure data directory exists
         self.lg_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Parsed sheet is cached until the file's mtime or size changes
+        self.loader = LGSnapshotLoader(self.lg_file)
+        self.snapshot = None
+        self._displayed = None  # Key of the snapshot currently shown
+        
+        # Expiry tags move on one timer armed for the next threshold crossing
+        self.expiry_scheduler = LGExpiryScheduler()
+        self._expiry_timer = None
+        self._display_date = None
+        self._display_df = None
+        
     def create_lg_tab(self):
         """Create the LG tab interface"""
         # Top section with Update button
@@ -38,13 +51,7 @@ class LGTab:
         results_frame = ttk.LabelFrame(self.lg_frame, text="Results")
         results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Create Treeview for results
-        self.results_tree = ttk.Treeview(results_frame, columns=(
-            "Sequence No.", "Vendor Name", "LG Number", "Start Date",
-            "End Date", "Type of LG", "Related To", "Days Remaining"
-        ), show="headings", style="Results.Treeview")
-        
-        # Configure columns
+        # Results table only materializes the visible rows
         column_widths = {
             "Sequence No.": 100,
             "Vendor Name": 150,
@@ -55,17 +62,16 @@ class LGTab:
             "Related To": 120,
             "Days Remaining": 100
         }
+        self.results = VirtualTable(results_frame, DISPLAY_COLUMNS, widths=column_widths,
+                                    tag_column='Tag', style="Results.Treeview")
+        self.results.pack(fill=tk.BOTH, expand=True)
+        self.results_tree = self.results.tree
         
-        for col, width in column_widths.items():
-            self.results_tree.heading(col, text=col)
-            self.results_tree.column(col, width=width, minwidth=width)
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-        self.results_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Configure tag colors
+        self.results_tree.tag_configure('expired', foreground='red')
+        self.results_tree.tag_configure('urgent', foreground='orange')
+        self.results_tree.tag_configure('warning', foreground='#FF8C00')  # Dark orange
+        self.results_tree.tag_configure('normal', foreground='black')
         
         # Summary section
         summary_frame = ttk.LabelFrame(self.lg_frame, text="Summary")
@@ -89,126 +95,142 @@ class LGTab:
         
         self.summary_tree.pack(fill=tk.X, padx=5, pady=5)
 
-    def update_lgs(self):
-        """Update LGs information with proper error handling"""
-        try:
-            # Check if file exists
-            if not self.lg_file.exists():
+    def update_lgs(self, silent=False):
+        """Update LGs information, parsing the file on a worker thread"""
+        # Check if file exists
+        if not self.lg_file.exists():
+            if not silent:
                 messagebox.showerror("Error", "LGs file not found")
-                return
-                
-            # Clear existing items
-            self.results_tree.delete(*self.results_tree.get_children())
-            self.summary_tree.delete(*self.summary_tree.get_children())
+            return
             
-            # Read Excel file
-            df = pd.read_excel(self.lg_file)
+        # Callbacks arrive on the worker thread; hand them to the Tk thread
+        self.loader.load_async(
+            lambda snapshot, changed: self.lg_frame.after(0, self._on_snapshot_loaded, snapshot, changed, silent),
+            lambda error: self.lg_frame.after(0, self._on_snapshot_error, error, silent)
+        )
+        
+    def _on_snapshot_loaded(self, snapshot, changed, silent=False):
+        """Show a loaded snapshot unless the same data is already on screen"""
+        try:
+            self.snapshot = snapshot
+            self.last_check_time = datetime.now()
             
-            if df.empty:
-                messagebox.showinfo("Info", "No LG data found")
-                return
-                
-            # Basic data validation
-            required_columns = ["Sequence No.", "Vendor Name", "LG Number", 
-                              "Start Date", "End Date", "Type of LG"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                messagebox.showerror("Error", f"Missing columns: {', '.join(missing_columns)}")
+            # Tags and Days Remaining are kept current by the expiry timer
+            if not changed and self._displayed == snapshot.key:
                 return
                 
-            # Convert dates safely
-            try:
-                df['Start Date'] = pd.to_datetime(df['Start Date'], errors='coerce')
-                df['End Date'] = pd.to_datetime(df['End Date'], errors='coerce')
-            except Exception as e:
-                messagebox.showerror("Error", f"Invalid date format: {str(e)}")
+            # Clear the summary; result rows are diffed against the new data
+            self.summary_tree.delete(*self.summary_tree.get_children())
+            self._displayed = snapshot.key
+            
+            if snapshot.empty:
+                self._display_df = None
+                self.results.set_data(snapshot.df.iloc[0:0])
+                self._arm_expiry_scheduler(snapshot.df)
+                if not silent:
+                    messagebox.showinfo("Info", "No LG data found")
                 return
                 
-            # Remove rows with invalid dates
-            df = df.dropna(subset=['Start Date', 'End Date'])
-            
-            # Calculate days remaining
-            today = datetime.now()
-            df['Days Remaining'] = (df['End Date'] - today).dt.days
-            
-            # Update display
+            # Update display; rows are keyed by sequence and LG number
+            df = snapshot.with_days_remaining()
+            df.index = unique_keys(df['Sequence No.'].astype(str) + '|' + df['LG Number'].astype(str))
+            self._arm_expiry_scheduler(df)
             self._update_display(df)
             
-            # Update last check time
-            self.last_check_time = datetime.now()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update LGs: {str(e)}")
             
+    def _on_snapshot_error(self, error, silent=False):
+        """Report a failed load on the Tk thread"""
+        if silent:
+            print(f"Error loading LGs: {str(error)}")
+        elif isinstance(error, FileNotFoundError):
+            messagebox.showerror("Error", "LGs file not found")
+        elif isinstance(error, ValueError):
+            messagebox.showerror("Error", str(error))
+        else:
+            messagebox.showerror("Error", f"Failed to update LGs: {str(error)}")
+            
     def _update_display(self, df):
         """Update display with dataframe data"""
         try:
-            # Clear existing items
-            for item in self.results_tree.get_children():
-                self.results_tree.delete(item)
+            # Tags are classified for the whole frame at once
+            if 'Tag' not in df.columns:
+                df['Tag'] = expiry_tags(df['Days Remaining'])
                 
-            # Update counter for LGs needing attention
-            urgent_count = 0
+            # The table renders visible rows straight from the frame
+            self._display_df = df
+            self.results.set_data(df, keep_view=True)
             
-            # Add data to treeview
-            for _, row in df.iterrows():
-                days_remaining = row['Days Remaining']
-                
-                # Count LGs that need attention (expired or close to expiry)
-                if days_remaining <= 7:  # 7 days or less remaining, or already expired
-                    urgent_count += 1
+            # Update summary tree; the groupby is cached on the snapshot
+            for values in self.snapshot.summary_rows():
+                self.summary_tree.insert('', 'end', values=values)
                 
-                # Format row values
-                values = [
-                    row['Sequence No.'],
-                    row['Vendor Name'],
-                    row['LG Number'],
-                    row['Start Date'],
-                    row['End Date'],
-                    row['Type of LG'],
-                    row['Related To'],
-                    days_remaining
-                ]
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to update display: {str(e)}")
+            
+    def _arm_expiry_scheduler(self, df):
+        """Track the displayed LGs and publish their urgent count"""
+        now = datetime.now()
+        self.expiry_scheduler.load(
+            {str(index): end_date for index, end_date in zip(df.index, df['End Date'])}, now)
+        self._display_date = now.date()
+        self._update_notifications()
+        self._schedule_expiry_timer()
+        
+    def _schedule_expiry_timer(self):
+        """Arm a single after() timer for the next crossing or midnight"""
+        if self._expiry_timer is not None:
+            self.lg_frame.after_cancel(self._expiry_timer)
+            self._expiry_timer = None
+            
+        now = datetime.now()
+        # Days Remaining changes for every LG at midnight
+        due = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        next_due = self.expiry_scheduler.next_due()
+        if next_due is not None and next_due < due:
+            due = next_due
+            
+        # Wake at least hourly so a suspended machine catches up soon after resuming
+        delay = (due - now).total_seconds() * 1000 + 1
+        delay = int(min(max(delay, 1), 3600000))
+        self._expiry_timer = self.lg_frame.after(delay, self._on_expiry_timer)
+        
+    def _on_expiry_timer(self):
+        """Update only the LGs that crossed a threshold, without reading the file"""
+        self._expiry_timer = None
+        try:
+            now = datetime.now()
+            changed = self.expiry_scheduler.advance(now)
+            df = self._display_df
+            if df is None:
+                return
                 
-                # Set tag based on days remaining
-                if days_remaining < 0:
-                    tag = 'expired'
-                elif days_remaining <= 3:
-                    tag = 'urgent'
-                elif days_remaining <= 7:
-                    tag = 'warning'
-                else:
-                    tag = 'normal'
-                    
-                self.results_tree.insert('', 'end', values=values, tags=(tag,))
+            if now.date() != self._display_date:
+                # New day: every Days Remaining moves, recompute the column at once
+                self._display_date = now.date()
+                df['Days Remaining'] = (df['End Date'] - now).dt.days
+            elif changed:
+                keys = list(changed)
+                df.loc[keys, 'Days Remaining'] = (df.loc[keys, 'End Date'] - now).dt.days
                 
-            # Update notification count
-            if hasattr(self.main_app, 'update_all_notifications'):
-                self.main_app.update_all_notifications(urgent_count)
+            if changed:
+                df.loc[list(changed), 'Tag'] = list(changed.values())
                 
-            # Configure tag colors
-            self.results_tree.tag_configure('expired', foreground='red')
-            self.results_tree.tag_configure('urgent', foreground='orange')
-            self.results_tree.tag_configure('warning', foreground='#FF8C00')  # Dark orange
-            self.results_tree.tag_configure('normal', foreground='black')
+            # Only the visible rows are redrawn
+            self.results.refresh()
+                    
+            if changed:
+                self._update_notifications()
+        finally:
+            self._schedule_expiry_timer()
             
-            # Update summary tree
-            summary = df.groupby('Type of LG').agg({
-                'LG Number': 'count',
-                'Amount': 'sum'
-            }).reset_index()
+    def _update_notifications(self):
+        """Push the urgent LG count to every notification label"""
+        if hasattr(self.main_app, 'update_all_notifications'):
+            self.main_app.update_all_notifications(self.expiry_scheduler.urgent_count)
             
-            for _, row in summary.iterrows():
-                self.summary_tree.insert('', 'end', values=(
-                    row['Type of LG'],
-                    row['LG Number'],
-                    f"{row['Amount']:,.2f}"
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to update display: {str(e)}")
-    
     def check_for_updates(self):
         """Check for updates if needed"""
         if not self.last_check_time or (datetime.now() - self.last_check_time).total_seconds() > 3600:
-            self.update_lgs()
+            self.update_lgs(silent=True)
@@ -0,0 +1,69 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import csv
+from pathlib import Path
+import pandas as pd
+from ui.virtual_table import VirtualTable
+
+class LogViewer:
+    """Read-only window over a CSV log such as AUDIT_LOG.csv or EXCEPTION_LOG.csv"""
+    def __init__(self, parent, title, log_file, columns):
+        self.log_file = Path(log_file)
+        self.columns = list(columns)
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("900x500")
+        
+        # Search and refresh controls
+        control_frame = ttk.Frame(self.window)
+        control_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(control_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', lambda *args: self.apply_search())
+        ttk.Entry(control_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        ttk.Button(control_frame, text="Refresh", command=self.load).pack(side=tk.RIGHT, padx=5)
+        self.count_var = tk.StringVar(value="Entries: 0")
+        ttk.Label(control_frame, textvariable=self.count_var).pack(side=tk.RIGHT, padx=10)
+        
+        # Only the visible entries are materialized
+        self.table = VirtualTable(self.window, self.columns, widths={'details': 300, 'description': 300})
+        self.table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        self.load()
+        
+    def read_log(self):
+        """Read the log into a frame of strings, tolerating rows of other widths"""
+        if not self.log_file.exists():
+            return pd.DataFrame(columns=self.columns)
+            
+        with open(self.log_file, 'r', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            header = next(reader, None) or self.columns
+            width = len(header)
+            # Both AuditTrail and ExceptionHandler append to the audit log with different fields
+            rows = [(row + [''] * width)[:width] for row in reader if row]
+            
+        df = pd.DataFrame(rows, columns=header)
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = ''
+        return df[self.columns]
+        
+    def load(self):
+        """Reload the log, newest entries first"""
+        try:
+            df = self.read_log()
+            self.table.set_data(df)
+            if 'timestamp' in self.columns and len(df):
+                self.table.sort_by('timestamp', ascending=False)
+            self.apply_search()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load log: {str(e)}", parent=self.window)
+            
+    def apply_search(self):
+        """Filter entries containing the search text in any column"""
+        self.table.search(self.search_var.get())
+        self.count_var.set(f"Entries: {self.table.row_count()}")
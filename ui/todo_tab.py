@@ -4,18 +4,18 @@ from datetime import datetime
 import tkcalendar
 from utils.todo_system import TodoManager, Task, TaskPriority, TaskStatus, UserRole
 from pathlib import Path
+from ui.keyed_tree import KeyedTreeAdapter
 
 class TodoTab:
     def __init__(self, parent, current_user):
         self.parent = parent
         self.current_user = current_user
-        self.todo_manager = TodoManager()
         
         # Set data file path and ensure directory exists
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.todo_manager.data_file = self.data_dir / "todo_data.json"
+        self.todo_manager = TodoManager(self.data_dir / "todo_data.json")
         
         # Create main frame with padding
         self.main_frame = ttk.Frame(parent, padding="10")
@@ -158,6 +158,9 @@ class TodoTab:
         # Bind tree selection
         self.tree.bind('<<TreeviewSelect>>', self.on_select)
         
+        # Refreshes only touch tasks that changed, keeping the selection
+        self.task_rows = KeyedTreeAdapter(self.tree)
+        
         # Initial update
         self.update_task_list()
         self.is_new_task = True
@@ -210,8 +213,7 @@ class TodoTab:
             messagebox.showwarning("Warning", "Please enter feedback")
             return
             
-        task.add_feedback(self.current_user.username, feedback)
-        self.todo_manager.save_tasks()
+        self.todo_manager.add_feedback(task, self.current_user.username, feedback)
         self.update_feedback_history(task)
         self.new_feedback.delete("1.0", tk.END)
         messagebox.showinfo("Success", "Feedback added successfully")
@@ -299,20 +301,19 @@ class TodoTab:
 
     def update_task_list(self):
         """Update task list display"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Add active tasks
-        for i, task in enumerate(self.todo_manager.get_active_tasks()):
-            item_id = f"I{i+1:03d}"  # Generate predictable IDs
-            self.tree.insert('', 'end', iid=item_id, text=task.description, values=(
+        tasks = self.todo_manager.get_active_tasks()
+        
+        # Rows are keyed by task id so they keep their items across refreshes
+        self.task_rows.sync(
+            (task.id, (
                 task.owner,
                 task.reviewer if task.reviewer else "",
                 task.status.value,
                 task.deadline,
                 task.priority.value
-            ))
+            ), (), task.description)
+            for task in tasks
+        )
 
     def update_button_states(self):
         """Update button states based on selected task and user permissions"""
@@ -345,15 +346,11 @@ class TodoTab:
         if not selected:
             return None
 
-        item = selected[0]
-        description = self.tree.item(item)["text"]
-        owner = self.tree.item(item)["values"][0]
-
-        for task in self.todo_manager.get_active_tasks():
-            if task.description == description and task.owner == owner:
-                return task
-
-        return None
+        # Item iids are task ids
+        task = self.todo_manager.get_task(selected[0])
+        if task is None or task.archived:
+            return None
+        return task
 
     def start_work(self):
         """Start work on selected task"""
@@ -0,0 +1,278 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+import pandas as pd
+
+class VirtualTable(ttk.Frame):
+    """Treeview that only materializes the visible window of a DataFrame.
+
+    The tree holds one item per visible line; scrolling re-fills those items
+    from the backing frame, so a 100k row source costs the same to show as a
+    30 row one. Sorting and filtering work on row positions in the source:
+    filter() takes a boolean mask, sort_by() reorders with pandas, and
+    neither touches the tree beyond the visible rows.
+    """
+    def __init__(self, parent, columns, widths=None, formatters=None, sort_keys=None,
+                 tag_column=None, style=None, selectmode="browse", sortable=True):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.formatters = formatters or {}
+        self.sort_keys = sort_keys or {}  # column -> callable(Series) giving sortable values
+        self.tag_column = tag_column
+
+        self.df = pd.DataFrame(columns=self.columns)
+        self._mask = None   # bool per source row, None = all rows
+        self._order = None  # source positions in sort order, None = source order
+        self._view = np.arange(0)
+        self._sort = None   # (column, ascending)
+        self._first = 0
+        self._visible = 20
+        self._selected = set()  # source positions
+        self._select_callbacks = []
+
+        options = {'columns': self.columns, 'show': "headings", 'selectmode': selectmode}
+        if style:
+            options['style'] = style
+        self.tree = ttk.Treeview(self, **options)
+        for col in self.columns:
+            if sortable:
+                self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            else:
+                self.tree.heading(col, text=col)
+            width = (widths or {}).get(col, 100)
+            self.tree.column(col, width=width, minwidth=min(width, 50))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        self.tree.bind('<Up>', lambda e: self._move_cursor(-1))
+        self.tree.bind('<Down>', lambda e: self._move_cursor(1))
+        self.tree.bind('<Prior>', lambda e: self._move_cursor(-self._visible))
+        self.tree.bind('<Next>', lambda e: self._move_cursor(self._visible))
+
+    # Data
+
+    def set_data(self, df, keep_view=False):
+        """Show a new source frame; keep_view re-applies the current sort"""
+        self.df = df
+        self._mask = None
+        self._order = None
+        self._selected = set()
+        if keep_view and self._sort:
+            self._order = self._sorted_positions(*self._sort)
+        else:
+            self._sort = None
+        self._first = 0
+        self._rebuild_view()
+
+    def refresh(self):
+        """Re-render the visible rows after in-place changes to the source"""
+        self._render()
+
+    def filter(self, mask=None):
+        """Show only source rows where mask is True; None shows every row"""
+        self._mask = None if mask is None else np.asarray(mask, dtype=bool)
+        self._first = 0
+        self._rebuild_view()
+
+    def search(self, text, columns=None):
+        """Filter to rows containing text (case-insensitive) in any of columns"""
+        text = text.strip()
+        if not text:
+            self.filter(None)
+            return
+        mask = np.zeros(len(self.df), dtype=bool)
+        for col in columns or self.columns:
+            mask |= self.df[col].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+        self.filter(mask)
+
+    def sort_by(self, column, ascending=None):
+        """Sort the view by a column; repeated calls toggle the direction"""
+        if ascending is None:
+            ascending = self._sort != (column, True)
+        self._sort = (column, ascending)
+        self._order = self._sorted_positions(column, ascending)
+        self._rebuild_view()
+
+    def row_count(self):
+        """Rows currently in the view (after filtering)"""
+        return len(self._view)
+
+    def view_positions(self):
+        """Source positions of the view in display order"""
+        return self._view
+
+    def view_frame(self):
+        """The filtered, sorted rows as a DataFrame"""
+        return self.df.iloc[self._view]
+
+    # Selection
+
+    def selected_positions(self):
+        """Source positions of the selected rows, in view order"""
+        if not self._selected:
+            return []
+        return self._view[np.isin(self._view, list(self._selected))].tolist()
+
+    def select_position(self, position):
+        """Select a source row and scroll it into view"""
+        self._selected = {position}
+        where = np.flatnonzero(self._view == position)
+        if len(where):
+            self.see(int(where[0]))
+        else:
+            self._render()
+
+    def bind_select(self, callback):
+        """Call callback() when the user changes the selection"""
+        self._select_callbacks.append(callback)
+
+    # Scrolling
+
+    def see(self, index):
+        """Scroll so the view row at index is visible"""
+        if index < self._first:
+            self._first = index
+        elif index >= self._first + self._visible:
+            self._first = index - self._visible + 1
+        self._clamp()
+        self._render()
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return self._fractions()
+        if args[0] == 'moveto':
+            self._first = int(float(args[1]) * len(self._view))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self._visible if args[2] == 'pages' else 1)
+            self._first += step
+        self._clamp()
+        self._render()
+
+    # Internals
+
+    def _sorted_positions(self, column, ascending):
+        """All source positions ordered by column, vectorized through pandas"""
+        series = self.df[column]
+        if column in self.sort_keys:
+            series = pd.Series(self.sort_keys[column](series))
+        series = series.reset_index(drop=True)
+        try:
+            ordered = series.sort_values(ascending=ascending, kind='stable', na_position='last')
+        except TypeError:
+            # Mixed types in an object column: compare as text
+            ordered = series.astype(str).sort_values(ascending=ascending, kind='stable')
+        return ordered.index.to_numpy()
+
+    def _rebuild_view(self):
+        """Combine sort order and filter mask into the list of shown positions"""
+        view = self._order if self._order is not None else np.arange(len(self.df))
+        if self._mask is not None:
+            view = view[self._mask[view]]
+        self._view = view
+        self._clamp()
+        self._render()
+
+    def _clamp(self):
+        self._first = max(0, min(self._first, len(self._view) - self._visible))
+
+    def _fractions(self):
+        total = len(self._view)
+        if not total:
+            return (0.0, 1.0)
+        return (self._first / total, min(1.0, (self._first + self._visible) / total))
+
+    def _render(self):
+        """Fill the pooled tree items with the rows of the visible window"""
+        positions = self._view[self._first:self._first + self._visible]
+        rows = self.df.iloc[positions] if len(positions) else self.df.iloc[0:0]
+
+        cells = []
+        for col in self.columns:
+            values = rows[col].to_numpy(dtype=object) if col in rows.columns else [''] * len(rows)
+            formatter = self.formatters.get(col)
+            cells.append([self._format(value, formatter) for value in values])
+        tags = (rows[self.tag_column].to_numpy(dtype=object).tolist()
+                if self.tag_column and self.tag_column in rows.columns else None)
+
+        items = self.tree.get_children()
+        if len(items) > len(positions):
+            self.tree.delete(*items[len(positions):])
+        selected = []
+        for i, position in enumerate(positions):
+            iid = str(i)
+            values = [column[i] for column in cells]
+            row_tags = (tags[i],) if tags else ()
+            if i < len(items):
+                self.tree.item(iid, values=values, tags=row_tags)
+            else:
+                self.tree.insert('', 'end', iid=iid, values=values, tags=row_tags)
+            if position in self._selected:
+                selected.append(iid)
+        self.tree.selection_set(selected)
+        self.scrollbar.set(*self._fractions())
+
+    @staticmethod
+    def _format(value, formatter):
+        if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+            return ''
+        if formatter is None:
+            return value
+        try:
+            return formatter(value)
+        except Exception:
+            return str(value)
+
+    def _on_resize(self, event):
+        rowheight = ttk.Style().lookup(self.tree.cget('style') or 'Treeview', 'rowheight')
+        try:
+            rowheight = int(rowheight)
+        except (TypeError, ValueError):
+            rowheight = 20
+        # Reserve one row for the headings
+        visible = max(1, event.height // rowheight - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._clamp()
+            self._render()
+
+    def _on_select(self, event=None):
+        """Map the selected pool items back to source positions"""
+        window = self._view[self._first:self._first + self._visible]
+        window_positions = set(window.tolist())
+        hidden = {p for p in self._selected if p not in window_positions}
+        shown = {int(window[int(iid)]) for iid in self.tree.selection() if int(iid) < len(window)}
+        if hidden | shown != self._selected:
+            self._selected = hidden | shown
+            for callback in self._select_callbacks:
+                callback()
+
+    def _on_mousewheel(self, event):
+        self._scroll_by(-1 * (event.delta // 120) * 3 if event.delta else 0)
+        return "break"
+
+    def _scroll_by(self, units):
+        self.yview('scroll', units, 'units')
+        return "break"
+
+    def _move_cursor(self, step):
+        """Keyboard navigation across the whole view, not just the pooled items"""
+        if not len(self._view):
+            return "break"
+        current = self.selected_positions()
+        if current:
+            index = int(np.flatnonzero(self._view == current[0])[0]) + step
+        else:
+            index = self._first
+        index = max(0, min(index, len(self._view) - 1))
+        self.select_position(int(self._view[index]))
+        for callback in self._select_callbacks:
+            callback()
+        return "break"
@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from utils.payment_processor import PaymentProcessor
+
+class AsyncPaymentProcessor:
+    """Asyncio front end for PaymentProcessor.
+
+    Payments are taken from a bounded asyncio queue. Validation and reference
+    reservation run inline on the event loop; journal writes are handed to a
+    small thread pool. At most max_inflight writes may be outstanding, so when
+    the journal falls behind the consumers stop draining the queue and submit()
+    waits on the full queue instead of buffering without limit.
+
+    Usage:
+        async with AsyncPaymentProcessor(PaymentProcessor(files_dir)) as payments:
+            result = await payments.submit(payment_data)
+    """
+
+    def __init__(self, processor, queue_size=1000, max_inflight=256, persist_workers=4, consumers=1):
+        if isinstance(processor, PaymentProcessor):
+            self.processor = processor
+        else:
+            self.processor = PaymentProcessor(processor)
+        self.queue_size = queue_size
+        self.max_inflight = max_inflight
+        self.persist_workers = persist_workers
+        self.num_consumers = consumers
+        self.queue = None
+        self.executor = None
+        self._inflight = None
+        self._consumers = []
+        self._writes = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self):
+        """Create the queue and start the consumer tasks on the running loop"""
+        if self._consumers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self.executor = ThreadPoolExecutor(max_workers=self.persist_workers,
+                                           thread_name_prefix="payment-journal")
+        self._consumers = [asyncio.ensure_future(self._consume())
+                           for _ in range(self.num_consumers)]
+
+    async def stop(self):
+        """Drain queued payments, wait for pending writes, stop the consumers and close the journal"""
+        if not self._consumers:
+            return
+        await self.queue.join()
+        if self._writes:
+            await asyncio.gather(*self._writes)
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        self.processor.close()
+
+    async def submit(self, payment_data):
+        """Queue a payment and wait for its result dict.
+
+        Waits for queue space first, which is where backpressure reaches callers.
+        """
+        if not self._consumers:
+            raise RuntimeError("AsyncPaymentProcessor is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((payment_data, future))
+        return await future
+
+    async def submit_many(self, payments):
+        """Submit payments concurrently, returning results in input order"""
+        return await asyncio.gather(*(self.submit(payment) for payment in payments))
+
+    def pending(self):
+        """Payments queued plus journal writes not yet finished"""
+        queued = self.queue.qsize() if self.queue else 0
+        return queued + len(self._writes)
+
+    async def _consume(self):
+        """Validate and reserve inline, then hand the write to the executor"""
+        while True:
+            payment_data, future = await self.queue.get()
+            try:
+                result = {'success': False, 'error': None, 'error_type': None}
+                try:
+                    self.processor.validate_payment(payment_data)
+                    payment_id, payment_record = self.processor.reserve_payment(payment_data)
+                except Exception as e:
+                    self._resolve(future, self.processor.record_error(result, e))
+                    continue
+
+                # Blocks this consumer, and so the queue, while the journal is behind
+                await self._inflight.acquire()
+                write = asyncio.ensure_future(self._persist(payment_id, payment_record, result, future))
+                self._writes.add(write)
+                write.add_done_callback(self._writes.discard)
+            finally:
+                self.queue.task_done()
+
+    async def _persist(self, payment_id, payment_record, result, future):
+        """Run the journal write on the executor and resolve the caller's future"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.processor.persist_payment, payment_record)
+            result['success'] = True
+            result['payment_id'] = payment_id
+        except Exception as e:
+            self.processor.record_error(result, e)
+        finally:
+            self._inflight.release()
+        self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future, result):
+        """Deliver a result unless the caller has given up waiting"""
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,123 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import re
+import threading
+import pandas as pd
+from utils.clearing_system import prepare_clearing_frame, CLEARING_COLUMNS
+
+def read_clearing_sheet(path):
+    """Read the first sheet of a clearing export into a clearing frame.
+
+    .xlsx files are streamed row by row with openpyxl in read-only mode
+    rather than loaded as a whole workbook; other formats go through
+    pd.read_excel.
+    """
+    path = Path(path)
+    if path.suffix.lower() != '.xlsx':
+        return prepare_clearing_frame(pd.read_excel(path))
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS))
+        columns = [str(col).strip() if col is not None else f"Unnamed: {i}"
+                   for i, col in enumerate(header)]
+        df = pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        workbook.close()
+    return prepare_clearing_frame(df)
+
+def file_companies(paths, gl_accounts, default):
+    """Company each export belongs to, by the GL account number in its name.
+
+    gl_accounts maps company -> GL account number. A file naming no known
+    account belongs to default.
+    """
+    patterns = {company: re.compile(rf"(?<!\d){re.escape(account)}(?!\d)")
+                for company, account in gl_accounts.items()}
+    companies = {}
+    for path in paths:
+        name = Path(path).stem
+        named = [company for company, pattern in patterns.items() if pattern.search(name)]
+        companies[str(path)] = named[0] if len(named) == 1 else default
+    return companies
+
+def _read_file(path):
+    """Worker entry point: (path, frame, error message)"""
+    try:
+        return path, read_clearing_sheet(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+class ClearingImport:
+    """Read several clearing exports at once and combine them.
+
+    Each file is parsed and normalized in its own worker process; the
+    parent only concatenates the normalized frames, in the order the files
+    were given. Files that fail are reported rather than aborting the
+    import. A single file, or a single worker, is read in-process.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._thread = None
+
+    def run(self, paths, progress=None):
+        """Import paths and return (frame, errors).
+
+        errors maps each failed path to its message. progress, if given, is
+        called as progress(done, total, path) after each file finishes.
+        """
+        paths = [str(path) for path in paths]
+        frames = {}
+        errors = {}
+
+        def finished(path, df, error):
+            if error is None:
+                frames[path] = df
+            else:
+                errors[path] = error
+            if progress is not None:
+                progress(len(frames) + len(errors), len(paths), path)
+
+        if self.workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as executor:
+                futures = [executor.submit(_read_file, path) for path in paths]
+                for future in as_completed(futures):
+                    finished(*future.result())
+        else:
+            for path in paths:
+                finished(*_read_file(path))
+
+        ordered = [frames[path] for path in paths if path in frames]
+        if not ordered:
+            return prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS)), errors
+        return pd.concat(ordered, ignore_index=True), errors
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_async(self, paths, on_done, on_error, progress=None):
+        """Run run() on a worker thread; returns False if one is already running.
+
+        Callbacks run on the worker thread, so UI callers should hand them
+        to the Tk thread with after().
+        """
+        if self.is_running():
+            return False
+
+        def worker():
+            try:
+                df, errors = self.run(paths, progress)
+            except Exception as e:
+                on_error(e)
+                return
+            on_done(df, errors)
+
+        self._thread = threading.Thread(target=worker, daemon=True)
+        self._thread.start()
+        return True
@@ -0,0 +1,539 @@
+from pathlib import Path
+import json
+import os
+import numpy as np
+import pandas as pd
+
+CLEARING_COLUMNS = ['Month', 'Transaction Number', 'Vendor Name', 'Amount', 'Notes', 'Comments',
+                    'Match Status']
+
+ALL_COLUMNS = "All Columns"
+
+# Columns users edit by hand; changes to them are journaled, not rewritten
+NOTE_COLUMNS = ['Notes', 'Comments']
+
+# Bump when the stored column layout changes
+# 2: added Match Status
+# 3: text columns stored as codes into UTF-8 encoded uniques
+SCHEMA_VERSION = 3
+
+# Match Status values written by match_statement
+MATCHED = 'Matched'
+MATCHED_WITHIN_TOLERANCE = 'Matched (Amount Difference)'
+UNMATCHED = 'Unmatched'
+
+def to_halalas(amounts):
+    """Amounts in SAR (numbers or "1,234.50" strings) as int64 halalas"""
+    values = pd.Series(amounts).astype(str).str.replace(',', '', regex=False).str.strip()
+    sar = pd.to_numeric(values, errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    return np.round(sar * 100).astype(np.int64)
+
+def format_halalas(halalas):
+    """One halala amount as SAR text, e.g. 123450 becomes 1,234.50"""
+    halalas = int(halalas)
+    sign = '-' if halalas < 0 else ''
+    whole, fraction = divmod(abs(halalas), 100)
+    return f"{sign}{whole:,}.{fraction:02d}"
+
+def format_amounts(halalas):
+    """format_halalas over a column, for building text keys once"""
+    return np.array([format_halalas(value) for value in np.asarray(halalas).tolist()], dtype=object)
+
+def prepare_clearing_frame(df, amount_unit='SAR'):
+    """Clearing columns in display order with Amount as int64 halalas.
+
+    Text columns are stripped with blanks for missing values. amount_unit
+    is 'SAR' for sheets and older saves, 'halala' for frames saved as-is.
+    """
+    df = df.copy()
+    df.columns = [str(col).strip() for col in df.columns]
+    for col in CLEARING_COLUMNS:
+        if col not in df.columns:
+            df[col] = ''
+    df = df[CLEARING_COLUMNS].reset_index(drop=True)
+    for col in CLEARING_COLUMNS:
+        if col != 'Amount':
+            df[col] = df[col].fillna('').astype(str).str.strip()
+    if amount_unit == 'halala':
+        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0).astype(np.int64)
+    else:
+        df['Amount'] = to_halalas(df['Amount'])
+    return df
+
+def read_bank_statement(path):
+    """Bank statement lines as (reference, amount in halalas) plus the raw columns"""
+    statement = pd.read_csv(path, dtype=str, keep_default_na=False)
+    statement.columns = [str(col).strip().lower() for col in statement.columns]
+    for col in ['reference', 'amount']:
+        if col not in statement.columns:
+            raise ValueError(f"Bank statement is missing the {col} column")
+    statement['amount'] = to_halalas(statement['amount'])
+    return statement.reset_index(drop=True)
+
+def match_statement(clearing, statement, tolerance=0, max_rounds=10):
+    """Match clearing rows one-to-one with bank statement lines.
+
+    Rows pair up when the transaction number equals the statement reference
+    (case and surrounding spaces ignored) and the absolute amounts, in
+    halalas, differ by at most tolerance. Exact amounts are paired first;
+    the rest go to the nearest remaining amount through merge_asof on
+    sorted arrays, repeated while rows that lost a tie can still match.
+
+    Returns (status, statement_row): a Match Status per clearing row and
+    the matched statement position, or -1.
+    """
+    left = pd.DataFrame({
+        'key': clearing['Transaction Number'].astype(str).str.strip().str.upper().to_numpy(),
+        'amount': np.abs(clearing['Amount'].to_numpy(dtype=np.int64)),
+        'row': np.arange(len(clearing))
+    })
+    right = pd.DataFrame({
+        'key': statement['reference'].astype(str).str.strip().str.upper().to_numpy(),
+        'amount': np.abs(statement['amount'].to_numpy(dtype=np.int64)),
+        'line': np.arange(len(statement))
+    })
+    left = left[left['key'] != '']
+    right = right[right['key'] != '']
+
+    matched_line = np.full(len(clearing), -1, dtype=np.int64)
+
+    # Exact pairs: the n-th copy of (key, amount) on each side pair up
+    left['copy'] = left.groupby(['key', 'amount']).cumcount()
+    right['copy'] = right.groupby(['key', 'amount']).cumcount()
+    exact = left.merge(right, on=['key', 'amount', 'copy'])
+    matched_line[exact['row'].to_numpy()] = exact['line'].to_numpy()
+
+    left = left[~left['row'].isin(exact['row'])].drop(columns='copy')
+    right = right[~right['line'].isin(exact['line'])].drop(columns='copy')
+
+    for _ in range(max_rounds if tolerance > 0 else 0):
+        if left.empty or right.empty:
+            break
+        nearest = pd.merge_asof(left.sort_values('amount'), right.sort_values('amount'),
+                                on='amount', by='key', direction='nearest',
+                                tolerance=int(tolerance)).dropna(subset=['line'])
+        if nearest.empty:
+            break
+        # A statement line pairs with one clearing row; others retry next round
+        nearest = nearest.drop_duplicates('line')
+        rows = nearest['row'].to_numpy()
+        lines = nearest['line'].to_numpy(dtype=np.int64)
+        matched_line[rows] = lines
+        left = left[~left['row'].isin(rows)]
+        right = right[~right['line'].isin(lines)]
+
+    status = np.full(len(clearing), UNMATCHED, dtype=object)
+    found = matched_line >= 0
+    same = np.zeros(len(clearing), dtype=bool)
+    same[found] = (np.abs(clearing['Amount'].to_numpy(dtype=np.int64)[found]) ==
+                   np.abs(statement['amount'].to_numpy(dtype=np.int64)[matched_line[found]]))
+    status[found & same] = MATCHED
+    status[found & ~same] = MATCHED_WITHIN_TOLERANCE
+    return status, matched_line
+
+class ClearingStore:
+    """Per-company clearing data in columnar .npz files.
+
+    Each company has a compressed <company>_clearing.npz holding Amount as
+    int64 halalas and each text column as integer codes into its distinct
+    values, stored as UTF-8 bytes plus offsets so one long note does not
+    widen every row, plus a schema version, and an append-only
+    <company>_clearing.edits.jsonl of Notes/Comments edits made since.
+    Editing a note appends one line instead of rewriting the frame; load()
+    replays the edits, and save() or a long journal compacts them into
+    the .npz. Legacy <company>_clearing.json files are migrated on load.
+    """
+    COMPACT_AFTER = 1000
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._journal_lines = {}  # company -> edits appended since the last save
+
+    def data_path(self, company):
+        return self.data_dir / f"{company.lower()}_clearing.npz"
+
+    def edits_path(self, company):
+        return self.data_dir / f"{company.lower()}_clearing.edits.jsonl"
+
+    def legacy_path(self, company):
+        return self.data_dir / f"{company.lower()}_clearing.json"
+
+    def save(self, company, df):
+        """Write the whole frame and clear the edits journal"""
+        df = prepare_clearing_frame(df, 'halala')
+        arrays = {'__schema__': np.array([SCHEMA_VERSION], dtype=np.int64),
+                  'Amount': df['Amount'].to_numpy(dtype=np.int64)}
+        for col in CLEARING_COLUMNS:
+            if col != 'Amount':
+                arrays.update(self._encode_text(col, df[col]))
+
+        path = self.data_path(company)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(temp_path, path)
+
+        self.edits_path(company).unlink(missing_ok=True)
+        self._journal_lines[company.lower()] = 0
+
+    def record_edits(self, company, edits, df=None):
+        """Journal (position, column, value) note edits; compact into df when long"""
+        lines = []
+        for position, column, value in edits:
+            if column not in NOTE_COLUMNS:
+                raise ValueError(f"Only {', '.join(NOTE_COLUMNS)} can be edited in place, not {column}")
+            lines.append(json.dumps({'row': int(position), 'column': column, 'value': str(value)}) + '\n')
+        if not lines:
+            return
+
+        with open(self.edits_path(company), 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+        key = company.lower()
+        self._journal_lines[key] = self._journal_lines.get(key, 0) + len(lines)
+        if df is not None and self._journal_lines[key] >= self.COMPACT_AFTER:
+            self.save(company, df)
+
+    def load(self, company):
+        """Stored frame with journaled edits applied; empty when nothing is saved"""
+        path = self.data_path(company)
+        if not path.exists():
+            return self._migrate_legacy(company)
+
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['__schema__'][0])
+            if version > SCHEMA_VERSION:
+                raise ValueError(f"Clearing data for {company} uses schema {version}, "
+                                 f"newer than supported {SCHEMA_VERSION}")
+            df = pd.DataFrame({col: self._decode_text(col, data) for col in CLEARING_COLUMNS})
+        df = prepare_clearing_frame(df, 'halala')
+
+        applied = self._apply_edits(company, df)
+        self._journal_lines[company.lower()] = applied
+        return df
+
+    @staticmethod
+    def _encode_text(col, values):
+        """codes/data/offsets arrays for one text column"""
+        codes, uniques = pd.factorize(values.astype(str), sort=False)
+        encoded = [value.encode('utf-8') for value in uniques]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return {f'{col}.codes': codes.astype(np.int32 if len(uniques) < 2**31 else np.int64),
+                f'{col}.data': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+                f'{col}.offsets': offsets}
+
+    @staticmethod
+    def _decode_text(col, data):
+        """One text column from a stored file, in either layout"""
+        if f'{col}.codes' not in data.files:
+            # Schema 1-2 files hold fixed-width string arrays
+            return data[col] if col in data.files else ''
+        buffer = data[f'{col}.data'].tobytes()
+        offsets = data[f'{col}.offsets']
+        uniques = np.array([buffer[start:end].decode('utf-8')
+                            for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+        return uniques[data[f'{col}.codes']]
+
+    def _apply_edits(self, company, df):
+        path = self.edits_path(company)
+        if not path.exists():
+            return 0
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    edit = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    continue
+                if edit['column'] in NOTE_COLUMNS and 0 <= edit['row'] < len(df):
+                    df.iat[edit['row'], df.columns.get_loc(edit['column'])] = edit['value']
+                count += 1
+        return count
+
+    def _migrate_legacy(self, company):
+        """Convert a JSON records file to the columnar format"""
+        legacy = self.legacy_path(company)
+        if not legacy.exists():
+            return prepare_clearing_frame(pd.DataFrame(columns=CLEARING_COLUMNS))
+        with open(legacy, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = data.get('records', data.get('data', []))
+        df = prepare_clearing_frame(pd.DataFrame(records), data.get('amount_unit', 'SAR'))
+        self.save(company, df)
+        return df
+
+class ReconciliationView:
+    """Per-group balances for one clearing frame, cached per Reconcile By column.
+
+    Grouping factorizes the column once and keeps the row positions of each
+    group contiguous, so the summary and any group's drill-down are slices
+    of cached arrays. A group is Cleared when its amounts net to zero.
+    Build a new view when the frame is replaced (import or load); note
+    edits do not touch Amount, so they leave the cache valid.
+    """
+    SUMMARY_COLUMNS = ['Group', 'Count', 'Net Balance', 'Status']
+
+    def __init__(self, df):
+        self.df = df
+        self._groups = {}  # column -> cached grouping
+
+    def summary(self, by):
+        """One row per group: Group, Count, Net Balance (halalas), Status"""
+        return self._group(by)['summary']
+
+    def positions(self, by, group):
+        """Row positions of one group, in frame order"""
+        grouping = self._group(by)
+        index = grouping['index'].get(group)
+        if index is None:
+            return np.arange(0)
+        start = grouping['starts'][index]
+        return grouping['order'][start:start + grouping['counts'][index]]
+
+    def invalidate(self):
+        self._groups = {}
+
+    def _group(self, by):
+        grouping = self._groups.get(by)
+        if grouping is None:
+            grouping = self._groups[by] = self._build(by)
+        return grouping
+
+    def _build(self, by):
+        codes, keys = pd.factorize(self.df[by].astype(str), sort=True)
+        counts = np.bincount(codes, minlength=len(keys))
+        net = pd.Series(self.df['Amount'].to_numpy(dtype=np.int64)).groupby(codes).sum()
+        net = net.reindex(range(len(keys)), fill_value=0).to_numpy(dtype=np.int64)
+
+        summary = pd.DataFrame({
+            'Group': np.asarray(keys, dtype=object),
+            'Count': counts,
+            'Net Balance': net,
+            'Status': np.where(net == 0, 'Cleared', 'Open')
+        })
+        return {
+            'summary': summary,
+            'order': np.argsort(codes, kind='stable'),
+            'starts': np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64),
+            'counts': counts,
+            'index': {key: i for i, key in enumerate(keys)}
+        }
+
+class VendorIndex:
+    """Unique vendors of a clearing frame with their row positions.
+
+    Names are normalized (lowercase, single spaces) and kept sorted, so a
+    prefix lookup is a binary search; substring lookups intersect a
+    trigram index over the unique names before confirming matches. Each
+    vendor's rows are a contiguous slice of one position array.
+    """
+    GRAM = 3
+
+    def __init__(self, df):
+        normalized = self.normalize(df['Vendor Name'])
+        codes, names = pd.factorize(normalized, sort=True)
+        self.names = np.asarray(names, dtype=str)
+        self.counts = np.bincount(codes, minlength=len(names))
+        self.order = np.argsort(codes, kind='stable')
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+
+        # Show each vendor as first spelled in the data
+        first = self.order[self.starts] if len(names) else np.arange(0)
+        self.display = df['Vendor Name'].to_numpy(dtype=object)[first]
+
+        grams = {}
+        for code, name in enumerate(self.names.tolist()):
+            for gram in {name[i:i + self.GRAM] for i in range(len(name) - self.GRAM + 1)}:
+                grams.setdefault(gram, []).append(code)
+        self.grams = {gram: np.array(codes, dtype=np.int64) for gram, codes in grams.items()}
+
+    @staticmethod
+    def normalize(names):
+        return (pd.Series(names).fillna('').astype(str).str.strip().str.lower()
+                .str.replace(r'\s+', ' ', regex=True))
+
+    def code(self, name):
+        """Vendor code for a name in any spelling, or None"""
+        key = self.normalize([name]).iat[0]
+        index = int(np.searchsorted(self.names, key))
+        if index < len(self.names) and self.names[index] == key:
+            return index
+        return None
+
+    def positions(self, code):
+        """Row positions of a vendor, in frame order"""
+        start = self.starts[code]
+        return self.order[start:start + self.counts[code]]
+
+    def prefix(self, text):
+        """Codes of vendors whose normalized name starts with text"""
+        key = self.normalize([text]).iat[0]
+        start = np.searchsorted(self.names, key, side='left')
+        end = np.searchsorted(self.names, key + '\U0010ffff', side='left')
+        return np.arange(start, end)
+
+    def substring(self, text):
+        """Codes of vendors whose normalized name contains text"""
+        key = self.normalize([text]).iat[0]
+        if len(key) < self.GRAM:
+            candidates = np.arange(len(self.names))
+        else:
+            candidates = None
+            for i in range(len(key) - self.GRAM + 1):
+                codes = self.grams.get(key[i:i + self.GRAM])
+                if codes is None:
+                    return np.arange(0)
+                candidates = codes if candidates is None else np.intersect1d(candidates, codes, assume_unique=True)
+        names = self.names[candidates]
+        return candidates[np.char.find(names, key) >= 0] if len(names) else candidates
+
+    def search(self, text):
+        """(display name, count, code) of matching vendors, prefix matches first"""
+        if not text.strip():
+            return []
+        prefix = self.prefix(text)
+        rest = np.setdiff1d(self.substring(text), prefix, assume_unique=True)
+        return [(self.display[code], int(self.counts[code]), int(code))
+                for code in np.concatenate([prefix, rest]).tolist()]
+
+class AgingReport:
+    """Open clearing items per vendor, bucketed by age in months.
+
+    Month is parsed to a monthly Period once; each item's age is the
+    difference of Period ordinals from the as-of month, so bucketing the
+    whole frame is integer arithmetic. Items count as open until Match
+    Status records a match. Bucket codes are cached per as-of month and
+    reports until invalidate(), which callers use when statuses change.
+    """
+    BUCKETS = ['0-30', '31-60', '61-90', '90+', 'Undated']
+    REPORT_COLUMNS = ['Company', 'Vendor Name'] + BUCKETS + ['Total']
+
+    def __init__(self, df, company):
+        self.df = df
+        self.company = company
+        self._months = None
+        self._codes = {}    # as-of Period -> bucket code per row
+        self._reports = {}  # as-of Period -> report frame
+
+    def months(self):
+        """Month column as a PeriodIndex; NaT where it does not parse"""
+        if self._months is None:
+            dates = pd.to_datetime(self.df['Month'], errors='coerce', format='mixed')
+            # A month name without a year parses into year 1
+            dates = dates.where(dates.dt.year >= 1900)
+            self._months = pd.PeriodIndex(dates, freq='M')
+        return self._months
+
+    def bucket_codes(self, as_of):
+        """Index into BUCKETS for every row"""
+        codes = self._codes.get(as_of)
+        if codes is None:
+            months = self.months()
+            age = as_of.ordinal - months.asi8
+            # Current and future months fall in the first bucket
+            codes = np.clip(age, 0, 3).astype(np.int8)
+            codes[months.isna()] = 4
+            codes = self._codes[as_of] = codes
+        return codes
+
+    def open_mask(self):
+        return ~self.df['Match Status'].isin([MATCHED, MATCHED_WITHIN_TOLERANCE]).to_numpy()
+
+    def report(self, as_of=None):
+        """One row per vendor with open items: halala totals per bucket"""
+        as_of = pd.Period(as_of or pd.Timestamp.now(), freq='M')
+        report = self._reports.get(as_of)
+        if report is not None:
+            return report
+
+        open_rows = self.open_mask()
+        items = pd.DataFrame({
+            'Vendor Name': self.df['Vendor Name'].to_numpy()[open_rows],
+            'Bucket': self.bucket_codes(as_of)[open_rows],
+            'Amount': self.df['Amount'].to_numpy(dtype=np.int64)[open_rows]
+        })
+        table = (items.groupby(['Vendor Name', 'Bucket'])['Amount'].sum()
+                 .unstack(fill_value=0)
+                 .reindex(columns=range(len(self.BUCKETS)), fill_value=0))
+        table.columns = self.BUCKETS
+        table['Total'] = table.sum(axis=1)
+        report = table.reset_index()
+        report.insert(0, 'Company', self.company)
+        report = self._reports[as_of] = report[self.REPORT_COLUMNS]
+        return report
+
+    def invalidate(self):
+        """Drop cached reports after Match Status changes"""
+        self._reports = {}
+
+class ClearingSearchIndex:
+    """Lowercase search keys for a clearing frame, built once per frame.
+
+    Each searchable column gets a lowercase string key per row, and "All
+    Columns" gets the row's columns joined with a separator so a match
+    cannot span two cells. A query that extends the previous one on the
+    same column only re-tests the rows that matched before.
+    """
+    SEPARATOR = '\x1f'
+
+    def __init__(self, df, columns=None):
+        self.size = len(df)
+        self.keys = {}
+        columns = [col for col in (columns or df.columns) if col in df.columns]
+        self.columns = columns
+        for col in columns:
+            if col == 'Amount' and pd.api.types.is_integer_dtype(df[col]):
+                # Match amounts the way they are displayed
+                self.keys[col] = format_amounts(df[col])
+            else:
+                self.keys[col] = self._lower(df[col])
+        if columns:
+            joined = self.keys[columns[0]]
+            for col in columns[1:]:
+                joined = joined + self.SEPARATOR + self.keys[col]
+            self.keys[ALL_COLUMNS] = joined
+        else:
+            self.keys[ALL_COLUMNS] = np.full(self.size, '', dtype=object)
+        self._last = None  # (column, text, mask)
+
+    @staticmethod
+    def _lower(series):
+        return np.array(series.astype(str).str.lower(), dtype=object)
+
+    def update(self, position, column, value):
+        """Refresh one edited cell's keys"""
+        if column not in self.keys:
+            return
+        self.keys[column][position] = str(value).lower()
+        self.keys[ALL_COLUMNS][position] = self.SEPARATOR.join(
+            self.keys[col][position] for col in self.columns)
+        # Previous matches no longer bound the next query
+        self._last = None
+
+    def search(self, text, column=ALL_COLUMNS):
+        """Boolean mask of rows containing text, or None when text is empty"""
+        text = text.strip().lower()
+        if not text:
+            self._last = None
+            return None
+
+        keys = self.keys.get(column, self.keys[ALL_COLUMNS])
+        if self._last and self._last[0] == column and text.startswith(self._last[1]):
+            # Extending the query can only drop rows: re-test previous matches
+            candidates = np.flatnonzero(self._last[2])
+        else:
+            candidates = None
+
+        mask = np.zeros(self.size, dtype=bool)
+        if candidates is None:
+            mask[:] = pd.Series(keys).str.contains(text, regex=False).to_numpy()
+        elif len(candidates):
+            mask[candidates] = pd.Series(keys[candidates]).str.contains(text, regex=False).to_numpy()
+
+        self._last = (column, text, mask)
+        return mask
@@ -0,0 +1,206 @@
+from pathlib import Path
+import calendar
+import os
+import sqlite3
+import threading
+
+# Filename keywords mapped to document types, checked in order
+DOC_TYPE_KEYWORDS = [
+    ('statement', 'Statement'),
+    ('invoice', 'Invoice'),
+    ('iban', 'IBAN Letter'),
+    ('auth', 'Authorization Letter'),
+]
+
+MONTHS = {calendar.month_name[i].casefold(): calendar.month_name[i] for i in range(1, 13)}
+
+SCHEMA_VERSION = 1
+
+class DocumentCatalog:
+    """SQLite catalog of the files under the Companies folder tree.
+
+    scan() walks root_dir with os.scandir and records each file's path,
+    size, mtime, company, year, month and document type, taken from the
+    Company/Year/Month/... layout FolderManager creates. Rescans only
+    rewrite rows whose size or mtime changed and drop files that are gone.
+    Names are searched through an FTS5 trigram index when SQLite has one,
+    otherwise with LIKE.
+    """
+
+    COLUMNS = ['path', 'name', 'size', 'mtime_ns', 'company', 'year', 'month', 'doc_type']
+
+    def __init__(self, root_dir, db_path):
+        self.root_dir = Path(root_dir)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self._thread = None
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.fts = self._create_schema()
+
+    def _create_schema(self):
+        """Create tables; returns whether the trigram name index is available"""
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    company TEXT,
+                    year INTEGER,
+                    month TEXT,
+                    doc_type TEXT
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS documents_location "
+                              "ON documents (company, year, month)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS documents_type ON documents (doc_type)")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            try:
+                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts "
+                                  "USING fts5(name, tokenize='trigram')")
+                return True
+            except sqlite3.OperationalError:
+                # SQLite older than 3.34 has no trigram tokenizer
+                return False
+
+    def describe(self, path):
+        """(company, year, month, doc_type) for a file, from where it sits in the tree"""
+        parts = Path(path).relative_to(self.root_dir).parts
+        company = parts[0] if len(parts) > 1 else None
+        year = int(parts[1]) if len(parts) > 2 and parts[1].isdigit() else None
+        month = MONTHS.get(parts[2].casefold()) if len(parts) > 3 else None
+
+        # The folder holding a file below the month (e.g. an account's iban_letter) names the type
+        if month and len(parts) > 4:
+            return company, year, month, parts[-2]
+        name = parts[-1].casefold()
+        for keyword, doc_type in DOC_TYPE_KEYWORDS:
+            if keyword in name:
+                return company, year, month, doc_type
+        suffix = Path(name).suffix.lstrip('.')
+        return company, year, month, suffix.upper() if suffix else 'Other'
+
+    def _walk(self):
+        """Yield (path, size, mtime_ns) for every file under root_dir"""
+        stack = [str(self.root_dir)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                yield entry.path, stat.st_size, stat.st_mtime_ns
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def scan(self):
+        """Bring the catalog in line with the tree; returns counts of changes"""
+        with self.lock:
+            known = {path: (doc_id, size, mtime_ns) for doc_id, path, size, mtime_ns
+                     in self.conn.execute("SELECT id, path, size, mtime_ns FROM documents")}
+
+        changed = []
+        seen = set()
+        for path, size, mtime_ns in self._walk():
+            seen.add(path)
+            current = known.get(path)
+            if current is None or current[1:] != (size, mtime_ns):
+                changed.append((path, size, mtime_ns, current[0] if current else None))
+        removed = [doc_id for path, (doc_id, _, _) in known.items() if path not in seen]
+
+        with self.lock, self.conn:
+            for path, size, mtime_ns, doc_id in changed:
+                name = os.path.basename(path)
+                company, year, month, doc_type = self.describe(path)
+                if doc_id is None:
+                    doc_id = self.conn.execute(
+                        "INSERT INTO documents (path, name, size, mtime_ns, company, year, month, doc_type) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (path, name, size, mtime_ns, company, year, month, doc_type)).lastrowid
+                    if self.fts:
+                        self.conn.execute("INSERT INTO documents_fts (rowid, name) VALUES (?, ?)",
+                                          (doc_id, name))
+                else:
+                    self.conn.execute("UPDATE documents SET size = ?, mtime_ns = ? WHERE id = ?",
+                                      (size, mtime_ns, doc_id))
+            if removed:
+                self.conn.executemany("DELETE FROM documents WHERE id = ?", [(i,) for i in removed])
+                if self.fts:
+                    self.conn.executemany("DELETE FROM documents_fts WHERE rowid = ?",
+                                          [(i,) for i in removed])
+
+        added = sum(1 for change in changed if change[3] is None)
+        return {'files': len(seen), 'added': added,
+                'updated': len(changed) - added, 'removed': len(removed)}
+
+    def is_scanning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def scan_async(self, on_done, on_error):
+        """Run scan() on a worker thread; returns False if one is already running.
+
+        Callbacks run on the worker thread, so UI callers should hand them
+        to the Tk thread with after().
+        """
+        if self.is_scanning():
+            return False
+
+        def worker():
+            try:
+                stats = self.scan()
+            except Exception as e:
+                on_error(e)
+                return
+            on_done(stats)
+
+        self._thread = threading.Thread(target=worker, daemon=True)
+        self._thread.start()
+        return True
+
+    def search(self, text='', company=None, year=None, month=None, doc_type=None, limit=500):
+        """Documents whose name contains text and that match the given metadata"""
+        conditions = []
+        params = []
+        text = text.strip()
+        if text:
+            if self.fts and len(text) >= 3:
+                # Trigram MATCH takes a quoted phrase; double any quotes inside it
+                phrase = '"' + text.replace('"', '""') + '"'
+                conditions.append("id IN (SELECT rowid FROM documents_fts WHERE name MATCH ?)")
+                params.append(phrase)
+            else:
+                conditions.append("name LIKE ? ESCAPE '\\'")
+                escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                params.append(f"%{escaped}%")
+        for column, value in [('company', company), ('year', year),
+                              ('month', month), ('doc_type', doc_type)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM documents"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY year DESC, mtime_ns DESC LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def doc_types(self):
+        """Document types present in the catalog"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT doc_type FROM documents ORDER BY doc_type")]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,38 +1,203 @@
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import calendar
+import os
 import subprocess
+import threading
+import time
 
 class Company(Enum):
     """Supported companies"""
     SALAM = "Salam"  # Fixed spelling
     MVNO = "MVNO"
 
+# Document folders kept for each bank account, as in BankAccountsTab
+ACCOUNT_DOCUMENT_TYPES = ["iban_letter", "auth_letter", "other_docs"]
+
+def account_document_template(account_names, doc_types=ACCOUNT_DOCUMENT_TYPES):
+    """Provisioning template with one folder per account and document type"""
+    return [f"{account}/{doc_type}" for account in account_names if account
+            for doc_type in doc_types]
+
 class FolderManager:
-    """Manages company folder structure and validation"""
-    def __init__(self, root_dir="c:/WedxDev/KK/Companies"):
+    """Manages company folder structure and validation.
+
+    Existence checks read a per-company set of year/month folders built by
+    one os.scandir pass over the company root, cached for scan_ttl seconds,
+    instead of stat-ing every path on the share. Folders created through
+    this manager are added to the cached set straight away.
+    """
+    def __init__(self, root_dir="c:/WedxDev/KK/Companies", scan_ttl=30):
         self.root_dir = Path(root_dir)
         self.start_year = 2024
+        self.scan_ttl = scan_ttl
+        self._scans = {}  # company -> (scanned at, {(year, month)} casefolded)
+        self._scan_lock = threading.Lock()
         
     def get_folder_path(self, company: Company, year: int, month: str) -> Path:
         """Generate full path for a specific company/year/month folder"""
         return self.root_dir / company.value / str(year) / month
         
     def check_folder_exists(self, company: Company, year: int, month: str) -> bool:
-        """Check if a specific folder exists"""
-        path = self.get_folder_path(company, year, month)
-        return path.exists()
+        """Check if a specific folder exists, using the cached scan"""
+        return self._folder_key(year, month) in self.scan_company(company)
+        
+    def scan_company(self, company: Company, refresh: bool = False) -> set:
+        """Year/month folders under a company root, from one scandir pass"""
+        with self._scan_lock:
+            cached = self._scans.get(company)
+            if not refresh and cached and time.monotonic() - cached[0] < self.scan_ttl:
+                return cached[1]
+                
+        folders = set()
+        try:
+            with os.scandir(self.root_dir / company.value) as years:
+                for year in years:
+                    if not year.is_dir():
+                        continue
+                    try:
+                        with os.scandir(year.path) as months:
+                            folders.update(self._folder_key(year.name, month.name)
+                                           for month in months if month.is_dir())
+                    except OSError:
+                        continue
+        except OSError:
+            # Missing or unreachable root: every folder is missing
+            pass
+            
+        with self._scan_lock:
+            self._scans[company] = (time.monotonic(), folders)
+        return folders
+        
+    def invalidate_scan(self, company: Company = None):
+        """Forget cached scans so the next check walks the tree again"""
+        with self._scan_lock:
+            if company is None:
+                self._scans = {}
+            else:
+                self._scans.pop(company, None)
+                
+    @staticmethod
+    def _folder_key(year, month):
+        # Windows shares match names case-insensitively
+        return (str(year), str(month).casefold())
         
     def create_folder(self, company: Company, year: int, month: str) -> bool:
         """Create a folder if it doesn't exist"""
         path = self.get_folder_path(company, year, month)
         try:
             path.mkdir(parents=True, exist_ok=True)
-            return True
         except Exception:
             return False
             
+        with self._scan_lock:
+            cached = self._scans.get(company)
+            if cached:
+                cached[1].add(self._folder_key(year, month))
+        return True
+            
+    def provision(self, companies, years, template=(), months=None, workers=8) -> dict:
+        """Create every missing month folder, and template subfolders, in parallel.
+
+        template lists folders to create inside each month folder, or maps
+        each company to its own list. Month folders the cached scan already
+        has are skipped; inside those, one scandir per template folder level
+        finds the template folders already present, so a rerun only creates
+        what is missing. Only folders that did not exist are reported as created.
+
+        Returns {'created': [paths], 'existing': count, 'failed': {path: error}}.
+        """
+        months = months or self.get_months()
+        tasks = []  # (company, year, month, path)
+        existing = 0
+        present = []  # (company, year, month, month_path, subfolders) to check for template folders
+        for company in companies:
+            scanned = self.scan_company(company)
+            subfolders = template.get(company, ()) if isinstance(template, dict) else template
+            for year in years:
+                for month in months:
+                    month_path = self.get_folder_path(company, year, month)
+                    if self._folder_key(year, month) not in scanned:
+                        if subfolders:
+                            tasks.extend((company, year, month, month_path / sub) for sub in subfolders)
+                        else:
+                            tasks.append((company, year, month, month_path))
+                    elif subfolders:
+                        present.append((company, year, month, month_path, subfolders))
+                    else:
+                        existing += 1
+                        
+        report = {'created': [], 'existing': existing, 'failed': {}}
+        if not tasks and not present:
+            return report
+            
+        # Each scandir and mkdir is a round-trip on a network share; overlap them
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            found = executor.map(self._scan_subfolders, [item[3] for item in present],
+                                 [item[4] for item in present])
+            for (company, year, month, month_path, subfolders), folders in zip(present, found):
+                for sub in subfolders:
+                    if self._subfolder_key(sub) in folders:
+                        report['existing'] += 1
+                    else:
+                        tasks.append((company, year, month, month_path / sub))
+            outcomes = list(executor.map(self._make_folder, [task[3] for task in tasks]))
+            
+        for (company, year, month, path), (created, error) in zip(tasks, outcomes):
+            if error is not None:
+                report['failed'][str(path)] = error
+                continue
+            if created:
+                report['created'].append(str(path))
+            else:
+                report['existing'] += 1
+            with self._scan_lock:
+                cached = self._scans.get(company)
+                if cached:
+                    cached[1].add(self._folder_key(year, month))
+        return report
+        
+    @staticmethod
+    def _subfolder_key(subfolder):
+        return '/'.join(Path(subfolder).parts).casefold()
+        
+    @classmethod
+    def _scan_subfolders(cls, path, subfolders):
+        """Keys of the template folders present under path, walking only template branches"""
+        wanted = {cls._subfolder_key(sub) for sub in subfolders}
+        # Folders with template folders below them are the only ones opened
+        parents = {key.rsplit('/', i)[0] for key in wanted for i in range(1, key.count('/') + 1)}
+        found = set()
+        level = [(str(path), '')]
+        while level:
+            next_level = []
+            for folder, prefix in level:
+                try:
+                    with os.scandir(folder) as entries:
+                        for entry in entries:
+                            key = prefix + entry.name.casefold()
+                            if (key in wanted or key in parents) and entry.is_dir():
+                                found.add(key)
+                                if key in parents:
+                                    next_level.append((entry.path, key + '/'))
+                except OSError:
+                    continue
+            level = next_level
+        return found & wanted
+        
+    @staticmethod
+    def _make_folder(path):
+        """(created, error) for one folder; an existing folder is not an error"""
+        try:
+            path.mkdir(parents=True)
+            return True, None
+        except FileExistsError:
+            return False, None
+        except Exception as e:
+            return False, str(e)
+            
     def get_missing_folders(self, company: Company = None) -> dict:
         """Get all missing folders up to current date"""
         current_date = datetime.now()
@@ -43,6 +208,7 @@ class FolderManager:
         companies = [company] if company else list(Company)
         
         for comp in companies:
+            existing = self.scan_company(comp)
             comp_missing = []
             for year in range(self.start_year, current_year + 1):
                 # Determine how many months to check
@@ -53,7 +219,7 @@ class FolderManager:
                     
                 for month_num in months_to_check:
                     month_name = calendar.month_name[month_num]
-                    if not self.check_folder_exists(comp, year, month_name):
+                    if self._folder_key(year, month_name) not in existing:
                         comp_missing.append(f"{month_name} {year}")
             
             if comp_missing:
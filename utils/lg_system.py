@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import heapq
+import threading
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ["Sequence No.", "Vendor Name", "LG Number",
+                    "Start Date", "End Date", "Type of LG"]
+
+DISPLAY_COLUMNS = ["Sequence No.", "Vendor Name", "LG Number", "Start Date",
+                   "End Date", "Type of LG", "Related To", "Days Remaining"]
+
+# (tag, whole days remaining before the LG enters it), most severe first
+EXPIRY_THRESHOLDS = [('expired', 0), ('urgent', 4), ('warning', 8)]
+
+def classify_expiry(end_date, now):
+    """Tag for an LG: expired (< 0 days), urgent (<= 3), warning (<= 7) or normal"""
+    remaining = end_date - now
+    for tag, days in EXPIRY_THRESHOLDS:
+        if remaining < timedelta(days=days):
+            return tag
+    return 'normal'
+
+def expiry_tags(days_remaining):
+    """Vectorized classify_expiry over whole days remaining"""
+    days = np.asarray(days_remaining)
+    return np.select([days < 0, days <= 3, days <= 7],
+                     ['expired', 'urgent', 'warning'], default='normal')
+
+def next_crossing(end_date, now):
+    """When the LG next moves to a more severe tag, or None once expired"""
+    upcoming = [end_date - timedelta(days=days) for _, days in EXPIRY_THRESHOLDS
+                if end_date - timedelta(days=days) >= now]
+    return min(upcoming) if upcoming else None
+
+class LGExpiryScheduler:
+    """Tracks LG expiry tags with a heap ordered by the next threshold crossing.
+
+    Only LGs whose crossing time has passed are re-classified on advance(),
+    so the urgent count stays current without rescanning every LG.
+    """
+    def __init__(self):
+        self.end_dates = {}
+        self.tags = {}
+        self.heap = []  # (crossing time, key)
+        self.urgent_count = 0
+
+    def load(self, end_dates, now=None):
+        """Classify {key: end date} and queue each LG's next crossing"""
+        now = now or datetime.now()
+        self.end_dates = dict(end_dates)
+        self.tags = {}
+        self.heap = []
+        for key, end_date in self.end_dates.items():
+            self.tags[key] = classify_expiry(end_date, now)
+            crossing = next_crossing(end_date, now)
+            if crossing is not None:
+                self.heap.append((crossing, key))
+        heapq.heapify(self.heap)
+        self.urgent_count = sum(1 for tag in self.tags.values() if tag != 'normal')
+        return self.tags
+
+    def next_due(self):
+        """Time of the earliest pending crossing, or None"""
+        return self.heap[0][0] if self.heap else None
+
+    def advance(self, now=None):
+        """Re-classify LGs whose crossing has passed; returns {key: new tag}"""
+        now = now or datetime.now()
+        changed = {}
+        while self.heap and self.heap[0][0] < now:
+            _, key = heapq.heappop(self.heap)
+            end_date = self.end_dates[key]
+            tag = classify_expiry(end_date, now)
+            if tag != self.tags[key]:
+                if self.tags[key] == 'normal':
+                    self.urgent_count += 1
+                self.tags[key] = tag
+                changed[key] = tag
+            crossing = next_crossing(end_date, now)
+            if crossing is not None:
+                heapq.heappush(self.heap, (crossing, key))
+        return changed
+
+class LGSnapshot:
+    """Typed contents of LGs.xlsx together with the file state they came from"""
+    def __init__(self, df, key):
+        self.df = df
+        self.key = key  # (mtime_ns, size) of the parsed file
+        self.loaded_at = datetime.now()
+        self._summary_rows = None
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def with_days_remaining(self, today=None):
+        """Copy of the LG rows with Days Remaining counted from today"""
+        today = today or datetime.now()
+        df = self.df.copy()
+        df['Days Remaining'] = (df['End Date'] - today).dt.days
+        df['Tag'] = expiry_tags(df['Days Remaining'])
+        return df
+
+    def summary_rows(self):
+        """(type, count, formatted amount) per LG type, computed once per snapshot"""
+        if self._summary_rows is None:
+            summary = self.df.groupby('Type of LG').agg({
+                'LG Number': 'count',
+                'Amount': 'sum'
+            }).reset_index()
+            self._summary_rows = [(lg_type, count, f"{amount:,.2f}")
+                                  for lg_type, count, amount in summary.itertuples(index=False)]
+        return self._summary_rows
+
+def build_snapshot(df, key):
+    """Validate and type a raw LGs sheet, raising ValueError when unusable"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+
+    df = df.copy()
+    try:
+        df['Start Date'] = pd.to_datetime(df['Start Date'], errors='coerce')
+        df['End Date'] = pd.to_datetime(df['End Date'], errors='coerce')
+    except Exception as e:
+        raise ValueError(f"Invalid date format: {str(e)}")
+
+    # Remove rows with invalid dates
+    df = df.dropna(subset=['Start Date', 'End Date']).reset_index(drop=True)
+
+    if 'Related To' not in df.columns:
+        df['Related To'] = ''
+    if 'Amount' in df.columns:
+        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0.0)
+    else:
+        df['Amount'] = 0.0
+
+    return LGSnapshot(df, key)
+
+class LGSnapshotLoader:
+    """Parses LGs.xlsx off the UI thread and reuses the result until the file changes"""
+    def __init__(self, lg_file):
+        self.lg_file = Path(lg_file)
+        self.snapshot = None
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def file_key(self):
+        """Identify the current file contents by mtime and size"""
+        try:
+            stat = self.lg_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """Return (snapshot, changed), parsing only when the file changed"""
+        with self.lock:
+            key = self.file_key()
+            if key is None:
+                raise FileNotFoundError("LGs file not found")
+            if self.snapshot is not None and self.snapshot.key == key:
+                return self.snapshot, False
+
+            self.snapshot = build_snapshot(pd.read_excel(self.lg_file), key)
+            return self.snapshot, True
+
+    def is_loading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def load_async(self, on_loaded, on_error):
+        """Run load() on a worker thread; returns False if one is already running.
+
+        Callbacks run on the worker thread, so UI callers should hand them
+        to the Tk thread with after().
+        """
+        if self.is_loading():
+            return False
+
+        def worker():
+            try:
+                snapshot, changed = self.load()
+            except Exception as e:
+                on_error(e)
+                return
+            on_loaded(snapshot, changed)
+
+        self._thread = threading.Thread(target=worker, daemon=True)
+        self._thread.start()
+        return True
@@ -0,0 +1,170 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+import json
+import os
+import time
+from core.validation_system import ValidationSystem
+from utils.payment_processor import PaymentProcessor, ValidationError, FileSystemError, check_payment
+from utils.payment_recovery import line_ranges
+
+_validation_system = None
+
+def _init_worker():
+    """Build one ValidationSystem per worker process"""
+    global _validation_system
+    _validation_system = ValidationSystem()
+
+def parse_payment(line):
+    """Decode one NDJSON batch line into the types ValidationSystem expects"""
+    payment = json.loads(line)
+    if not isinstance(payment, dict):
+        raise ValidationError("Payment data must be a JSON object")
+    if isinstance(payment.get('date'), str):
+        try:
+            payment['date'] = datetime.fromisoformat(payment['date'])
+        except ValueError:
+            raise ValidationError("Invalid date format")
+    if isinstance(payment.get('amount'), (str, int, float)):
+        try:
+            payment['amount'] = Decimal(str(payment['amount']))
+        except ArithmeticError:
+            raise ValidationError("Invalid amount format")
+    return payment
+
+def treasury_row(payment):
+    """Convert a parsed batch payment to the fields of a Treasury row"""
+    row = dict(payment)
+    if isinstance(row.get('date'), datetime):
+        row['date'] = row['date'].strftime('%Y-%m-%d')
+    if isinstance(row.get('beneficiary'), dict):
+        row['beneficiary'] = row['beneficiary'].get('name', '')
+    return row
+
+def _validate_range(path, start, end):
+    """Validate the payments on lines [start, end) of a batch file.
+
+    Returns (payment, error) per non-blank line; payment is None on error.
+    """
+    if _validation_system is None:
+        _init_worker()
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).splitlines()
+
+    checked = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            payment = parse_payment(line)
+            check_payment(_validation_system, payment)
+            checked.append((payment, None))
+        except ValidationError as e:
+            checked.append((None, e))
+        except ValueError as e:
+            # Malformed JSON or bytes that are not UTF-8
+            checked.append((None, ValidationError(f"Invalid payment line: {str(e)}")))
+    return checked
+
+class PaymentBatch:
+    """Validate a large NDJSON payment file across processes.
+
+    The file is split into newline-aligned chunks that worker processes
+    validate independently. Results come back in input order and the parent
+    then reserves references and writes Treasury (when a FileOperations is
+    given) and the journal one payment at a time, so uniqueness checks and
+    appends stay serialized. A payment whose Treasury append or journal
+    write fails is released, its Treasury row removed, and reported as
+    failed.
+    """
+
+    def __init__(self, processor, file_operations=None, workers=None,
+                 chunk_size=1024 * 1024, parallel_threshold=1024 * 1024):
+        self.processor = processor
+        self.file_operations = file_operations
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+
+    def process_file(self, path):
+        """Process every payment in a batch file.
+
+        Returns (results, stats); results holds one process_payment style
+        dict per non-blank input line, in input order.
+        """
+        path = Path(path)
+        start_time = time.perf_counter()
+        ranges = line_ranges(path, 0, self.chunk_size)
+
+        checked = []
+        for chunk in self._run(str(path), ranges):
+            checked.extend(chunk)
+        validated_time = time.perf_counter()
+
+        results = [self._commit(payment, error) for payment, error in checked]
+        if results:
+            self.processor.journal.sync()
+
+        succeeded = sum(1 for result in results if result['success'])
+        stats = {
+            'payments': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'workers': self.workers if self._use_processes(ranges) else 1,
+            'validate_seconds': validated_time - start_time,
+            'commit_seconds': time.perf_counter() - validated_time,
+            'seconds': time.perf_counter() - start_time
+        }
+        return results, stats
+
+    def _commit(self, payment, error):
+        """Reserve, journal and record one validated payment in the parent"""
+        result = {'success': False, 'error': None, 'error_type': None}
+        try:
+            if error is not None:
+                raise error
+
+            registry = getattr(self.file_operations, 'reference_registry', None)
+            if registry is not None and registry.contains(payment['reference']):
+                raise ValidationError("Duplicate payment reference")
+
+            payment_id, payment_record = self.processor.reserve_payment(payment)
+
+            # Treasury first, so the journal never records a payment Treasury
+            # lacks; the journal write is the commit point
+            treasury_size = None
+            try:
+                if self.file_operations is not None:
+                    size = self.file_operations.treasury_size()
+                    success, message = self.file_operations.save_payment(treasury_row(payment))
+                    if not success:
+                        raise FileSystemError(message)
+                    treasury_size = size
+                self.processor.persist_payment(payment_record)
+            except Exception:
+                self.processor.release_payment(payment_record)
+                if treasury_size is not None:
+                    self.file_operations.revert_payment(payment['reference'], treasury_size)
+                raise
+
+            result['success'] = True
+            result['payment_id'] = payment_id
+        except Exception as e:
+            PaymentProcessor.record_error(result, e)
+        return result
+
+    def _use_processes(self, ranges):
+        """Only pay process start-up cost for large batches"""
+        total = sum(end - start for start, end in ranges)
+        return self.workers > 1 and len(ranges) > 1 and total >= self.parallel_threshold
+
+    def _run(self, path, ranges):
+        """Validate ranges, in worker processes when worthwhile, keeping order"""
+        if not self._use_processes(ranges):
+            return [_validate_range(path, start, end) for start, end in ranges]
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            return list(executor.map(_validate_range, [path] * len(ranges), *zip(*ranges)))
@@ -0,0 +1,214 @@
+from pathlib import Path
+import json
+import os
+import threading
+import time
+
+class PaymentJournal:
+    """Append-only, size-rolled journal of payment records.
+
+    Records are stored one per line as compact JSON in numbered segment
+    files (segment_000001.ndjson, ...). Appends are flushed to the OS
+    immediately and fsynced in batches, every fsync_every records or
+    fsync_interval seconds, whichever comes first; a timer syncs the last
+    records of a burst once appends go quiet. An in-memory index maps
+    payment_id -> (segment, offset) for direct reads.
+    """
+
+    SEGMENT_PREFIX = 'segment_'
+    SEGMENT_SUFFIX = '.ndjson'
+
+    def __init__(self, journal_dir, segment_size=64 * 1024 * 1024,
+                 fsync_every=100, fsync_interval=0.05, load_index=True):
+        self.journal_dir = Path(journal_dir)
+        self.segment_size = segment_size
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.index = {}  # payment_id -> (segment, offset)
+        self._encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self._file = None
+        self._segment = 0
+        self._offset = 0
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer = None
+
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        # Callers that recover state themselves (PaymentRecovery) skip the scan
+        self._open(load_index)
+
+    def append(self, record):
+        """Append a payment record and return its (segment, offset)"""
+        line = (self._encode(record) + '\n').encode('utf-8')
+
+        with self.lock:
+            if self._offset and self._offset + len(line) > self.segment_size:
+                self._roll()
+
+            location = (self._segment, self._offset)
+            self._file.write(line)
+            self._file.flush()
+            self._offset += len(line)
+            self.index[record['payment_id']] = location
+
+            self._pending_sync += 1
+            needs_sync = (self._pending_sync >= self.fsync_every or
+                          time.monotonic() - self._last_sync >= self.fsync_interval)
+            if not needs_sync and self._sync_timer is None:
+                # Nothing else syncs these records if no further append comes
+                self._sync_timer = threading.Timer(self.fsync_interval, self._timed_sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+        if needs_sync:
+            self.sync()
+        return location
+
+    def position(self):
+        """Current end of the journal as (segment, offset)"""
+        with self.lock:
+            return (self._segment, self._offset)
+
+    def read(self, payment_id):
+        """Read a payment record by ID, or None if unknown"""
+        location = self.index.get(payment_id)
+        if location is None:
+            return None
+        return self.read_at(*location)
+
+    def read_at(self, segment, offset):
+        """Read the record stored at a segment offset"""
+        with open(self.segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def sync(self):
+        """fsync everything appended so far"""
+        with self.sync_lock:
+            with self.lock:
+                if not self._pending_sync or self._file is None:
+                    return
+                self._pending_sync = 0
+                self._last_sync = time.monotonic()
+                # Duplicate the descriptor so a concurrent roll can close the file
+                fd = os.dup(self._file.fileno())
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _timed_sync(self):
+        with self.lock:
+            self._sync_timer = None
+        try:
+            self.sync()
+        except OSError as e:
+            print(f"Error syncing payment journal: {str(e)}")
+
+    def close(self):
+        """Flush, fsync and close the active segment"""
+        with self.lock:
+            timer, self._sync_timer = self._sync_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.sync()
+        with self.lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def segment_path(self, segment):
+        """Path of a numbered segment file"""
+        return self.journal_dir / f"{self.SEGMENT_PREFIX}{segment:06d}{self.SEGMENT_SUFFIX}"
+
+    def segments(self):
+        """Existing segment numbers in order"""
+        numbers = []
+        for path in self.journal_dir.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"):
+            try:
+                numbers.append(int(path.name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+        return sorted(numbers)
+
+    def iter_segment(self, segment, start=0):
+        """Yield (offset, record) for complete records in a segment"""
+        with open(self.segment_path(segment), 'rb') as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn write at the tail
+                try:
+                    yield offset, json.loads(line)
+                except json.JSONDecodeError:
+                    pass
+                offset += len(line)
+
+    def migrate_legacy_files(self, files_dir):
+        """Move per-payment payment_<id>.json files into the journal"""
+        migrated = 0
+        journaled = []  # Files whose payment is in the journal, safe to remove
+        for path in sorted(Path(files_dir).glob("payment_*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping unreadable payment file {path}: {str(e)}")
+                continue
+
+            if 'payment_id' not in record:
+                record['payment_id'] = path.stem[len('payment_'):]
+            if record['payment_id'] not in self.index:
+                # Older versions saved the file before marking the payment
+                # completed; only completed payments reach the journal
+                self.append({**record, 'status': 'completed'})
+                migrated += 1
+            journaled.append(path)
+
+        # Only remove the originals once the journal copy is durable
+        self.sync()
+        for path in journaled:
+            path.unlink()
+        return migrated
+
+    def _open(self, load_index=True):
+        """Index existing segments and open the last one for appending"""
+        segments = self.segments()
+        if load_index:
+            for segment in segments:
+                for offset, record in self.iter_segment(segment):
+                    if 'payment_id' in record:
+                        self.index[record['payment_id']] = (segment, offset)
+
+        self._segment = segments[-1] if segments else 1
+        self._open_segment(self._segment)
+
+    def _open_segment(self, segment):
+        """Open a segment for appending, dropping any torn tail"""
+        path = self.segment_path(segment)
+        end = 0
+        if path.exists():
+            size = path.stat().st_size
+            with open(path, 'rb') as f:
+                f.seek(max(size - 1024 * 1024, 0))
+                tail = f.read()
+            end = size - len(tail) + tail.rfind(b'\n') + 1
+            if end != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(end)
+
+        self._file = open(path, 'ab')
+        self._segment = segment
+        self._offset = end
+
+    def _roll(self):
+        """Close the active segment and start the next one"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._pending_sync = 0
+        self._open_segment(self._segment + 1)
@@ -1,12 +1,13 @@
 from pathlib import Path
-import json
 from datetime import datetime
 import uuid
 import threading
 from decimal import Decimal
 import re
 import html
-from validation_system import ValidationSystem
+from core.validation_system import ValidationSystem
+from utils.payment_journal import PaymentJournal
+from utils.payment_recovery import PaymentRecovery, gc_paused
 
 class PaymentError(Exception):
     """Base class for payment processing errors"""
@@ -20,123 +21,188 @@ class FileSystemError(PaymentError):
     """File system related errors"""
     pass
 
+def check_payment(validation_system, payment_data):
+    """Validate payment data, raising ValidationError on failure"""
+    try:
+        validation_result = validation_system.validate_input(payment_data)
+        if not validation_result['valid']:
+            raise ValidationError(validation_result['error'])
+
+        # Check CNP requirement
+        if validation_result.get('cnp_required', False) and not payment_data.get('cnp_approval'):
+            raise ValidationError("CNP approval required for this payment")
+    except Exception as e:
+        raise ValidationError(f"Validation error: {str(e)}")
+
 class PaymentProcessor:
     """Non-GUI version of payment system for testing"""
     
-    def __init__(self, files_dir):
+    def __init__(self, files_dir, num_stripes=64, snapshot_every=100000, recovery_workers=None):
         """Initialize payment processor"""
         self.files_dir = Path(files_dir)
         self.payments = {}
-        self.lock = threading.Lock()
+        self.reference_index = {}  # reference -> payment_id
+        # Duplicate checks only contend on references hashing to the same stripe
+        self.stripe_locks = [threading.Lock() for _ in range(num_stripes)]
         self.validation_system = ValidationSystem()
-        self.temp_files = set()  # Track temporary files
+        self.snapshot_every = snapshot_every
+        self.snapshot_lock = threading.Lock()
+        self._since_snapshot = 0
+        self.recovery_stats = None
         
         try:
             self.files_dir.mkdir(parents=True, exist_ok=True)
+            self.journal = PaymentJournal(self.files_dir / "journal", load_index=False)
+            self.recovery = PaymentRecovery(self.journal, workers=recovery_workers)
+            self.recover()
+
+            # Fold payments saved by older versions (one JSON file each) into the journal
+            if self.journal.migrate_legacy_files(self.files_dir):
+                self.recover()
         except OSError as e:
             raise FileSystemError(f"Failed to create files directory: {e}")
 
+    def recover(self):
+        """Rebuild payments and the reference index from snapshot plus journal"""
+        entries, stats = self.recovery.recover()
+
+        payments = {}
+        reference_index = {}
+        journal_index = {}
+        with gc_paused():
+            for payment_id, (segment, offset, record) in entries.items():
+                payments[payment_id] = record
+                journal_index[payment_id] = (segment, offset)
+                if record.get('reference') is not None:
+                    reference_index[record['reference']] = payment_id
+
+        self.payments = payments
+        self.reference_index = reference_index
+        self.journal.index = journal_index
+        self.recovery_stats = stats
+        return stats
+
+    def save_snapshot(self):
+        """Snapshot payment state so the next start only replays the journal tail"""
+        with self.snapshot_lock:
+            self.journal.sync()
+            position = self.journal.position()
+            journal_index = self.journal.index.copy()
+
+            with gc_paused():
+                entries = []
+                for payment_id, record in self.payments.copy().items():
+                    location = journal_index.get(payment_id)
+                    if location is None:
+                        continue  # Not persisted yet, replayed from the journal instead
+                    # Only completed payments reach the journal
+                    entries.append((location[0], location[1], {**record, 'status': 'completed'}))
+
+                return self.recovery.save_snapshot(entries, position)
+
     def process_payment(self, payment_data):
         """Process a payment request with proper error handling"""
         result = {'success': False, 'error': None, 'error_type': None}
-        payment_id = None
-        temp_file = None
-        
+
         try:
-            # Validate payment data
-            try:
-                validation_result = self.validation_system.validate_input(payment_data)
-                if not validation_result['valid']:
-                    raise ValidationError(validation_result['error'])
-                    
-                # Check CNP requirement
-                if validation_result.get('cnp_required', False) and not payment_data.get('cnp_approval'):
-                    raise ValidationError("CNP approval required for this payment")
-            except Exception as e:
-                raise ValidationError(f"Validation error: {str(e)}")
-
-            # Generate payment ID
-            payment_id = str(uuid.uuid4())
-            
-            with self.lock:
-                try:
-                    # Check for duplicate reference
-                    reference = payment_data['reference']
-                    if any(p['reference'] == reference for p in self.payments.values()):
-                        raise ValidationError("Duplicate payment reference")
-
-                    # Create payment record
-                    payment_record = {
-                        'payment_id': payment_id,
-                        'timestamp': datetime.now().isoformat(),
-                        'status': 'pending',
-                        **payment_data
-                    }
-
-                    # Generate temporary file first
-                    temp_file = self._generate_temp_file(payment_record)
-                    self.temp_files.add(temp_file)
-
-                    # Save payment record
-                    self.payments[payment_id] = payment_record
-
-                    # Move temporary file to final location
-                    final_file = self._finalize_payment_file(temp_file, payment_id)
-                    
-                    # Update status
-                    payment_record['status'] = 'completed'
-                    self.payments[payment_id] = payment_record
-
-                    result['success'] = True
-                    result['payment_id'] = payment_id
-
-                except OSError as e:
-                    raise FileSystemError(f"File system error: {str(e)}")
-                except Exception as e:
-                    raise PaymentError(f"Payment processing error: {str(e)}")
-
-        except ValidationError as e:
-            result['error'] = str(e)
-            result['error_type'] = 'validation'
-        except FileSystemError as e:
-            result['error'] = str(e)
-            result['error_type'] = 'filesystem'
+            self.validate_payment(payment_data)
+            payment_id, payment_record = self.reserve_payment(payment_data)
+            self.persist_payment(payment_record)
+
+            result['success'] = True
+            result['payment_id'] = payment_id
+
         except Exception as e:
-            result['error'] = str(e)
-            result['error_type'] = 'general'
-        finally:
-            # Clean up temporary file if it exists
-            if temp_file and temp_file in self.temp_files:
-                try:
-                    if Path(temp_file).exists():
-                        Path(temp_file).unlink()
-                    self.temp_files.remove(temp_file)
-                except:
-                    pass  # Ignore cleanup errors
-                    
+            self.record_error(result, e)
+
         return result
 
-    def _generate_temp_file(self, payment_record):
-        """Generate a temporary file for the payment"""
-        temp_file = self.files_dir / f"temp_{uuid.uuid4()}.json"
-        
+    def validate_payment(self, payment_data):
+        """Validate payment data, raising ValidationError on failure"""
+        check_payment(self.validation_system, payment_data)
+
+    def reserve_payment(self, payment_data):
+        """Create a pending payment record and reserve its reference"""
+        # Generate payment ID
+        payment_id = str(uuid.uuid4())
+        reference = payment_data['reference']
+
+        # Create payment record
+        payment_record = {
+            'payment_id': payment_id,
+            'timestamp': datetime.now().isoformat(),
+            'status': 'pending',
+            **payment_data
+        }
+
+        # Reserve the reference; only this check runs under a lock
+        with self._stripe_lock(reference):
+            if reference in self.reference_index:
+                raise ValidationError("Duplicate payment reference")
+            self.reference_index[reference] = payment_id
+            self.payments[payment_id] = payment_record
+
+        return payment_id, payment_record
+
+    def persist_payment(self, payment_record):
+        """Write a reserved payment to the journal and mark it completed"""
         try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(payment_record, f, indent=4)
-            return temp_file
+            # Persist to the journal; the journal copy is the durable record
+            self.journal.append({**payment_record, 'status': 'completed'})
+
+            # Update status
+            payment_record['status'] = 'completed'
+
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every and not self.snapshot_lock.locked():
+                self._since_snapshot = 0
+                threading.Thread(target=self._background_snapshot, daemon=True).start()
+
         except Exception as e:
-            raise FileSystemError(f"Failed to create temporary file: {e}")
+            # Release the reservation so the payment can be retried
+            self.release_payment(payment_record)
+            if isinstance(e, OSError):
+                raise FileSystemError(f"File system error: {str(e)}")
+            raise PaymentError(f"Payment processing error: {str(e)}")
+
+    def release_payment(self, payment_record):
+        """Drop a reservation that never reached the journal"""
+        with self._stripe_lock(payment_record['reference']):
+            self.reference_index.pop(payment_record['reference'], None)
+            self.payments.pop(payment_record['payment_id'], None)
+
+    @staticmethod
+    def record_error(result, error):
+        """Fill a result dict from a processing exception"""
+        result['error'] = str(error)
+        if isinstance(error, ValidationError):
+            result['error_type'] = 'validation'
+        elif isinstance(error, FileSystemError):
+            result['error_type'] = 'filesystem'
+        else:
+            result['error_type'] = 'general'
+        return result
 
-    def _finalize_payment_file(self, temp_file, payment_id):
-        """Move temporary file to final location"""
-        final_file = self.files_dir / f"payment_{payment_id}.json"
-        
+    def _stripe_lock(self, reference):
+        """Lock guarding the reference index stripe for a reference"""
+        return self.stripe_locks[hash(reference) % len(self.stripe_locks)]
+
+    def _background_snapshot(self):
+        """Periodic snapshot run off the submission path"""
         try:
-            Path(temp_file).rename(final_file)
-            return final_file
+            self.save_snapshot()
         except Exception as e:
-            raise FileSystemError(f"Failed to finalize payment file: {e}")
+            print(f"Error saving payment snapshot: {str(e)}")
+
+    def close(self):
+        """Flush and close the payment journal"""
+        self.journal.close()
 
     def get_payment_status(self, payment_id):
         """Get the status of a payment"""
         return self.payments.get(payment_id, {}).get('status', 'unknown')
+
+    def get_payment_by_reference(self, reference):
+        """Get a payment record by its reference"""
+        payment_id = self.reference_index.get(reference)
+        return self.payments.get(payment_id) if payment_id else None
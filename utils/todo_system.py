@@ -1,5 +1,7 @@
 from enum import Enum
 import json
+import os
+import uuid
 from datetime import datetime
 from pathlib import Path
 
@@ -25,7 +27,8 @@ class UserRole(Enum):
 
 class Task:
     """Represents a task in the todo system"""
-    def __init__(self, description, owner, deadline, priority=TaskPriority.MEDIUM, created_by=None):
+    def __init__(self, description, owner, deadline, priority=TaskPriority.MEDIUM, created_by=None, task_id=None):
+        self.id = task_id or uuid.uuid4().hex
         self.description = description
         self.owner = owner
         self.deadline = deadline
@@ -52,6 +55,7 @@ class Task:
     def to_dict(self):
         """Convert task to dictionary for serialization"""
         return {
+            "id": self.id,
             "description": self.description,
             "owner": self.owner,
             "deadline": self.deadline,
@@ -74,7 +78,8 @@ class Task:
             owner=data["owner"],
             deadline=data["deadline"],
             priority=TaskPriority(data["priority"]),
-            created_by=data["created_by"]
+            created_by=data["created_by"],
+            task_id=data.get("id")
         )
         task.creation_date = data["creation_date"]
         task.last_edited = data["last_edited"]
@@ -86,16 +91,36 @@ class Task:
         return task
 
 class TodoManager:
-    """Manages tasks in the todo system"""
-    def __init__(self):
+    """Manages tasks in the todo system.
+
+    data_file holds a snapshot of every task. Each change after it is
+    appended to a journal next to it (todo_data.journal.ndjson) as one
+    small event, so an edit writes one line however long the task history
+    is. Every compact_every events the snapshot is rewritten and the
+    journal emptied; load_tasks() replays the journal over the snapshot.
+
+    Tasks are looked up by their persistent id, and by owner and reviewer,
+    through indexes kept in step with every change.
+    """
+    def __init__(self, data_file=None, compact_every=200):
         self.tasks = []
-        self.data_file = Path("todo_data.json")
+        self.data_file = Path(data_file or "todo_data.json")
+        self.compact_every = compact_every
+        self._by_id = {}        # task id -> task
+        self._by_owner = {}     # owner -> {task id: task}
+        self._by_reviewer = {}  # reviewer -> {task id: task}
+        self._seq = 0         # sequence number of the last journaled event
+        self._journaled = 0   # events written since the last snapshot
         self.load_tasks()
 
+    @property
+    def journal_file(self):
+        return self.data_file.with_name(self.data_file.stem + ".journal.ndjson")
+
     def add_task(self, task):
         """Add a new task"""
-        self.tasks.append(task)
-        self.save_tasks()
+        self._append(task)
+        self._record('add', task, data=task.to_dict())
 
     def get_active_tasks(self):
         """Get all non-archived tasks"""
@@ -105,9 +130,21 @@ class TodoManager:
         """Get all archived tasks"""
         return [task for task in self.tasks if task.archived]
 
+    def get_task(self, task_id):
+        """Get a task by id, or None"""
+        return self._by_id.get(task_id)
+
+    def get_tasks_for_owner(self, owner):
+        """Get all tasks owned by a user"""
+        return list(self._by_owner.get(owner, {}).values())
+
+    def get_tasks_for_reviewer(self, reviewer):
+        """Get all tasks a user is reviewing"""
+        return list(self._by_reviewer.get(reviewer, {}).values())
+
     def update_task_status(self, task, new_status, user, feedback=None):
         """Update task status with validation"""
-        if task not in self.tasks:
+        if self._by_id.get(task.id) is not task:
             raise ValueError("Task not found")
 
         # Validate status transition
@@ -116,20 +153,24 @@ class TodoManager:
 
         task.status = new_status
         task.last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._record('set', task, fields={'status': new_status.value, 'last_edited': task.last_edited})
         
         if feedback is not None:
-            task.add_feedback(user, feedback)
+            self.add_feedback(task, user, feedback)
 
-        self.save_tasks()
+    def add_feedback(self, task, user, message):
+        """Add feedback to a task and journal just the new entry"""
+        task.add_feedback(user, message)
+        self._record('feedback', task, entry=task.feedback_history[-1])
 
     def assign_reviewer(self, task, reviewer):
         """Assign a reviewer to a task"""
-        if task not in self.tasks:
+        if self._by_id.get(task.id) is not task:
             raise ValueError("Task not found")
 
-        task.reviewer = reviewer
+        self._set_reviewer(task, reviewer)
         task.last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.save_tasks()
+        self._record('set', task, fields={'reviewer': reviewer, 'last_edited': task.last_edited})
 
     def archive_task(self, task, user=None):
         """Archive a task. Only task owner, reviewer, or admin can archive."""
@@ -149,39 +190,132 @@ class TodoManager:
 
         task.archived = True
         task.archived_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.save_tasks()
+        self._record('set', task, fields={'archived': True, 'archived_date': task.archived_date})
 
     def save_tasks(self):
-        """Save tasks to file"""
+        """Write a snapshot of every task and start a new journal"""
         try:
             data = {
                 'tasks': [task.to_dict() for task in self.tasks],
-                'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'journal_seq': self._seq
             }
             
             # Ensure parent directory exists
             self.data_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.data_file, 'w', encoding='utf-8') as f:
+            # Replace the snapshot atomically; events up to journal_seq are in it
+            temp_file = self.data_file.with_name(self.data_file.name + ".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4)
+            os.replace(temp_file, self.data_file)
+            self.journal_file.unlink(missing_ok=True)
+            self._journaled = 0
         except Exception as e:
             print(f"Error saving tasks: {str(e)}")
 
     def load_tasks(self):
-        """Load tasks from file"""
+        """Load the snapshot and replay the journal written after it"""
+        self.tasks = []
+        self._by_id = {}
+        self._by_owner = {}
+        self._by_reviewer = {}
+        self._seq = 0
+        self._journaled = 0
         try:
+            unsaved_ids = False
             if self.data_file.exists():
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     if isinstance(data, dict) and 'tasks' in data:
-                        self.tasks = [Task.from_dict(task_data) for task_data in data['tasks']]
-                    else:
-                        self.tasks = []
-            else:
-                self.tasks = []
+                        for task_data in data['tasks']:
+                            self._append(Task.from_dict(task_data))
+                            unsaved_ids = unsaved_ids or 'id' not in task_data
+                        self._seq = data.get('journal_seq', 0)
         except Exception as e:
             print(f"Error loading tasks: {str(e)}")
             self.tasks = []
+            self._by_id = {}
+            self._by_owner = {}
+            self._by_reviewer = {}
+            return
+
+        try:
+            if self.journal_file.exists():
+                with open(self.journal_file, 'rb+') as f:
+                    intact = 0
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            # A torn final line from an interrupted append;
+                            # cut it off so the next event starts a fresh line
+                            f.truncate(intact)
+                            break
+                        intact += len(line)
+                        # Events already folded into the snapshot are skipped
+                        if event['seq'] <= self._seq:
+                            continue
+                        self._apply(event)
+                        self._seq = event['seq']
+                        self._journaled += 1
+        except Exception as e:
+            print(f"Error replaying task journal: {str(e)}")
+
+        # Tasks saved before ids existed get theirs written out once
+        if unsaved_ids:
+            self.save_tasks()
+
+    def _append(self, task):
+        if task.id in self._by_id:
+            raise ValueError(f"Duplicate task id {task.id}")
+        self.tasks.append(task)
+        self._by_id[task.id] = task
+        self._by_owner.setdefault(task.owner, {})[task.id] = task
+        if task.reviewer:
+            self._by_reviewer.setdefault(task.reviewer, {})[task.id] = task
+
+    def _set_reviewer(self, task, reviewer):
+        """Change a task's reviewer and move it in the reviewer index"""
+        if task.reviewer:
+            reviewing = self._by_reviewer.get(task.reviewer, {})
+            reviewing.pop(task.id, None)
+            if not reviewing:
+                self._by_reviewer.pop(task.reviewer, None)
+        task.reviewer = reviewer
+        if reviewer:
+            self._by_reviewer.setdefault(reviewer, {})[task.id] = task
+
+    def _record(self, op, task, **details):
+        """Append one event to the journal, compacting when it grows long"""
+        event = {'seq': self._seq + 1, 'op': op, 'task': task.id, **details}
+        try:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, separators=(',', ':')) + "\n")
+            self._seq += 1
+            self._journaled += 1
+        except Exception as e:
+            print(f"Error saving tasks: {str(e)}")
+            return
+        if self._journaled >= self.compact_every:
+            self.save_tasks()
+
+    def _apply(self, event):
+        """Replay one journaled event"""
+        if event['op'] == 'add':
+            self._append(Task.from_dict(event['data']))
+            return
+        task = self._by_id[event['task']]
+        if event['op'] == 'feedback':
+            task.feedback_history.append(event['entry'])
+            task.last_edited = event['entry']['timestamp']
+        elif event['op'] == 'set':
+            for field, value in event['fields'].items():
+                if field == 'reviewer':
+                    self._set_reviewer(task, value)
+                else:
+                    setattr(task, field, TaskStatus(value) if field == 'status' else value)
 
     def _is_valid_status_transition(self, task, new_status, user):
         """Validate status transition based on current status and user role"""